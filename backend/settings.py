@@ -161,6 +161,8 @@ REST_FRAMEWORK = {
     'DEFAULT_RENDERER_CLASSES': [
         'src.json_renderer.MongoJSONRenderer',
         'rest_framework.renderers.JSONRenderer',
+        # Accept: application/x-ndjson (list/search stream one item per line)
+        'src.json_renderer.NDJSONRenderer',
     ],
 }
 
@@ -185,6 +187,73 @@ except ImportError:
 
 # Google Places API
 GOOGLE_PLACES_API_KEY = config('GOOGLE_PLACES_API_KEY', default='')
+# Maximum number of concurrent Google Places requests for batched fan-out
+GOOGLE_PLACES_MAX_CONCURRENCY = int(config('GOOGLE_PLACES_MAX_CONCURRENCY', default=8))
+# Transport: 'live', 'record' (save responses as fixtures) or 'replay' (serve fixtures offline)
+GOOGLE_PLACES_TRANSPORT = config('GOOGLE_PLACES_TRANSPORT', default='live')
+GOOGLE_PLACES_FIXTURE_DIR = config('GOOGLE_PLACES_FIXTURE_DIR', default=str(BASE_DIR / 'fixtures' / 'places'))
+# Replay-only knobs: injected latency (ms), random jitter (ms), error probability and RNG seed
+GOOGLE_PLACES_REPLAY_LATENCY_MS = float(config('GOOGLE_PLACES_REPLAY_LATENCY_MS', default=0))
+GOOGLE_PLACES_REPLAY_JITTER_MS = float(config('GOOGLE_PLACES_REPLAY_JITTER_MS', default=0))
+GOOGLE_PLACES_REPLAY_ERROR_RATE = float(config('GOOGLE_PLACES_REPLAY_ERROR_RATE', default=0))
+GOOGLE_PLACES_REPLAY_SEED = config('GOOGLE_PLACES_REPLAY_SEED', default=None)
+# Multi-page searches: delay before a next_page_token becomes valid, and how long a
+# request asking for more than 20 results waits for the background page fetch
+GOOGLE_PLACES_PAGE_TOKEN_DELAY_S = float(config('GOOGLE_PLACES_PAGE_TOKEN_DELAY_S', default=2.0))
+GOOGLE_PLACES_PAGE_WAIT_S = float(config('GOOGLE_PLACES_PAGE_WAIT_S', default=10))
+
+# Search source: 'google' (always call Google) or 'local_first' (answer from MongoDB,
+# fall back to Google when fewer than ATTRACTIONS_LOCAL_MIN_RESULTS local matches)
+ATTRACTIONS_SEARCH_MODE = config('ATTRACTIONS_SEARCH_MODE', default='google')
+ATTRACTIONS_LOCAL_MIN_RESULTS = int(config('ATTRACTIONS_LOCAL_MIN_RESULTS', default=10))
+
+# popular_by_country stale-while-revalidate: lists are fresh for ATTRACTIONS_POPULAR_TTL
+# seconds, then served as-is (with a background refresh) up to ATTRACTIONS_POPULAR_STALE_TTL
+ATTRACTIONS_POPULAR_TTL = int(config('ATTRACTIONS_POPULAR_TTL', default=10 * 60))
+ATTRACTIONS_POPULAR_STALE_TTL = int(config('ATTRACTIONS_POPULAR_STALE_TTL', default=24 * 60 * 60))
+# Cold cache and nothing stored locally: seconds a request may wait for the Google list
+# being fetched in the background. 0 (default) answers right away with an empty list.
+ATTRACTIONS_POPULAR_COLD_WAIT_S = float(config('ATTRACTIONS_POPULAR_COLD_WAIT_S', default=0))
+
+# Profile ranking (src/services/ranking.py): 'lexicographic' (type affinity, then rating,
+# then reviews) or 'weighted' (blended score). Weights per profile override
+# {'types': 0.5, 'rating': 0.3, 'reviews': 0.2}, e.g. {'local': {'rating': 0.5}}.
+ATTRACTIONS_RANKING_MODE = config('ATTRACTIONS_RANKING_MODE', default='lexicographic')
+ATTRACTIONS_RANKING_WEIGHTS = {}
+
+# Freshness (seconds) of cached Google Places details, per requested field.
+# Unlisted fields use the defaults in src/repositories/place_details_repository.py.
+PLACE_DETAILS_FIELD_TTL = {}
+
+# Compression of the attraction cold-storage blobs (raw Google payload, reviews):
+# 'zlib' (stdlib) or 'zstd' (requires the zstandard package)
+ATTRACTIONS_BLOB_CODEC = config('ATTRACTIONS_BLOB_CODEC', default='zlib')
+
+# Result caches used by the services layer (see src/cache.py).
+# BACKEND: 'local' (per-process LRU) or 'sqlite' (shared by all workers on the node).
+ATTRACTIONS_CACHES = {
+    'search': {
+        'BACKEND': config('SEARCH_CACHE_BACKEND', default='local'),
+        'TTL': int(config('SEARCH_CACHE_TTL', default=5 * 60)),
+        'MAX_ENTRIES': int(config('SEARCH_CACHE_MAX_ENTRIES', default=500)),
+        'MAX_BYTES': int(config('SEARCH_CACHE_MAX_BYTES', default=64 * 1024 * 1024)),
+        'PATH': config('SEARCH_CACHE_PATH', default=''),
+    },
+    # Ranked popular lists; entries are kept for the stale window (see ATTRACTIONS_POPULAR_*)
+    'popular': {
+        'BACKEND': config('POPULAR_CACHE_BACKEND', default='local'),
+        'TTL': ATTRACTIONS_POPULAR_STALE_TTL,
+        'MAX_ENTRIES': int(config('POPULAR_CACHE_MAX_ENTRIES', default=1000)),
+        'PATH': config('POPULAR_CACHE_PATH', default=''),
+    },
+    # Complete multi-page Google search results (next_page_token followed)
+    'places_pages': {
+        'BACKEND': config('PLACES_PAGES_CACHE_BACKEND', default='local'),
+        'TTL': int(config('PLACES_PAGES_CACHE_TTL', default=15 * 60)),
+        'MAX_ENTRIES': int(config('PLACES_PAGES_CACHE_MAX_ENTRIES', default=200)),
+        'PATH': config('PLACES_PAGES_CACHE_PATH', default=''),
+    },
+}
 
 # SimpleJWT (optional, only if package is installed)
 try:
@@ -0,0 +1,6 @@
+"""Benchmark suite for the attractions request path.
+
+Run with ``python manage.py bench_attractions`` (see that command for options).
+Scenarios are registered in ``scenarios.py``; ``harness.py`` holds the timing,
+allocation and report helpers and has no Django dependency.
+"""
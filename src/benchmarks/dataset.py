@@ -0,0 +1,134 @@
+"""Deterministic synthetic places and a stub Places client for benchmarks."""
+from __future__ import annotations
+
+from typing import Any, Dict, Iterator, List
+import hashlib
+import random
+
+COUNTRIES = {
+    'France': ['Paris', 'Lyon', 'Marseille', 'Nice', 'Bordeaux'],
+    'Italy': ['Rome', 'Milan', 'Florence', 'Venice', 'Naples'],
+    'Spain': ['Madrid', 'Barcelona', 'Seville', 'Valencia', 'Bilbao'],
+    'Japan': ['Tokyo', 'Kyoto', 'Osaka', 'Sapporo', 'Fukuoka'],
+}
+# Rough city centers so geo queries return realistic neighbourhoods
+_CENTERS = {
+    'Paris': (48.8566, 2.3522), 'Lyon': (45.764, 4.8357), 'Marseille': (43.2965, 5.3698),
+    'Nice': (43.7102, 7.262), 'Bordeaux': (44.8378, -0.5792), 'Rome': (41.9028, 12.4964),
+    'Milan': (45.4642, 9.19), 'Florence': (43.7696, 11.2558), 'Venice': (45.4408, 12.3155),
+    'Naples': (40.8518, 14.2681), 'Madrid': (40.4168, -3.7038), 'Barcelona': (41.3874, 2.1686),
+    'Seville': (37.3891, -5.9845), 'Valencia': (39.4699, -0.3763), 'Bilbao': (43.263, -2.935),
+    'Tokyo': (35.6762, 139.6503), 'Kyoto': (35.0116, 135.7681), 'Osaka': (34.6937, 135.5023),
+    'Sapporo': (43.0618, 141.3545), 'Fukuoka': (33.5904, 130.4017),
+}
+TYPE_SETS = [
+    ['tourist_attraction', 'museum', 'point_of_interest', 'establishment'],
+    ['tourist_attraction', 'church', 'place_of_worship', 'point_of_interest'],
+    ['park', 'tourist_attraction', 'point_of_interest', 'establishment'],
+    ['restaurant', 'food', 'point_of_interest', 'establishment'],
+    ['cafe', 'food', 'point_of_interest', 'establishment'],
+    ['bar', 'point_of_interest', 'establishment'],
+    ['lodging', 'point_of_interest', 'establishment'],
+    ['art_gallery', 'tourist_attraction', 'point_of_interest'],
+    ['shopping_mall', 'store', 'point_of_interest', 'establishment'],
+    ['train_station', 'transit_station', 'point_of_interest'],
+]
+_NOUNS = ['Museum', 'Cathedral', 'Garden', 'Bistro', 'Café', 'Tower', 'Gallery', 'Market', 'Hotel', 'Station', 'Palace', 'Bridge']
+_ADJECTIVES = ['Grand', 'Old', 'Royal', 'Little', 'Modern', 'Hidden', 'Central', 'Blue', 'Golden', 'Historic']
+
+
+def place_id_for(index: int) -> str:
+    return f'bench_{index:012d}'
+
+
+def index_for(place_id: str):
+    try:
+        return int(place_id[len('bench_'):]) if place_id.startswith('bench_') else None
+    except ValueError:
+        return None
+
+
+def synthetic_place(index: int, with_details: bool = True) -> Dict[str, Any]:
+    """Google-details-shaped payload for place number `index` (same index -> same payload)."""
+    rng = random.Random(index)
+    country = list(COUNTRIES)[index % len(COUNTRIES)]
+    city = COUNTRIES[country][(index // len(COUNTRIES)) % len(COUNTRIES[country])]
+    lat0, lng0 = _CENTERS[city]
+    name = f"{rng.choice(_ADJECTIVES)} {rng.choice(_NOUNS)} {index}"
+    place = {
+        'place_id': place_id_for(index),
+        'name': name,
+        'formatted_address': f"{rng.randint(1, 200)} Rue {rng.choice(_ADJECTIVES)}, {city}, {country}",
+        'geometry': {'location': {'lat': lat0 + rng.uniform(-0.05, 0.05), 'lng': lng0 + rng.uniform(-0.05, 0.05)}},
+        'rating': round(rng.uniform(3.0, 5.0), 1),
+        'user_ratings_total': rng.randint(0, 50000),
+        'price_level': rng.choice([None, 0, 1, 2, 3, 4]),
+        'types': list(TYPE_SETS[index % len(TYPE_SETS)]),
+        'photos': [
+            {'photo_reference': f'photo_{index}_{i}', 'height': 1200, 'width': 1600, 'html_attributions': []}
+            for i in range(rng.randint(1, 10))
+        ],
+        'address_components': [
+            {'long_name': city, 'short_name': city, 'types': ['locality', 'political']},
+            {'long_name': country, 'short_name': country[:2].upper(), 'types': ['country', 'political']},
+        ],
+    }
+    if with_details:
+        place.update({
+            'website': f'https://example.com/{place["place_id"]}',
+            'formatted_phone_number': f'+33 1 {rng.randint(10, 99)} {rng.randint(10, 99)} {rng.randint(10, 99)} {rng.randint(10, 99)}',
+            'opening_hours': {
+                'open_now': rng.random() > 0.3,
+                'weekday_text': [f'{d}: 9:00 AM – 6:00 PM' for d in ('Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday')],
+                'periods': [{'open': {'day': d, 'time': '0900'}, 'close': {'day': d, 'time': '1800'}} for d in range(7)],
+            },
+            'reviews': [
+                {
+                    'author_name': f'Reviewer {index}-{i}',
+                    'rating': rng.randint(1, 5),
+                    'relative_time_description': 'a month ago',
+                    'text': ' '.join(rng.choice(_NOUNS).lower() for _ in range(60)),
+                    'time': 1700000000 + rng.randint(0, 10 ** 7),
+                }
+                for i in range(5)
+            ],
+        })
+    return place
+
+
+def iter_places(count: int, with_details: bool = True) -> Iterator[Dict[str, Any]]:
+    for index in range(count):
+        yield synthetic_place(index, with_details=with_details)
+
+
+class StubPlacesClient:
+    """Offline googlemaps-compatible client returning synthetic places from the seeded range.
+
+    Search calls return 20 places chosen deterministically from the query, so the
+    same request always yields the same page; details return the full payload.
+    """
+
+    page_size = 20
+
+    def __init__(self, dataset_size: int):
+        self.dataset_size = max(1, int(dataset_size))
+        self.calls = 0
+
+    def _page(self, key: str) -> List[Dict[str, Any]]:
+        start = int(hashlib.sha1(key.encode('utf-8')).hexdigest()[:8], 16) % self.dataset_size
+        return [synthetic_place((start + i * 7919) % self.dataset_size, with_details=False) for i in range(self.page_size)]
+
+    def places(self, query=None, **kwargs):
+        self.calls += 1
+        return {'status': 'OK', 'results': self._page(f'places|{query}|{kwargs.get("type")}')}
+
+    def places_nearby(self, location=None, radius=None, keyword=None, type=None, **kwargs):
+        self.calls += 1
+        return {'status': 'OK', 'results': self._page(f'nearby|{location}|{radius}|{keyword}|{type}')}
+
+    def place(self, place_id=None, fields=None, **kwargs):
+        self.calls += 1
+        index = index_for(place_id or '')
+        if index is None or index >= self.dataset_size:
+            return {'status': 'NOT_FOUND', 'result': {}}
+        return {'status': 'OK', 'result': synthetic_place(index)}
@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+import gc
+import json
+import math
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Linear-interpolated percentile (q in 0..100) of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    if len(sorted_values) == 1:
+        return sorted_values[0]
+    pos = (len(sorted_values) - 1) * q / 100.0
+    lo = math.floor(pos)
+    hi = math.ceil(pos)
+    if lo == hi:
+        return sorted_values[lo]
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (pos - lo)
+
+
+def measure(fn: Callable[[], Any], iterations: int = 100, warmup: int = 10, alloc_iterations: int = 10,
+            setup: Optional[Callable[[], Any]] = None) -> Dict[str, Any]:
+    """Time `fn` and sample its allocations.
+
+    Latencies come from a plain timing pass; allocations from a separate, shorter
+    pass under tracemalloc so tracing overhead does not skew the latencies.
+    `setup`, if given, runs before every call and is excluded from the timings.
+    """
+    for _ in range(warmup):
+        if setup:
+            setup()
+        fn()
+
+    gc.collect()
+    latencies = []
+    errors = 0
+    wall_started = time.perf_counter()
+    for _ in range(iterations):
+        if setup:
+            setup()
+        started = time.perf_counter()
+        try:
+            fn()
+        except Exception:
+            errors += 1
+        latencies.append((time.perf_counter() - started) * 1000)
+    wall = time.perf_counter() - wall_started
+    latencies.sort()
+    busy_s = sum(latencies) / 1000
+
+    peaks = []
+    nets = []
+    if alloc_iterations:
+        tracemalloc.start()
+        try:
+            for _ in range(alloc_iterations):
+                if setup:
+                    setup()
+                gc.collect()
+                before, _ = tracemalloc.get_traced_memory()
+                tracemalloc.reset_peak()
+                try:
+                    fn()
+                except Exception:
+                    pass
+                after, peak = tracemalloc.get_traced_memory()
+                peaks.append(peak - before)
+                nets.append(after - before)
+        finally:
+            tracemalloc.stop()
+
+    return {
+        'iterations': iterations,
+        'errors': errors,
+        'p50_ms': round(percentile(latencies, 50), 3),
+        'p95_ms': round(percentile(latencies, 95), 3),
+        'p99_ms': round(percentile(latencies, 99), 3),
+        'mean_ms': round(sum(latencies) / len(latencies), 3) if latencies else 0.0,
+        'min_ms': round(latencies[0], 3) if latencies else 0.0,
+        'max_ms': round(latencies[-1], 3) if latencies else 0.0,
+        'throughput_rps': round(iterations / busy_s, 1) if busy_s > 0 else None,
+        'wall_s': round(wall, 3),
+        'alloc_peak_kb': round(sum(peaks) / len(peaks) / 1024, 1) if peaks else None,
+        'alloc_net_kb': round(sum(nets) / len(nets) / 1024, 1) if nets else None,
+    }
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], stderr=subprocess.DEVNULL).decode().strip()
+    except Exception:
+        return None
+
+
+def build_report(results: List[Dict[str, Any]], config: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        'meta': {
+            'generated_at': datetime.utcnow().isoformat() + 'Z',
+            'git_revision': _git_revision(),
+            'python': sys.version.split()[0],
+            'platform': platform.platform(),
+            'config': config,
+        },
+        'results': results,
+    }
+
+
+def write_report(report: Dict[str, Any], path: str) -> None:
+    with open(path, 'w', encoding='utf-8') as fh:
+        json.dump(report, fh, indent=2, default=str)
+        fh.write('\n')
+
+
+def format_table(results: List[Dict[str, Any]]) -> str:
+    columns = ['scenario', 'size', 'p50_ms', 'p95_ms', 'p99_ms', 'throughput_rps', 'alloc_peak_kb', 'errors']
+    rows = [[str(r.get(c, '')) for c in columns] for r in results]
+    widths = [max(len(c), *(len(row[i]) for row in rows)) if rows else len(c) for i, c in enumerate(columns)]
+    lines = ['  '.join(c.ljust(w) for c, w in zip(columns, widths))]
+    lines.append('  '.join('-' * w for w in widths))
+    lines.extend('  '.join(v.ljust(w) for v, w in zip(row, widths)) for row in rows)
+    return '\n'.join(lines)
@@ -0,0 +1,185 @@
+"""Benchmark scenarios, registered by name.
+
+Each scenario is a function taking a ``BenchContext`` and returning a zero-argument
+callable that performs one operation (usually one HTTP request through the DRF
+view, including rendering). The harness times that callable.
+"""
+from __future__ import annotations
+
+from typing import Any, Callable, Dict, List, Optional
+import itertools
+
+SCENARIOS: Dict[str, Dict[str, Any]] = {}
+
+
+def scenario(name: str, group: str = 'endpoints', description: str = ''):
+    def decorator(fn: Callable[['BenchContext'], Callable[[], Any]]):
+        SCENARIOS[name] = {'factory': fn, 'group': group, 'description': description or (fn.__doc__ or '').strip()}
+        return fn
+    return decorator
+
+
+class BenchContext:
+    """State shared by scenarios for one dataset size."""
+
+    def __init__(self, size: int, user=None, place_ids: Optional[List[str]] = None, country: str = 'France'):
+        from rest_framework.test import APIRequestFactory
+
+        self.size = size
+        self.user = user
+        self.country = country
+        self.factory = APIRequestFactory()
+        self._place_ids = itertools.cycle(place_ids or [])
+
+    def next_place_id(self) -> str:
+        return next(self._place_ids)
+
+    def get(self, view, path: str, params: Optional[Dict[str, Any]] = None, authenticate: bool = False, **kwargs):
+        from rest_framework.test import force_authenticate
+
+        request = self.factory.get(path, params or {})
+        if authenticate and self.user is not None:
+            force_authenticate(request, user=self.user)
+        response = view(request, **kwargs)
+        if hasattr(response, 'render'):
+            response.render()
+        if response.status_code >= 400:
+            raise RuntimeError(f'{path} returned {response.status_code}')
+        return response
+
+
+def _attraction_view(action: str, method: str = 'get'):
+    from ..routes.attractions import AttractionViewSet
+    return AttractionViewSet.as_view({method: action})
+
+
+@scenario('attractions.list', description='Landing page: popular attractions for a country')
+def bench_list(ctx: BenchContext):
+    view = _attraction_view('list')
+    return lambda: ctx.get(view, '/api/attractions/', {'country': ctx.country, 'limit': 20})
+
+
+@scenario('attractions.search', description='Text search with country filter')
+def bench_search(ctx: BenchContext):
+    view = _attraction_view('search')
+    queries = itertools.cycle(['museum', 'garden', 'bistro', 'tower', 'market', 'palace'])
+    return lambda: ctx.get(view, '/api/attractions/search/', {'q': next(queries), 'country': ctx.country, 'profile': 'tourist'})
+
+
+@scenario('attractions.popular', description='Popular attractions per country and profile')
+def bench_popular(ctx: BenchContext):
+    view = _attraction_view('popular')
+    profiles = itertools.cycle(['tourist', 'local', 'pro'])
+    return lambda: ctx.get(view, '/api/attractions/popular/', {'country': ctx.country, 'profile': next(profiles), 'limit': 20})
+
+
+@scenario('attractions.retrieve', description='Place details by place_id')
+def bench_retrieve(ctx: BenchContext):
+    view = _attraction_view('retrieve')
+
+    def run():
+        pk = ctx.next_place_id()
+        return ctx.get(view, f'/api/attractions/{pk}/', pk=pk)
+    return run
+
+
+@scenario('attractions.similar', description='Similar places around a place')
+def bench_similar(ctx: BenchContext):
+    view = _attraction_view('similar')
+
+    def run():
+        pk = ctx.next_place_id()
+        return ctx.get(view, f'/api/attractions/{pk}/similar/', {'limit': 10}, pk=pk)
+    return run
+
+
+@scenario('compilations.list', description="Authenticated user's compilations with nested attractions")
+def bench_compilations_list(ctx: BenchContext):
+    from ..routes.attractions import CompilationViewSet
+    view = CompilationViewSet.as_view({'get': 'list'})
+    return lambda: ctx.get(view, '/api/compilations/', authenticate=True)
+
+
+@scenario('ranking.rank', group='micro', description='Profile ranking of 1000 mapped candidates')
+def bench_ranking(ctx: BenchContext):
+    from ..services.attractions_service import AttractionsService
+    from ..services.ranking import get_engine
+    from .dataset import synthetic_place
+
+    candidates = [AttractionsService._map_place_to_attraction(synthetic_place(i, with_details=False)) for i in range(1000)]
+    engine = get_engine()
+    profiles = itertools.cycle(['tourist', 'local', 'pro'])
+    return lambda: engine.rank(candidates, next(profiles))
+
+
+def _card_attraction(index: int):
+    """In-memory Attraction (card fields only, as list endpoints load them) for synthetic place `index`."""
+    from bson import ObjectId
+    from ..models import Attraction
+    from ..repositories.attraction_repository import CARD_FIELDS
+    from ..services.attractions_service import AttractionsService
+    from .dataset import synthetic_place
+
+    doc = AttractionsService._details_to_document(synthetic_place(index))
+    return Attraction(id=ObjectId(), **{k: v for k, v in doc.items() if k in CARD_FIELDS})
+
+
+@scenario('compilations.serialize', group='micro', description='Serialize one 150-item compilation (attractions preloaded, no queries)')
+def bench_compilation_serialize(ctx: BenchContext):
+    from bson import ObjectId
+    from ..models import Compilation, CompilationItem
+    from ..serializers import CompilationSerializer
+
+    compilation = Compilation(id=ObjectId(), name='Bench serialize', profile='tourist', country='France')
+    attractions = {}
+    for order in range(150):
+        attraction = _card_attraction(order)
+        attractions[attraction.id] = attraction
+        compilation.items.append(CompilationItem(attraction=attraction, order_index=order))
+    return lambda: CompilationSerializer(compilation, context={'attractions': attractions}).data
+
+
+@scenario('attractions.serialize', group='micro', description='AttractionSerializer over 1000 card documents (default fields)')
+def bench_attraction_serialize(ctx: BenchContext):
+    from ..serializers import AttractionSerializer
+
+    docs = [_card_attraction(i) for i in range(1000)]
+    return lambda: AttractionSerializer(docs, many=True).data
+
+
+@scenario('attractions.serialize_card', group='micro', description="AttractionSerializer over 1000 raw pymongo rows with fields='card'")
+def bench_attraction_serialize_card(ctx: BenchContext):
+    from ..serializers import AttractionSerializer
+
+    rows = [_card_attraction(i).to_mongo().to_dict() for i in range(1000)]
+    return lambda: AttractionSerializer(rows, many=True, fields='card').data
+
+
+def _search_response(count: int = 50):
+    """Large search-shaped payload: mapped places with raw_data and reviews, plus Mongo ids and dates."""
+    from datetime import datetime
+    from bson import ObjectId
+    from ..services.attractions_service import AttractionsService
+    from .dataset import synthetic_place
+
+    now = datetime.utcnow()
+    return [
+        {**AttractionsService._map_place_to_attraction(synthetic_place(i)), '_id': ObjectId(), 'created_at': now}
+        for i in range(count)
+    ]
+
+
+@scenario('render.search', group='micro', description='Render a 50-place search response with MongoJSONRenderer (orjson when installed)')
+def bench_render_search(ctx: BenchContext):
+    from ..json_renderer import MongoJSONRenderer
+
+    data, renderer = _search_response(), MongoJSONRenderer()
+    return lambda: renderer.render(data, 'application/json')
+
+
+@scenario('render.search_stdlib', group='micro', description='Same response with the stdlib json encoder')
+def bench_render_search_stdlib(ctx: BenchContext):
+    from ..json_renderer import StdlibMongoJSONRenderer
+
+    data, renderer = _search_response(), StdlibMongoJSONRenderer()
+    return lambda: renderer.render(data, 'application/json')
@@ -0,0 +1,85 @@
+"""Load synthetic datasets into the benchmark database."""
+from __future__ import annotations
+
+from typing import Dict, List
+import logging
+
+from .dataset import iter_places, place_id_for
+
+logger = logging.getLogger(__name__)
+
+BENCH_USER_EMAIL = 'bench@example.com'
+
+
+def reset_collections() -> None:
+    from ..models import Attraction, AttractionBlob, Compilation, PlaceDetailsCacheEntry, User
+
+    for model in (Attraction, AttractionBlob, Compilation, PlaceDetailsCacheEntry, User):
+        model._get_collection().drop()
+        model._collection = None
+        model.ensure_indexes()
+
+
+def seed_attractions(count: int, batch_size: int = 5000, log_every: int = 100000) -> int:
+    """Insert `count` synthetic attractions using the same mapping as the sync pipeline."""
+    from ..models import Attraction
+    from ..repositories.attraction_blob_repository import AttractionBlobRepository
+    from ..services.attractions_service import AttractionsService
+    from datetime import datetime
+
+    collection = Attraction._get_collection()
+    now = datetime.utcnow()
+    batch: List[dict] = []
+    blobs: Dict[str, dict] = {}
+    inserted = 0
+    for index, place in enumerate(iter_places(count)):
+        doc = AttractionsService._details_to_document(place)
+        # Same hot/cold split as AttractionRepository.bulk_upsert
+        blobs[doc['place_id']] = {'raw_data': doc.pop('raw_data'), 'reviews': doc.pop('reviews')}
+        doc.update({
+            'likes': index % 97,
+            'is_featured': index % 50 == 0,
+            'description': '',
+            'category': (place.get('types') or [''])[0],
+            'raw_data': {},
+            'reviews': [],
+            'created_at': now,
+            'updated_at': now,
+        })
+        batch.append(doc)
+        if len(batch) >= batch_size:
+            AttractionBlobRepository.save_many(blobs)
+            collection.insert_many(batch, ordered=False)
+            inserted += len(batch)
+            batch, blobs = [], {}
+            if log_every and inserted % log_every == 0:
+                logger.info("Seeded %d/%d attractions", inserted, count)
+    if batch:
+        AttractionBlobRepository.save_many(blobs)
+        collection.insert_many(batch, ordered=False)
+        inserted += len(batch)
+    return inserted
+
+
+def seed_user_compilations(dataset_size: int, compilations: int = 5, items_per_compilation: int = 20):
+    """Create the benchmark user with compilations referencing seeded attractions."""
+    from ..models import Attraction, Compilation, CompilationItem, User
+
+    user = User(email=BENCH_USER_EMAIL, first_name='Bench', last_name='User')
+    user.set_password('bench-password')
+    user.save()
+
+    step = max(1, dataset_size // max(1, compilations * items_per_compilation))
+    wanted = [place_id_for((i * step) % dataset_size) for i in range(compilations * items_per_compilation)]
+    ids_by_place = {
+        row['place_id']: row['_id']
+        for row in Attraction._get_collection().find({'place_id': {'$in': wanted}}, {'place_id': 1})
+    }
+    for c in range(compilations):
+        comp = Compilation(name=f'Bench trip {c}', owner=user, profile='tourist', country='France')
+        chunk = wanted[c * items_per_compilation:(c + 1) * items_per_compilation]
+        for order, pid in enumerate(chunk):
+            if pid in ids_by_place:
+                comp.items.append(CompilationItem(attraction=Attraction(id=ids_by_place[pid]), order_index=order))
+        comp.save()
+    return user
@@ -0,0 +1,348 @@
+"""Pluggable result caches used by the services layer.
+
+Two backends are available:
+- ``LocalLRUCache``: in-process, O(1) LRU eviction, per-entry TTL and a byte budget.
+- ``SQLiteCache``: shared by every worker process on the node through a single
+  SQLite file (WAL mode), with the same TTL / LRU / byte-budget semantics.
+
+Values must be JSON-native (they are the mapped attraction dicts returned by the
+services). ``LocalLRUCache`` keeps the value objects themselves, while
+``SQLiteCache`` stores JSON and reads back equal copies; values that are not
+JSON-native (ObjectId, datetime...) raise TypeError instead of coming back as
+strings. Use ``get_cache(name)`` to obtain the cache configured in
+``settings.ATTRACTIONS_CACHES``.
+"""
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+import json
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+def _dumps(value: Any) -> bytes:
+    # No `default=`: a value the local backend would return as is must not come back stringified
+    return json.dumps(value, separators=(',', ':')).encode('utf-8')
+
+
+def _loads(raw: bytes) -> Any:
+    return json.loads(raw)
+
+
+class BaseCache(ABC):
+    """Common interface and hit/miss accounting for cache backends."""
+
+    def __init__(self, default_ttl: float = 300, max_entries: int = 512, max_bytes: Optional[int] = None):
+        self.default_ttl = default_ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._stats_lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'sets': 0, 'evictions': 0, 'expirations': 0}
+
+    def _count(self, key: str, n: int = 1) -> None:
+        with self._stats_lock:
+            self._stats[key] += n
+
+    @abstractmethod
+    def get(self, key: str, default: Any = None) -> Any:
+        ...
+
+    @abstractmethod
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        ...
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        ...
+
+    @abstractmethod
+    def clear(self) -> None:
+        ...
+
+    @abstractmethod
+    def __len__(self) -> int:
+        ...
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def stats(self) -> Dict[str, Any]:
+        """Return a snapshot of hit/miss counters for this process."""
+        with self._stats_lock:
+            snapshot = dict(self._stats)
+        lookups = snapshot['hits'] + snapshot['misses']
+        snapshot['hit_ratio'] = (snapshot['hits'] / lookups) if lookups else 0.0
+        snapshot['entries'] = len(self)
+        return snapshot
+
+
+class LocalLRUCache(BaseCache):
+    """Thread-safe in-process LRU cache with per-entry TTL and a byte budget."""
+
+    def __init__(self, default_ttl: float = 300, max_entries: int = 512, max_bytes: Optional[int] = None):
+        super().__init__(default_ttl=default_ttl, max_entries=max_entries, max_bytes=max_bytes)
+        # key -> (value, expires_at, size)
+        self._data: "OrderedDict[str, Tuple[Any, float, int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str, default: Any = None) -> Any:
+        now = time.time()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self._count('misses')
+                return default
+            value, expires_at, size = entry
+            if expires_at <= now:
+                del self._data[key]
+                self._bytes -= size
+                self._count('expirations')
+                self._count('misses')
+                return default
+            self._data.move_to_end(key)
+        self._count('hits')
+        return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        # Only pay for a size estimate when a byte budget is configured
+        size = len(_dumps(value)) if self.max_bytes else 0
+        if self.max_bytes and size > self.max_bytes:
+            logger.debug("Cache entry %s (%d bytes) exceeds max_bytes; not cached", key, size)
+            return
+        expires_at = time.time() + (self.default_ttl if ttl is None else ttl)
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self._bytes -= old[2]
+            self._data[key] = (value, expires_at, size)
+            self._bytes += size
+            evicted = 0
+            while len(self._data) > self.max_entries or (self.max_bytes and self._bytes > self.max_bytes):
+                _, (_, _, old_size) = self._data.popitem(last=False)
+                self._bytes -= old_size
+                evicted += 1
+        self._count('sets')
+        if evicted:
+            self._count('evictions', evicted)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self._bytes -= old[2]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def __len__(self) -> int:
+        """Number of live entries; expired ones are purged first."""
+        now = time.time()
+        with self._lock:
+            expired = [key for key, (_, expires_at, _) in self._data.items() if expires_at <= now]
+            for key in expired:
+                self._bytes -= self._data.pop(key)[2]
+            count = len(self._data)
+        if expired:
+            self._count('expirations', len(expired))
+        return count
+
+    def stats(self) -> Dict[str, Any]:
+        snapshot = super().stats()
+        snapshot['bytes'] = self._bytes
+        return snapshot
+
+
+class SQLiteCache(BaseCache):
+    """Cross-process cache stored in a local SQLite file.
+
+    Every gunicorn worker on the node opens the same file, so a result fetched by
+    one worker is served warm to all others. Eviction deletes the least recently
+    used rows through an index on ``accessed_at`` instead of sorting in Python.
+    """
+
+    _SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS cache ("
+        " key TEXT PRIMARY KEY,"
+        " value BLOB NOT NULL,"
+        " size INTEGER NOT NULL,"
+        " expires_at REAL NOT NULL,"
+        " accessed_at REAL NOT NULL)",
+        "CREATE INDEX IF NOT EXISTS cache_accessed_at ON cache (accessed_at)",
+        "CREATE INDEX IF NOT EXISTS cache_expires_at ON cache (expires_at)",
+    )
+
+    def __init__(self, path: Optional[str] = None, default_ttl: float = 300, max_entries: int = 512,
+                 max_bytes: Optional[int] = None, namespace: str = 'default'):
+        super().__init__(default_ttl=default_ttl, max_entries=max_entries, max_bytes=max_bytes)
+        self.path = path or os.path.join(tempfile.gettempdir(), f'tripexplorer-cache-{namespace}.sqlite3')
+        self._local = threading.local()
+        with self._connection() as conn:
+            for statement in self._SCHEMA:
+                conn.execute(statement)
+
+    def _connection(self) -> sqlite3.Connection:
+        # sqlite3 connections must not be shared across threads
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str, default: Any = None) -> Any:
+        now = time.time()
+        try:
+            conn = self._connection()
+            row = conn.execute('SELECT value, expires_at FROM cache WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                self._count('misses')
+                return default
+            raw, expires_at = row
+            if expires_at <= now:
+                conn.execute('DELETE FROM cache WHERE key = ? AND expires_at <= ?', (key, now))
+                self._count('expirations')
+                self._count('misses')
+                return default
+            conn.execute('UPDATE cache SET accessed_at = ? WHERE key = ?', (now, key))
+            value = _loads(raw)
+        except sqlite3.Error as e:
+            logger.warning("SQLiteCache.get failed for %s: %s", key, e)
+            self._count('misses')
+            return default
+        self._count('hits')
+        return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        raw = _dumps(value)
+        size = len(raw)
+        if self.max_bytes and size > self.max_bytes:
+            logger.debug("Cache entry %s (%d bytes) exceeds max_bytes; not cached", key, size)
+            return
+        now = time.time()
+        expires_at = now + (self.default_ttl if ttl is None else ttl)
+        try:
+            conn = self._connection()
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                conn.execute(
+                    'INSERT OR REPLACE INTO cache (key, value, size, expires_at, accessed_at) VALUES (?, ?, ?, ?, ?)',
+                    (key, raw, size, expires_at, now),
+                )
+                evicted = self._evict(conn, now)
+                conn.execute('COMMIT')
+            except Exception:
+                conn.execute('ROLLBACK')
+                raise
+        except sqlite3.Error as e:
+            logger.warning("SQLiteCache.set failed for %s: %s", key, e)
+            return
+        self._count('sets')
+        if evicted:
+            self._count('evictions', evicted)
+
+    def _evict(self, conn: sqlite3.Connection, now: float) -> int:
+        evicted = conn.execute('DELETE FROM cache WHERE expires_at <= ?', (now,)).rowcount
+        count = conn.execute('SELECT COUNT(*) FROM cache').fetchone()[0]
+        if count > self.max_entries:
+            evicted += conn.execute(
+                'DELETE FROM cache WHERE key IN (SELECT key FROM cache ORDER BY accessed_at LIMIT ?)',
+                (count - self.max_entries,),
+            ).rowcount
+        if self.max_bytes:
+            total = conn.execute('SELECT COALESCE(SUM(size), 0) FROM cache').fetchone()[0]
+            while total > self.max_bytes:
+                row = conn.execute('SELECT key, size FROM cache ORDER BY accessed_at LIMIT 1').fetchone()
+                if row is None:
+                    break
+                conn.execute('DELETE FROM cache WHERE key = ?', (row[0],))
+                total -= row[1]
+                evicted += 1
+        return evicted
+
+    def delete(self, key: str) -> None:
+        try:
+            self._connection().execute('DELETE FROM cache WHERE key = ?', (key,))
+        except sqlite3.Error as e:
+            logger.warning("SQLiteCache.delete failed for %s: %s", key, e)
+
+    def clear(self) -> None:
+        try:
+            self._connection().execute('DELETE FROM cache')
+        except sqlite3.Error as e:
+            logger.warning("SQLiteCache.clear failed: %s", e)
+
+    def __len__(self) -> int:
+        try:
+            return self._connection().execute('SELECT COUNT(*) FROM cache WHERE expires_at > ?', (time.time(),)).fetchone()[0]
+        except sqlite3.Error:
+            return 0
+
+    def stats(self) -> Dict[str, Any]:
+        snapshot = super().stats()
+        try:
+            snapshot['bytes'] = self._connection().execute('SELECT COALESCE(SUM(size), 0) FROM cache').fetchone()[0]
+        except sqlite3.Error:
+            snapshot['bytes'] = None
+        return snapshot
+
+
+_BACKENDS = {
+    'local': LocalLRUCache,
+    'sqlite': SQLiteCache,
+}
+
+_caches: Dict[str, BaseCache] = {}
+_caches_lock = threading.Lock()
+
+
+def build_cache(name: str, options: Optional[Dict[str, Any]] = None) -> BaseCache:
+    """Instantiate a cache from an options dict (BACKEND, TTL, MAX_ENTRIES, MAX_BYTES, PATH)."""
+    options = dict(options or {})
+    backend = str(options.get('BACKEND', 'local')).lower()
+    if backend not in _BACKENDS:
+        raise ValueError(f"Unknown cache backend {backend!r} for cache {name!r}")
+    kwargs: Dict[str, Any] = {
+        'default_ttl': float(options.get('TTL', 300)),
+        'max_entries': int(options.get('MAX_ENTRIES', 512)),
+        'max_bytes': int(options['MAX_BYTES']) if options.get('MAX_BYTES') else None,
+    }
+    if backend == 'sqlite':
+        kwargs['path'] = options.get('PATH') or None
+        kwargs['namespace'] = name
+    return _BACKENDS[backend](**kwargs)
+
+
+def get_cache(name: str) -> BaseCache:
+    """Return the process-wide cache configured under ``settings.ATTRACTIONS_CACHES[name]``."""
+    cache = _caches.get(name)
+    if cache is not None:
+        return cache
+    with _caches_lock:
+        cache = _caches.get(name)
+        if cache is None:
+            try:
+                from django.conf import settings
+                options = (getattr(settings, 'ATTRACTIONS_CACHES', {}) or {}).get(name, {})
+            except Exception:
+                options = {}
+            try:
+                cache = build_cache(name, options)
+            except Exception as e:
+                logger.error("Failed to build cache %r (%s); falling back to in-process LRU", name, e)
+                cache = LocalLRUCache()
+            _caches[name] = cache
+    return cache
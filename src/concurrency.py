@@ -0,0 +1,160 @@
+"""Concurrency helpers shared by the external services and the services layer."""
+from __future__ import annotations
+
+from typing import Any, Awaitable, Callable, Dict, Hashable
+import asyncio
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class _Call:
+    __slots__ = ('event', 'result', 'error', 'waiters')
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result: Any = None
+        self.error: BaseException | None = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Coalesce concurrent calls sharing the same key into one execution.
+
+    The first caller for a key runs ``fn``; callers arriving while it is in flight
+    block until it finishes and receive the same result (or exception). Nothing is
+    cached once the call completes — that is the job of the caches in ``src.cache``.
+    """
+
+    def __init__(self, name: str = 'singleflight'):
+        self.name = name
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self._stats = {'calls': 0, 'executions': 0, 'coalesced': 0, 'errors': 0}
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            self._stats['calls'] += 1
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                self._stats['coalesced'] += 1
+                leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                self._stats['executions'] += 1
+                leader = True
+
+        if not leader:
+            logger.debug("%s: coalesced call for key=%r", self.name, key)
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            with self._lock:
+                self._stats['errors'] += 1
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.event.set()
+        return call.result
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            snapshot = dict(self._stats)
+        snapshot['in_flight'] = self.in_flight()
+        return snapshot
+
+
+def run_sync(awaitable: Awaitable[Any]) -> Any:
+    """Run a coroutine to completion from synchronous code.
+
+    Django views and management commands run without an event loop, so this is
+    normally ``asyncio.run``. If a loop is already running in this thread (async
+    view, notebook), the coroutine runs on a fresh loop in a helper thread instead.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(awaitable)
+
+    box: Dict[str, Any] = {}
+
+    def runner():
+        try:
+            box['result'] = asyncio.run(awaitable)
+        except BaseException as e:
+            box['error'] = e
+
+    thread = threading.Thread(target=runner, name='run-sync', daemon=True)
+    thread.start()
+    thread.join()
+    if 'error' in box:
+        raise box['error']
+    return box.get('result')
+
+
+class BackgroundRefresher:
+    """Run refresh jobs on a small thread pool, at most one in flight per key.
+
+    Used for stale-while-revalidate: the request that notices a stale entry
+    schedules the refresh and returns immediately with the stale value.
+    """
+
+    def __init__(self, name: str = 'refresh', max_workers: int = 2):
+        self.name = name
+        self.max_workers = max_workers
+        self._lock = threading.Lock()
+        self._pending: Dict[Hashable, Any] = {}
+        self._executor = None
+        self._stats = {'scheduled': 0, 'deduplicated': 0, 'completed': 0, 'errors': 0}
+
+    def submit(self, key: Hashable, fn: Callable[[], Any]):
+        """Schedule ``fn`` unless a refresh for ``key`` is already pending. Returns its future."""
+        from concurrent.futures import ThreadPoolExecutor
+
+        with self._lock:
+            future = self._pending.get(key)
+            if future is not None:
+                self._stats['deduplicated'] += 1
+                return future
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=self.name)
+            self._stats['scheduled'] += 1
+
+            def run():
+                try:
+                    result = fn()
+                    with self._lock:
+                        self._stats['completed'] += 1
+                    return result
+                except Exception as e:
+                    with self._lock:
+                        self._stats['errors'] += 1
+                    logger.warning("%s: refresh failed for key=%r: %s", self.name, key, e)
+                    return None
+                finally:
+                    with self._lock:
+                        self._pending.pop(key, None)
+
+            future = self._executor.submit(run)
+            self._pending[key] = future
+            return future
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            snapshot = dict(self._stats)
+            snapshot['pending'] = len(self._pending)
+        return snapshot
@@ -14,6 +14,10 @@ class AttractionsController:
     def search(params: Dict[str, Any]):
         return AttractionsService.search(params)
 
+    @staticmethod
+    def search_page(params: Dict[str, Any]):
+        return AttractionsService.search_page(params)
+
     @staticmethod
     def get_by_place_id(place_id: str):
         return AttractionsService.get_by_place_id(place_id)
@@ -5,6 +5,7 @@ from typing import Any, Dict
 from rest_framework.exceptions import ValidationError, NotFound
 
 from ..models import Attraction, Compilation, CompilationItem
+from ..repositories.compilation_repository import CompilationRepository
 from ..serializers import CompilationSerializer
 
 
@@ -27,7 +28,7 @@ class CompilationsController:
 
         # Prevent duplicates
         for item in compilation.items:
-            if getattr(item.attraction, 'id', None) == getattr(attraction, 'id', None):
+            if CompilationRepository.attraction_id(item) == getattr(attraction, 'id', None):
                 raise ValidationError({'error': 'Attraction already in compilation'})
 
         new_item = CompilationItem(attraction=attraction, order_index=payload.get('order_index', 0))
@@ -58,40 +59,27 @@ class CompilationsController:
         # Normalize attraction_id for comparison (can be string, ObjectId, or number)
         attraction_id_normalized = str(attraction_id).strip()
         
+        # Resolve every referenced attraction in one query instead of dereferencing per item
+        attractions = CompilationRepository.attractions_for([compilation])
+
         # Filter items: keep only those that don't match the attraction_id
         filtered_items = []
         for item in compilation.items:
             try:
-                # Safely get attraction ID
-                item_attraction = getattr(item, 'attraction', None)
-                if item_attraction is None:
+                item_attraction_id = CompilationRepository.attraction_id(item)
+                if item_attraction_id is None:
                     # Skip items with no attraction reference
                     continue
-                
-                # Try to get the ID - this may fail if reference is broken
-                try:
-                    item_attraction_id = getattr(item_attraction, 'id', None)
-                    if item_attraction_id is None:
-                        item_attraction_id_str = None
-                    else:
-                        # Normalize to string for comparison
-                        item_attraction_id_str = str(item_attraction_id).strip()
-                except Exception as e:
-                    # Reference is broken, skip this item
-                    logger.debug(f"Skipping item with broken reference: {e}")
-                    continue
-                
+                item_attraction_id_str = str(item_attraction_id).strip()
+
                 # Also try place_id as fallback
-                item_place_id = None
-                try:
-                    item_place_id = str(getattr(item_attraction, 'place_id', None) or '').strip()
-                except Exception:
-                    pass
-                
+                attraction = attractions.get(item_attraction_id)
+                item_place_id = str(getattr(attraction, 'place_id', None) or '').strip()
+
                 # Compare both id and place_id
-                matches_id = item_attraction_id_str and item_attraction_id_str == attraction_id_normalized
+                matches_id = item_attraction_id_str == attraction_id_normalized
                 matches_place_id = item_place_id and item_place_id == attraction_id_normalized
-                
+
                 if not (matches_id or matches_place_id):
                     filtered_items.append(item)
                 else:
@@ -118,63 +106,8 @@ class CompilationsController:
 
         # Serialize after all modifications with error handling
         try:
-            # Get serialized data
+            # Already JSON-native (string ids, ISO dates)
             result = CompilationSerializer(compilation).data
-            
-            # Final cleanup: ensure all ObjectIds are converted to strings
-            def clean_objectids(obj):
-                """Final cleanup pass for ObjectIds."""
-                if obj is None:
-                    return None
-                
-                # Try to import bson for proper isinstance check
-                try:
-                    from bson import ObjectId as BsonObjectId
-                    if isinstance(obj, BsonObjectId):
-                        return str(obj)
-                except:
-                    pass
-                
-                # Check for ObjectId by class name
-                if hasattr(obj, '__class__'):
-                    class_name = obj.__class__.__name__
-                    type_str = str(type(obj)).lower()
-                    if class_name == 'ObjectId' or 'ObjectId' in type_str:
-                        return str(obj)
-                
-                # Check for MongoEngine BaseList and similar special types (must be before list check)
-                if hasattr(obj, '__class__'):
-                    type_str = str(type(obj)).lower()
-                    class_name = obj.__class__.__name__
-                    # MongoEngine BaseList, EmbeddedDocumentList, etc. need special handling
-                    if 'mongoengine' in type_str and ('baselist' in class_name.lower() or 'list' in class_name.lower()):
-                        # Convert MongoEngine list-like types to Python list
-                        return [clean_objectids(item) for item in obj]
-                
-                # Handle dictionaries
-                if isinstance(obj, dict):
-                    return {k: clean_objectids(v) for k, v in obj.items()}
-                
-                # Handle regular Python lists
-                if isinstance(obj, list):
-                    return [clean_objectids(item) for item in obj]
-                
-                # Handle sets
-                if isinstance(obj, set):
-                    return {clean_objectids(item) for item in obj}
-                
-                # Handle other iterables (tuples, etc.) - but skip strings and bytes
-                if hasattr(obj, '__iter__') and not isinstance(obj, (str, bytes)):
-                    try:
-                        # Convert to list for safety (handles BaseList and similar)
-                        return [clean_objectids(item) for item in obj]
-                    except (TypeError, AttributeError):
-                        # If iteration fails, return as-is
-                        return obj
-                
-                return obj
-            
-            result = clean_objectids(result)
             logger.debug(f"Serialization successful, returning {len(result.get('items', []))} items")
             return result
         except Exception as e:
@@ -1,13 +1,81 @@
 import googlemaps
 from django.conf import settings
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+import asyncio
+import functools
 import logging
+import threading
+import time
 import traceback
 
+from .cache import get_cache
+from .concurrency import SingleFlight, run_sync
+from .place_types import matching_mask, type_mask
+from .places_transport import RecordingPlacesClient, ReplayPlacesClient
+from .repositories.place_details_repository import PlaceDetailsRepository
+
 logger = logging.getLogger(__name__)
 
+# Google returns at most 3 pages of 20 results per search
+GOOGLE_PAGE_SIZE = 20
+GOOGLE_MAX_PAGES = 3
+# Statuses of a page that was served, even if it holds no (or no matching) results
+GOOGLE_PAGE_OK_STATUSES = ('OK', 'ZERO_RESULTS')
+
+
+def _normalize_query(query):
+    return ' '.join(str(query or '').lower().split())
+
+
+def _normalize_location(location):
+    if not location:
+        return None
+    if isinstance(location, str):
+        parts = [p.strip() for p in location.split(',')]
+    elif isinstance(location, dict):
+        parts = [location.get('lat'), location.get('lng')]
+    else:
+        parts = list(location)
+    try:
+        return tuple(round(float(p), 6) for p in parts[:2])
+    except (TypeError, ValueError):
+        return str(location)
+
+
 class GooglePlacesService:
-    def __init__(self):
+    def __init__(self, client=None):
+        """Create the service.
+
+        `client` may be any object exposing the googlemaps `places`, `places_nearby`
+        and `place` methods (e.g. a replay or stub client). Otherwise the transport
+        is chosen by settings.GOOGLE_PLACES_TRANSPORT: 'live' (default), 'record'
+        (live calls saved as fixtures) or 'replay' (fixtures only, no network).
+        """
+        # Concurrent identical searches share one upstream request
+        self._search_flight = SingleFlight('places.search')
+        # Upstream request counters by googlemaps method
+        self._api_calls = {}
+        self._api_lock = threading.Lock()
+        # Background fetches of later result pages (next_page_token), by search key
+        self._prefetches = {}
+        self._prefetch_lock = threading.Lock()
+        self._prefetch_executor = None
         self.api_key = settings.GOOGLE_PLACES_API_KEY
+        if client is not None:
+            self.client = client
+            return
+        transport = str(getattr(settings, 'GOOGLE_PLACES_TRANSPORT', 'live') or 'live').lower()
+        fixture_dir = getattr(settings, 'GOOGLE_PLACES_FIXTURE_DIR', 'fixtures/places')
+        if transport == 'replay':
+            self.client = ReplayPlacesClient(
+                fixture_dir,
+                latency_ms=getattr(settings, 'GOOGLE_PLACES_REPLAY_LATENCY_MS', 0),
+                jitter_ms=getattr(settings, 'GOOGLE_PLACES_REPLAY_JITTER_MS', 0),
+                error_rate=getattr(settings, 'GOOGLE_PLACES_REPLAY_ERROR_RATE', 0.0),
+                seed=getattr(settings, 'GOOGLE_PLACES_REPLAY_SEED', None),
+            )
+            logger.info("Google Places client in replay mode (fixtures: %s)", fixture_dir)
+            return
         if not self.api_key:
             logger.warning("Google Places API key not configured")
             self.client = None
@@ -18,21 +86,101 @@ class GooglePlacesService:
             except Exception as e:
                 logger.exception("Failed to initialize googlemaps.Client: %s", e)
                 self.client = None
+            if self.client is not None and transport == 'record':
+                self.client = RecordingPlacesClient(self.client, fixture_dir)
+                logger.info("Google Places client in record mode (fixtures: %s)", fixture_dir)
     
-    def search_places(self, query, location=None, radius=None, place_type=None):
-        logger.debug("GooglePlacesService.search_places called with query=%r, location=%r, radius=%r, place_type=%r",
-                     query, location, radius, place_type)
+    @property
+    def aio(self):
+        """Async facade sharing this service's client and caches (created lazily)."""
+        aio = getattr(self, '_aio', None)
+        if aio is None:
+            with _aio_lock:
+                aio = getattr(self, '_aio', None)
+                if aio is None:
+                    aio = AsyncGooglePlacesService(
+                        self, max_concurrency=getattr(settings, 'GOOGLE_PLACES_MAX_CONCURRENCY', 8)
+                    )
+                    self._aio = aio
+        return aio
+
+    def get_place_details_many(self, place_ids, fields=None):
+        """Fetch details for many places concurrently. Returns {place_id: details} (missing ones omitted)."""
+        return run_sync(self.aio.get_place_details_many(place_ids, fields=fields))
+
+    def _record_api_call(self, method):
+        with self._api_lock:
+            self._api_calls[method] = self._api_calls.get(method, 0) + 1
+
+    def api_stats(self):
+        """Number of upstream Google Places requests made by this process, by method and in total."""
+        with self._api_lock:
+            stats = dict(self._api_calls)
+        stats['total'] = sum(stats.values())
+        return stats
+
+    def coalescing_stats(self):
+        """Counters for the single-flight layer (calls, executions, coalesced, errors, in_flight)."""
+        return self._search_flight.stats()
+
+    def search_places(self, query, location=None, radius=None, place_type=None, limit=None):
+        """Search results, following next_page_token when `limit` exceeds one page (max 60).
+
+        Without `limit` only the first page is awaited; later pages are still
+        prefetched in the background so a follow-up request for more is served
+        from the cache.
+        """
+        key = (
+            'search_places',
+            _normalize_query(query),
+            _normalize_location(location),
+            int(radius or 5000) if location else None,
+            (place_type or '').lower() or None,
+        )
+        fetch_page = lambda token: self._search_places_page(query, location, radius, place_type, token)
+        results = self._search_flight.do(key, lambda: self._paged_results(key, fetch_page))
+        # Waited for outside the flight: coalesced callers may ask for different limits
+        results = self._await_pages(key, results, limit or GOOGLE_PAGE_SIZE)
+        return list(results)[:limit] if limit else list(results)[:GOOGLE_PAGE_SIZE]
+
+    def search_places_page(self, query, location=None, radius=None, place_type=None, page_token=None):
+        """One page (up to 20 results) of a search. Returns (results, next_page_token)."""
+        key = (
+            'search_places_page',
+            _normalize_query(query),
+            _normalize_location(location),
+            int(radius or 5000) if location else None,
+            (place_type or '').lower() or None,
+            page_token,
+        )
+        results, next_token, _ = self._search_flight.do(
+            key, lambda: self._search_places_page(query, location, radius, place_type, page_token)
+        )
+        return list(results), next_token
+
+    def _search_places_page(self, query, location=None, radius=None, place_type=None, page_token=None):
+        """(results, next_page_token, status) of one search page; results are filtered by place_type.
+
+        `status` is Google's own status for the page (None when unknown), so callers
+        can tell a page filtered down to nothing from one that was not served.
+        """
+        logger.debug("GooglePlacesService.search_places called with query=%r, location=%r, radius=%r, place_type=%r, page_token=%r",
+                     query, location, radius, place_type, bool(page_token))
         if not self.client:
             logger.warning("GooglePlacesService.client is None — returning empty list")
-            return []
+            return [], None, None
+        # Only sent when continuing a search, so first-page requests are unchanged
+        token_kwargs = {'page_token': page_token} if page_token else {}
         try:
             if location:
                 logger.debug("Calling places_nearby with location=%r radius=%r type=%r keyword=%r", location, radius or 5000, place_type, query)
+                self._record_api_call('places_nearby')
                 places_result = self.client.places_nearby(
                     location=location,
                     radius=radius or 5000,
                     type=place_type,
-                    keyword=query
+                    keyword=query,
+                    **token_kwargs
                 )
             else:
                 logger.debug("Calling places (text search) with query=%r type=%r", query, place_type)
@@ -49,18 +197,19 @@ class GooglePlacesService:
                         query = query_with_type
                 
                 # Call API - type filtering will happen in post-processing
-                places_result = self.client.places(query=query)
+                self._record_api_call('places')
+                places_result = self.client.places(query=query, **token_kwargs)
                 
                 # Filter by place_type if specified (since API doesn't support it in text search)
                 if place_type:
                     results_before = places_result.get('results', [])
-                    filtered_results = []
-                    for place in results_before:
-                        place_types = place.get('types', []) or []
-                        # Check if place_type matches any of the place's types
-                        if any(place_type.lower() == str(pt).lower() or place_type.lower() in str(pt).lower() 
-                               for pt in place_types):
-                            filtered_results.append(place)
+                    wanted = matching_mask(place_type, bidirectional=False)
+                    if wanted:
+                        filtered_results = [place for place in results_before if type_mask(place.get('types')) & wanted]
+                    else:
+                        needle = place_type.lower()
+                        filtered_results = [place for place in results_before
+                                            if any(needle in str(pt).lower() for pt in place.get('types', []) or [])]
                     places_result['results'] = filtered_results
                     logger.info(f"Filtered results by type '{place_type}': {len(results_before)} -> {len(filtered_results)}")
             results = places_result.get('results', [])
@@ -68,25 +217,49 @@ class GooglePlacesService:
             # Log a small sample of place_ids for inspection
             sample_ids = [r.get('place_id') for r in results[:5]]
             logger.debug("Sample place_ids: %s", sample_ids)
-            return results
+            return results, places_result.get('next_page_token'), places_result.get('status', 'OK')
         except Exception as e:
             logger.error(f"Google Places API error: {e}")
             logger.debug(traceback.format_exc())
-            return []
+            # googlemaps raises ApiError (carrying the status) for non-OK responses
+            return [], None, getattr(e, 'status', None)
     
-    def get_place_details(self, place_id, fields=None):
+    DEFAULT_DETAIL_FIELDS = [
+        'place_id', 'name', 'formatted_address', 'geometry',
+        'rating', 'user_ratings_total', 'price_level', 'type',
+        'opening_hours', 'photo', 'reviews', 'website', 'formatted_phone_number'
+    ]
+
+    def get_place_details(self, place_id, fields=None, use_cache=True):
+        """Return place details, served from the persistent details cache when fresh.
+
+        Only the stale fields of a cached entry are re-requested from Google. If the
+        upstream call fails, the (stale) cached payload is returned instead.
+        """
         logger.debug("GooglePlacesService.get_place_details called for place_id=%r fields=%r", place_id, fields)
+        fields_to_request = list(fields or self.DEFAULT_DETAIL_FIELDS)
+        cached, stale = None, fields_to_request
+        if use_cache:
+            cached, stale = PlaceDetailsRepository.lookup(place_id, fields_to_request)
+            if cached is not None and not stale:
+                logger.debug("Place details cache hit for place_id=%s", place_id)
+                return cached
         if not self.client:
             logger.warning("GooglePlacesService.client is None — cannot fetch place details")
-            return None
+            return cached
+        fetch_fields = stale if cached is not None else fields_to_request
+        result = self._fetch_place_details(place_id, fetch_fields)
+        if not result:
+            return cached
+        if use_cache:
+            result = PlaceDetailsRepository.merge(cached, result, fetch_fields)
+            PlaceDetailsRepository.store(place_id, fields_to_request, result, fetch_fields)
+        return result
+
+    def _fetch_place_details(self, place_id, fields_to_request):
         try:
-            default_fields = [
-                'place_id', 'name', 'formatted_address', 'geometry',
-                'rating', 'user_ratings_total', 'price_level', 'type',
-                'opening_hours', 'photo', 'reviews', 'website', 'formatted_phone_number'
-            ]
-            fields_to_request = fields or default_fields
             logger.debug("Requesting place details for %s fields=%s", place_id, fields_to_request)
+            self._record_api_call('place')
             place_details = self.client.place(
                 place_id=place_id,
                 fields=fields_to_request
@@ -103,10 +276,133 @@ class GooglePlacesService:
             return None
     
     def search_attractions_by_country(self, country, limit=20, profile='tourist', city=None):
-        logger.debug("GooglePlacesService.search_attractions_by_country called for country=%r city=%r limit=%s profile=%s", country, city, limit, profile)
+        # The key does not include limit: callers asking for different limits share
+        # one call (and the cached pages), then each waits for as many pages as it needs.
+        key = (
+            'search_attractions_by_country',
+            _normalize_query(country),
+            _normalize_query(city) or None,
+            (profile or '').lower(),
+        )
+        fetch_page = lambda token: self._search_attractions_page(country, profile=profile, city=city, page_token=token)
+        results = self._search_flight.do(key, lambda: self._paged_results(key, fetch_page))
+        results = self._await_pages(key, results, limit)
+        return list(results)[:limit]
+
+    @staticmethod
+    def _pages_cache_key(key):
+        return '|'.join(str(part) for part in key)
+
+    def _paged_results(self, key, fetch_page):
+        """Cached results of a paged search, or its first page.
+
+        The first page is fetched inline. If Google returns a next_page_token, the
+        remaining pages are fetched in the background (each token only becomes valid
+        after a short delay) and the complete list is cached under the search key;
+        see _await_pages.
+        """
+        cache_key = self._pages_cache_key(key)
+        cached = _pages_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        results, token, _ = fetch_page(None)
+        if not token:
+            if results:
+                _pages_cache.set(cache_key, results)
+            return results
+        self._prefetch_pages(cache_key, results, token, fetch_page)
+        return results
+
+    def _await_pages(self, key, results, limit):
+        """`results`, or the complete list once the background pages of `key` are in.
+
+        Only waits when `limit` is larger than what `results` holds and a prefetch
+        of later pages is running.
+        """
+        if limit <= len(results):
+            return results
+        cache_key = self._pages_cache_key(key)
+        with self._prefetch_lock:
+            future = self._prefetches.get(cache_key)
+        if future is None:
+            cached = _pages_cache.get(cache_key)
+            return cached if cached is not None else results
+        try:
+            return future.result(timeout=float(getattr(settings, 'GOOGLE_PLACES_PAGE_WAIT_S', 10)))
+        except FutureTimeoutError:
+            logger.info("Later result pages for %s not ready; returning the first %d results", key[0], len(results))
+            return results
+
+    def _prefetch_pages(self, cache_key, first_results, token, fetch_page):
+        with self._prefetch_lock:
+            future = self._prefetches.get(cache_key)
+            if future is not None:
+                return future
+            if self._prefetch_executor is None:
+                self._prefetch_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='places-pages')
+
+            def run():
+                results = list(first_results)
+                pages = 1
+                try:
+                    next_token = token
+                    while next_token and pages < GOOGLE_MAX_PAGES:
+                        page = self._fetch_next_page(fetch_page, next_token)
+                        if page is None:
+                            break
+                        page_results, next_token = page
+                        results.extend(page_results)
+                        pages += 1
+                    _pages_cache.set(cache_key, results)
+                    logger.debug("Prefetched %d pages (%d results) for %s", pages, len(results), cache_key)
+                except Exception as e:
+                    logger.warning("Prefetching result pages for %s failed after %d pages: %s", cache_key, pages, e)
+                finally:
+                    with self._prefetch_lock:
+                        self._prefetches.pop(cache_key, None)
+                return results
+
+            future = self._prefetch_executor.submit(run)
+            self._prefetches[cache_key] = future
+            return future
+
+    @staticmethod
+    def _fetch_next_page(fetch_page, token):
+        """(results, next_token) of the page behind `token`, waiting for Google to activate it.
+
+        Retries go by Google's status rather than the results, which may have been
+        filtered down to nothing on a valid page. None when the page was never served.
+        """
+        delay = float(getattr(settings, 'GOOGLE_PLACES_PAGE_TOKEN_DELAY_S', 2.0))
+        for attempt in range(3):
+            # Tokens used too early fail with INVALID_REQUEST
+            time.sleep(delay if attempt == 0 else max(delay / 2, 0.5))
+            results, next_token, status = fetch_page(token)
+            if status in GOOGLE_PAGE_OK_STATUSES:
+                return results, next_token
+        return None
+
+    def search_attractions_page(self, country, profile='tourist', city=None, page_token=None):
+        """One page of the profile-aware country/city search. Returns (results, next_page_token)."""
+        key = (
+            'search_attractions_page',
+            _normalize_query(country),
+            _normalize_query(city) or None,
+            (profile or '').lower(),
+            page_token,
+        )
+        results, next_token, _ = self._search_flight.do(
+            key, lambda: self._search_attractions_page(country, profile=profile, city=city, page_token=page_token)
+        )
+        return list(results), next_token
+
+    def _search_attractions_page(self, country, profile='tourist', city=None, page_token=None):
+        """(results, next_page_token, status) of one page; see _search_places_page."""
+        logger.debug("GooglePlacesService.search_attractions_by_country called for country=%r city=%r profile=%s", country, city, profile)
         if not self.client:
             logger.warning("GooglePlacesService.client is None — returning empty list for country search")
-            return []
+            return [], None, None
+        token_kwargs = {'page_token': page_token} if page_token else {}
         try:
             # Build location string (city takes precedence if provided)
             location_str = f"{city}, {country}" if city else country
@@ -126,19 +422,21 @@ class GooglePlacesService:
                 place_type = "tourist_attraction"
             
             logger.debug("Calling places text search for profile=%s in %s: query=%r type=%r", profile, location_str, query, place_type)
+            self._record_api_call('places')
             places_result = self.client.places(
                 query=query,
-                type=place_type
+                type=place_type,
+                **token_kwargs
             )
             results = places_result.get('results', [])
             logger.info("Google Places country/city search returned %d results for %s (profile=%s)", len(results), location_str, profile)
             sample_ids = [r.get('place_id') for r in results[:5]]
             logger.debug("Sample place_ids for %s: %s", location_str, sample_ids)
-            return results[:limit]
+            return results, places_result.get('next_page_token'), places_result.get('status', 'OK')
         except Exception as e:
             logger.error(f"Google Places country search error: {e}")
             logger.debug(traceback.format_exc())
-            return []
+            return [], None, getattr(e, 'status', None)
     
     def search_restaurants_by_location(self, location, radius=5000, limit=20):
         logger.debug("search_restaurants_by_location called with location=%r radius=%s limit=%s", location, radius, limit)
@@ -146,6 +444,7 @@ class GooglePlacesService:
             logger.warning("GooglePlacesService.client is None — returning empty list for restaurant search")
             return []
         try:
+            self._record_api_call('places_nearby')
             places_result = self.client.places_nearby(
                 location=location,
                 radius=radius,
@@ -165,6 +464,7 @@ class GooglePlacesService:
             logger.warning("GooglePlacesService.client is None — returning empty list for hotel search")
             return []
         try:
+            self._record_api_call('places_nearby')
             places_result = self.client.places_nearby(
                 location=location,
                 radius=radius,
@@ -178,6 +478,54 @@ class GooglePlacesService:
             logger.debug(traceback.format_exc())
             return []
 
+_aio_lock = threading.Lock()
+# Complete multi-page search results, keyed by search (see _paged_results)
+_pages_cache = get_cache('places_pages')
+
+
+class AsyncGooglePlacesService:
+    """asyncio interface to GooglePlacesService with bounded concurrency.
+
+    googlemaps.Client is blocking, so each upstream call runs on a dedicated thread
+    pool whose size caps the number of requests in flight. Results still go through
+    the sync service, so single-flight coalescing and the details cache apply.
+    """
+
+    def __init__(self, service, max_concurrency=8):
+        self.service = service
+        self.max_concurrency = max(1, int(max_concurrency or 1))
+        self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix='places')
+
+    async def _run(self, fn, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(fn, *args, **kwargs))
+
+    async def search_places(self, query, location=None, radius=None, place_type=None, limit=None):
+        return await self._run(self.service.search_places, query, location=location, radius=radius, place_type=place_type, limit=limit)
+
+    async def search_attractions_by_country(self, country, limit=20, profile='tourist', city=None):
+        return await self._run(self.service.search_attractions_by_country, country, limit=limit, profile=profile, city=city)
+
+    async def get_place_details(self, place_id, fields=None, use_cache=True):
+        return await self._run(self.service.get_place_details, place_id, fields=fields, use_cache=use_cache)
+
+    async def get_place_details_many(self, place_ids, fields=None):
+        unique_ids = list(dict.fromkeys(pid for pid in place_ids if pid))
+        logger.debug("Fetching details for %d places (max_concurrency=%d)", len(unique_ids), self.max_concurrency)
+        results = await asyncio.gather(
+            *(self.get_place_details(pid, fields=fields) for pid in unique_ids),
+            return_exceptions=True,
+        )
+        details_by_id = {}
+        for pid, result in zip(unique_ids, results):
+            if isinstance(result, BaseException):
+                logger.error("Details fetch failed for %s: %s", pid, result)
+                continue
+            if result:
+                details_by_id[pid] = result
+        return details_by_id
+
+
 # Global instance
 google_places_service = GooglePlacesService()
 
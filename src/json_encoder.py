@@ -2,29 +2,26 @@ import json
 from rest_framework.utils.encoders import JSONEncoder
 
 try:
-    from bson import ObjectId
+    from bson import DBRef, ObjectId
     BSON_AVAILABLE = True
 except ImportError:
-    ObjectId = None
+    DBRef = ObjectId = None
     BSON_AVAILABLE = False
 
+# Classes encoded as their id string; isinstance against a tuple is one C call per object
+_ID_TYPES = (ObjectId, DBRef) if BSON_AVAILABLE else ()
+
 
 class MongoJSONEncoder(JSONEncoder):
     """Custom JSON encoder that handles MongoDB ObjectId and other non-serializable types."""
     
     def default(self, obj):
-        # Handle ObjectId
-        if BSON_AVAILABLE and isinstance(obj, ObjectId):
-            return str(obj)
-        # Fallback: check by class name
-        if hasattr(obj, '__class__'):
-            class_name = obj.__class__.__name__
-            if class_name == 'ObjectId' or 'ObjectId' in str(type(obj)):
-                return str(obj)
+        # Handle ObjectId / DBRef
+        if isinstance(obj, _ID_TYPES):
+            return str(obj.id) if isinstance(obj, DBRef) else str(obj)
         # Try parent encoder
         try:
             return super().default(obj)
         except TypeError:
             # If parent also fails, try to convert to string as last resort
             return str(obj)
-
@@ -1,32 +1,158 @@
-from rest_framework.renderers import JSONRenderer
+"""JSON renderers for API responses.
+
+MongoJSONRenderer encodes with orjson when it is installed: datetimes, UUIDs and
+dict/list subclasses (MongoEngine BaseDict/BaseList, pymongo SON, GeoJSON points)
+are serialized natively in Rust, and only Mongo ids and the few types orjson does
+not know go through `orjson_default`. Payloads orjson refuses outright (integers
+wider than 64 bits) are re-encoded with the stdlib encoder. Without orjson it
+falls back to the stdlib encoder. StdlibMongoJSONRenderer always uses the stdlib encoder (the previous
+behaviour), for comparisons or to opt out.
+
+NDJSON (``application/x-ndjson``, one JSON document per line) is available for
+list endpoints: NDJSONRenderer makes content negotiation accept it, and
+`ndjson_response` streams the items of a list one line at a time.
+"""
+from rest_framework.renderers import BaseRenderer, JSONRenderer
 from rest_framework.utils import encoders
 import json
+import logging
+
+from django.http import StreamingHttpResponse
+
+logger = logging.getLogger(__name__)
+
+NDJSON_MEDIA_TYPE = 'application/x-ndjson'
 
 try:
-    from bson import ObjectId
+    from bson import DBRef, ObjectId
     BSON_AVAILABLE = True
 except ImportError:
-    ObjectId = None
+    DBRef = ObjectId = None
     BSON_AVAILABLE = False
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+    ORJSON_AVAILABLE = False
+
+_ID_TYPES = (ObjectId, DBRef) if BSON_AVAILABLE else ()
+
 
 class MongoJSONEncoder(encoders.JSONEncoder):
     """Custom JSON encoder that handles MongoDB ObjectId."""
     
     def default(self, obj):
-        # Handle ObjectId
-        if BSON_AVAILABLE and isinstance(obj, ObjectId):
-            return str(obj)
-        # Fallback: check by class name
-        if hasattr(obj, '__class__'):
-            class_name = obj.__class__.__name__
-            if class_name == 'ObjectId' or 'ObjectId' in str(type(obj)):
-                return str(obj)
+        # Handle ObjectId / DBRef
+        if isinstance(obj, _ID_TYPES):
+            return str(obj.id) if isinstance(obj, DBRef) else str(obj)
         # Fallback to parent
         return super().default(obj)
 
 
+_fallback_encoder = MongoJSONEncoder()
+
+
+def orjson_default(obj):
+    """Types orjson does not encode itself; anything else goes to the stdlib encoder's rules."""
+    if isinstance(obj, _ID_TYPES):
+        return str(obj.id) if isinstance(obj, DBRef) else str(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    # Decimal, timedelta, bytes, lazy strings, querysets... (raises TypeError if unknown)
+    return _fallback_encoder.default(obj)
+
+
+if ORJSON_AVAILABLE:
+    # Non-str keys are accepted like the stdlib encoder does; aware UTC datetimes end in Z
+    # like DRF's encoder; numpy values (ranking) are encoded as numbers
+    _ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z | orjson.OPT_SERIALIZE_NUMPY
+
+
 class MongoJSONRenderer(JSONRenderer):
-    """Custom JSON renderer that uses MongoJSONEncoder."""
+    """Custom JSON renderer: orjson when available, else MongoJSONEncoder."""
     encoder_class = MongoJSONEncoder
 
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if not ORJSON_AVAILABLE:
+            return super().render(data, accepted_media_type, renderer_context)
+        if data is None:
+            return b''
+        options = _ORJSON_OPTIONS
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            # orjson only indents by 2
+            options |= orjson.OPT_INDENT_2
+        try:
+            ret = orjson.dumps(data, default=orjson_default, option=options)
+        except orjson.JSONEncodeError:
+            # e.g. an int wider than 64 bits, which orjson never encodes (not even via default)
+            return super().render(data, accepted_media_type, renderer_context)
+        # Same escaping as JSONRenderer: U+2028/U+2029 are valid JSON but not valid JavaScript
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
+
+
+class StdlibMongoJSONRenderer(MongoJSONRenderer):
+    """MongoJSONRenderer on the stdlib json encoder only."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return JSONRenderer.render(self, data, accepted_media_type, renderer_context)
+
+
+def dumps(obj) -> bytes:
+    """Compact UTF-8 JSON for `obj`, with the same type handling as MongoJSONRenderer."""
+    if ORJSON_AVAILABLE:
+        try:
+            return orjson.dumps(obj, default=orjson_default, option=_ORJSON_OPTIONS)
+        except orjson.JSONEncodeError:
+            pass
+    return json.dumps(obj, cls=MongoJSONEncoder, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+class NDJSONRenderer(BaseRenderer):
+    """Newline-delimited JSON: one line per item of a list, a single line otherwise.
+
+    Large lists are better served with `ndjson_response`, which streams them.
+    """
+    media_type = NDJSON_MEDIA_TYPE
+    format = 'ndjson'
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if isinstance(data, list):
+            return b''.join(dumps(item) + b'\n' for item in data)
+        return dumps(data) + b'\n'
+
+
+def wants_ndjson(request) -> bool:
+    """True when content negotiation picked NDJSON (Accept: application/x-ndjson or ?format=ndjson)."""
+    return getattr(getattr(request, 'accepted_renderer', None), 'media_type', None) == NDJSON_MEDIA_TYPE
+
+
+def ndjson_lines(items, serialize=None):
+    """Yield one encoded line per item, serializing each only when it is about to be sent.
+
+    Once streaming has started the status code is already sent, so a failure ends
+    the stream with an `{"error": ...}` line instead of a 500.
+    """
+    for item in items:
+        try:
+            line = dumps(serialize(item) if serialize else item)
+        except Exception as e:
+            logger.exception("NDJSON streaming failed")
+            yield dumps({'error': str(e)}) + b'\n'
+            return
+        yield line + b'\n'
+
+
+def ndjson_response(items, serialize=None, headers=None, status: int = 200) -> StreamingHttpResponse:
+    response = StreamingHttpResponse(ndjson_lines(items, serialize), content_type=NDJSON_MEDIA_TYPE, status=status)
+    # Ask reverse proxies (nginx) not to buffer, so the first lines reach the client right away
+    response['X-Accel-Buffering'] = 'no'
+    for key, value in (headers or {}).items():
+        response[key] = value
+    return response
@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand
+from pymongo import UpdateOne
+
+from src.models import Attraction
+from src.models.attraction import normalize_key
+from src.place_types import to_bytes as type_mask_bytes, type_mask
+
+
+def computed_keys(doc):
+    """Derived lookup fields for a raw attraction document."""
+    return {
+        'name_key': normalize_key(doc.get('name')),
+        'country_key': normalize_key(doc.get('country')),
+        'city_key': normalize_key(doc.get('city')),
+        'type_mask': type_mask_bytes(type_mask(doc.get('types'))),
+    }
+
+
+class Command(BaseCommand):
+    help = 'Backfill normalized lookup keys and type masks on existing attractions (safe to re-run)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        collection = Attraction._get_collection()
+        Attraction.ensure_indexes()
+        batch_size = options['batch_size']
+        projection = {'name': 1, 'name_key': 1, 'country': 1, 'country_key': 1, 'city': 1, 'city_key': 1,
+                      'types': 1, 'type_mask': 1}
+        scanned = updated = 0
+        ops = []
+        for doc in collection.find({}, projection, batch_size=batch_size):
+            scanned += 1
+            keys = computed_keys(doc)
+            changed = {k: v for k, v in keys.items() if doc.get(k) != v}
+            if changed:
+                ops.append(UpdateOne({'_id': doc['_id']}, {'$set': changed}))
+            if len(ops) >= batch_size:
+                updated += collection.bulk_write(ops, ordered=False).modified_count
+                ops = []
+        if ops:
+            updated += collection.bulk_write(ops, ordered=False).modified_count
+        self.stdout.write(self.style.SUCCESS(f'Scanned {scanned} attractions, updated {updated}'))
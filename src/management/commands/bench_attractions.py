@@ -0,0 +1,124 @@
+import logging
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from src.benchmarks import harness
+from src.benchmarks.dataset import StubPlacesClient, place_id_for
+from src.benchmarks.scenarios import SCENARIOS, BenchContext
+
+logger = logging.getLogger(__name__)
+
+
+def _parse_size(raw):
+    raw = raw.strip().lower()
+    multiplier = 1
+    if raw.endswith('k'):
+        multiplier, raw = 1000, raw[:-1]
+    elif raw.endswith('m'):
+        multiplier, raw = 1000000, raw[:-1]
+    return int(float(raw) * multiplier)
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the attractions request path against a local MongoDB (or mongomock) with a stubbed Places client'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=str, default='1k,100k,1m', help='Comma-separated dataset sizes (e.g. 1k,100k,1m)')
+        parser.add_argument('--scenarios', type=str, default='', help=f'Comma-separated scenarios (default: all). Available: {", ".join(sorted(SCENARIOS))}')
+        parser.add_argument('--group', type=str, default='', help='Only run scenarios of this group (e.g. endpoints)')
+        parser.add_argument('--iterations', type=int, default=200)
+        parser.add_argument('--warmup', type=int, default=20)
+        parser.add_argument('--alloc-iterations', type=int, default=20, help='Calls traced with tracemalloc per scenario (0 disables)')
+        parser.add_argument('--cache', choices=['cold', 'warm'], default='cold', help='cold clears the search cache before every call')
+        parser.add_argument('--db-name', type=str, default='tripadvisor_bench', help='Benchmark database (dropped and reseeded per size)')
+        parser.add_argument('--mongo-uri', type=str, default='mongodb://localhost:27017', help='MongoDB server (without database name)')
+        parser.add_argument('--mongomock', action='store_true', help='Use mongomock instead of a MongoDB server (geo/text queries unsupported)')
+        parser.add_argument('--replay-dir', type=str, default='', help='Serve Places from recorded fixtures instead of the synthetic stub')
+        parser.add_argument('--compilations', type=int, default=5)
+        parser.add_argument('--items-per-compilation', type=int, default=20)
+        parser.add_argument('--output', type=str, default='', help='Write the JSON report to this path')
+
+    def _connect(self, options):
+        import mongoengine
+        from mongoengine.connection import disconnect
+        from src.models import Attraction, AttractionBlob, Compilation, IngestionCheckpoint, PlaceDetailsCacheEntry, User
+
+        if options['db_name'] == getattr(settings, 'MONGODB_NAME', None):
+            raise CommandError('Refusing to benchmark against the application database; pass a different --db-name.')
+        disconnect(alias='default')
+        if options['mongomock']:
+            try:
+                import mongomock
+            except ImportError:
+                raise CommandError('mongomock is not installed (pip install mongomock).')
+            mongoengine.connect(db=options['db_name'], host='mongodb://localhost', mongo_client_class=mongomock.MongoClient)
+        else:
+            mongoengine.connect(db=options['db_name'], host=options['mongo_uri'])
+        for model in (Attraction, AttractionBlob, Compilation, IngestionCheckpoint, PlaceDetailsCacheEntry, User):
+            model._collection = None
+
+    def handle(self, *args, **options):
+        from src.benchmarks import seed
+        from src.cache import get_cache
+        from src.external_services import google_places_service
+        from src.places_transport import ReplayPlacesClient
+        from src.services import attractions_service
+
+        sizes = [_parse_size(s) for s in options['sizes'].split(',') if s.strip()]
+        names = [n.strip() for n in options['scenarios'].split(',') if n.strip()] or sorted(SCENARIOS)
+        unknown = [n for n in names if n not in SCENARIOS]
+        if unknown:
+            raise CommandError(f'Unknown scenarios: {", ".join(unknown)}')
+        if options['group']:
+            names = [n for n in names if SCENARIOS[n]['group'] == options['group']]
+
+        self._connect(options)
+        original_client = google_places_service.client
+        caches = [attractions_service._search_cache, attractions_service._popular_cache, get_cache('places_pages')]
+
+        def clear_caches():
+            for cache in caches:
+                cache.clear()
+        setup = clear_caches if options['cache'] == 'cold' else None
+        results = []
+        try:
+            for size in sizes:
+                self.stdout.write(f'Seeding {size} attractions into {options["db_name"]}...')
+                seed.reset_collections()
+                seed.seed_attractions(size)
+                user = seed.seed_user_compilations(size, options['compilations'], options['items_per_compilation'])
+                if options['replay_dir']:
+                    google_places_service.client = ReplayPlacesClient(options['replay_dir'])
+                else:
+                    google_places_service.client = StubPlacesClient(size)
+                clear_caches()
+                sample = [place_id_for(i * max(1, size // 100)) for i in range(min(100, size))]
+                ctx = BenchContext(size, user=user, place_ids=sample)
+                for name in names:
+                    self.stdout.write(f'  {name} @ {size}')
+                    fn = SCENARIOS[name]['factory'](ctx)
+                    stats = harness.measure(
+                        fn,
+                        iterations=options['iterations'],
+                        warmup=options['warmup'],
+                        alloc_iterations=options['alloc_iterations'],
+                        setup=setup,
+                    )
+                    results.append({'scenario': name, 'group': SCENARIOS[name]['group'], 'size': size, **stats})
+        finally:
+            google_places_service.client = original_client
+
+        self.stdout.write(harness.format_table(results))
+        report = harness.build_report(results, {
+            'sizes': sizes,
+            'iterations': options['iterations'],
+            'warmup': options['warmup'],
+            'cache': options['cache'],
+            'backend': 'mongomock' if options['mongomock'] else 'mongodb',
+            'places': 'replay' if options['replay_dir'] else 'stub',
+        })
+        if options['output']:
+            harness.write_report(report, options['output'])
+            self.stdout.write(self.style.SUCCESS(f'Report written to {os.path.abspath(options["output"])}'))
@@ -0,0 +1,154 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+import hashlib
+import logging
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from src.external_services import google_places_service
+from src.models import IngestionCheckpoint
+from src.services.attractions_service import AttractionsService
+
+logger = logging.getLogger(__name__)
+
+
+def parse_target(raw):
+    """Parse 'Country' or 'City, Country' into (target, country, city)."""
+    parts = [p.strip() for p in raw.split(',') if p.strip()]
+    if not parts:
+        return None
+    if len(parts) == 1:
+        return parts[0], parts[0], ''
+    city, country = ', '.join(parts[:-1]), parts[-1]
+    return f'{city}, {country}', country, city
+
+
+class Command(BaseCommand):
+    help = 'Ingest attractions for many countries/cities with a worker pool and resumable checkpoints'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--countries', nargs='*', default=[], help='Countries to ingest, e.g. --countries France Italy')
+        parser.add_argument('--cities', nargs='*', default=[], help='Cities as "City, Country", e.g. --cities "Lyon, France"')
+        parser.add_argument('--file', type=str, help='File with one "Country" or "City, Country" per line (# comments allowed)')
+        parser.add_argument('--profile', type=str, default='tourist', choices=['tourist', 'local', 'pro'])
+        parser.add_argument('--limit', type=int, default=20, help='Places to fetch per target')
+        parser.add_argument('--workers', type=int, default=4, help='Targets processed concurrently')
+        parser.add_argument('--run-id', type=str, help='Checkpoint run id to resume (default: UTC date plus a hash of targets, profile and limit, '
+                                 'so a crashed run resumes the same day and later runs ingest again)')
+        parser.add_argument('--restart', action='store_true', help='Ignore existing checkpoints for this run id')
+        parser.add_argument('--retry-failed', action='store_true', help='Also reprocess targets that failed in a previous attempt')
+
+    def _collect_targets(self, options):
+        raw = list(options['countries']) + list(options['cities'])
+        if options.get('file'):
+            try:
+                with open(options['file'], encoding='utf-8') as fh:
+                    raw.extend(line.split('#', 1)[0] for line in fh)
+            except OSError as e:
+                raise CommandError(f"Cannot read {options['file']}: {e}")
+        targets = {}
+        for item in raw:
+            parsed = parse_target(item)
+            if parsed:
+                targets.setdefault(parsed[0], parsed)
+        return list(targets.values())
+
+    def handle(self, *args, **options):
+        targets = self._collect_targets(options)
+        if not targets:
+            raise CommandError('No targets given. Use --countries, --cities or --file.')
+        profile = options['profile']
+        limit = options['limit']
+        run_id = options.get('run_id') or '{}-{}'.format(
+            datetime.utcnow().strftime('%Y%m%d'),
+            hashlib.sha1(f"{profile}|{limit}|{'|'.join(sorted(t[0] for t in targets))}".encode('utf-8')).hexdigest()[:12],
+        )
+
+        if options['restart']:
+            IngestionCheckpoint.objects(run_id=run_id).delete()
+
+        skip_statuses = {'done'} if options['retry_failed'] else {'done', 'failed'}
+        done = {
+            cp.target for cp in IngestionCheckpoint.objects(run_id=run_id, status__in=list(skip_statuses)).only('target')
+        }
+        pending = [t for t in targets if t[0] not in done]
+        self.stdout.write(
+            f'Run {run_id}: {len(targets)} targets, {len(done)} already checkpointed, {len(pending)} to process '
+            f'(profile={profile}, limit={limit}, workers={options["workers"]})'
+        )
+        if not pending:
+            self.stdout.write(self.style.SUCCESS('Nothing to do.'))
+            return
+
+        api_before = google_places_service.api_stats().get('total', 0)
+        started = time.perf_counter()
+        totals = {'places': 0, 'created': 0, 'updated': 0, 'unchanged': 0, 'write_ops': 0, 'failed_targets': 0}
+
+        with ThreadPoolExecutor(max_workers=max(1, options['workers']), thread_name_prefix='ingest') as pool:
+            futures = {pool.submit(self._ingest_target, run_id, target, profile, limit): target for target in pending}
+            for future in as_completed(futures):
+                target = futures[future][0]
+                report, error = future.result()
+                if error:
+                    totals['failed_targets'] += 1
+                    self.stdout.write(self.style.ERROR(f'  {target}: failed ({error})'))
+                    continue
+                totals['places'] += report.get('fetched', 0)
+                for key in ('created', 'updated', 'unchanged', 'write_ops'):
+                    totals[key] += report.get(key, 0)
+                self.stdout.write(
+                    f"  {target}: {report.get('fetched', 0)} places "
+                    f"(created {report.get('created', 0)}, updated {report.get('updated', 0)}, "
+                    f"unchanged {report.get('unchanged', 0)}) in {report.get('timings', {}).get('total_ms', 0):.0f} ms"
+                )
+
+        elapsed = time.perf_counter() - started
+        api_calls = google_places_service.api_stats().get('total', 0) - api_before
+        rate = totals['places'] / elapsed if elapsed > 0 else 0.0
+        summary = (
+            f"Processed {len(pending) - totals['failed_targets']}/{len(pending)} targets in {elapsed:.1f}s: "
+            f"{totals['places']} places ({rate:.1f} places/sec), {api_calls} API calls, {totals['write_ops']} write ops "
+            f"(created {totals['created']}, updated {totals['updated']}, unchanged {totals['unchanged']})"
+        )
+        style = self.style.SUCCESS if not totals['failed_targets'] else self.style.WARNING
+        self.stdout.write(style(summary))
+        if totals['failed_targets']:
+            self.stdout.write(f'Re-run with --run-id {run_id} --retry-failed to resume the failed targets.')
+
+    def _ingest_target(self, run_id, target, profile, limit):
+        """Process one target and record its checkpoint. Returns (report, error)."""
+        name, country, city = target
+        checkpoint_qs = IngestionCheckpoint.objects(run_id=run_id, target=name)
+        checkpoint_qs.update_one(
+            upsert=True,
+            set__country=country,
+            set__city=city,
+            set__profile=profile,
+            set__status='running',
+            set__error='',
+            set__started_at=datetime.utcnow(),
+            set__updated_at=datetime.utcnow(),
+            inc__attempts=1,
+        )
+        try:
+            report = AttractionsService.sync_from_google(country, limit, city=city or None, profile=profile)
+            if not report.get('total_found'):
+                # Google errors surface as empty results; keep the target retryable
+                raise RuntimeError('no places found')
+        except Exception as e:
+            logger.warning("Ingestion failed for %s: %s", name, e)
+            checkpoint_qs.update_one(
+                set__status='failed',
+                set__error=str(e),
+                set__finished_at=datetime.utcnow(),
+                set__updated_at=datetime.utcnow(),
+            )
+            return None, str(e)
+        checkpoint_qs.update_one(
+            set__status='done',
+            set__report=report,
+            set__finished_at=datetime.utcnow(),
+            set__updated_at=datetime.utcnow(),
+        )
+        return report, None
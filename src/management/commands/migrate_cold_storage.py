@@ -0,0 +1,52 @@
+from django.core.management.base import BaseCommand
+from pymongo import UpdateOne
+
+from src.models import Attraction, AttractionBlob
+from src.repositories.attraction_blob_repository import AttractionBlobRepository
+
+
+class Command(BaseCommand):
+    help = 'Move raw_data and reviews of existing attractions to the compressed attraction_blobs collection (safe to re-run)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--dry-run', action='store_true', help='Report what would be moved without writing')
+
+    def handle(self, *args, **options):
+        collection = Attraction._get_collection()
+        AttractionBlob.ensure_indexes()
+        batch_size = options['batch_size']
+        dry_run = options['dry_run']
+        # Only documents still carrying inline cold fields
+        query = {'$or': [{'raw_data': {'$gt': {}}}, {'reviews.0': {'$exists': True}}]}
+        totals = {'moved': 0, 'raw_bytes': 0, 'stored_bytes': 0}
+        blobs = {}
+        ops = []
+
+        def flush():
+            # Blobs first, so a hot document is never emptied before its payload is stored
+            stats = AttractionBlobRepository.save_many(blobs, dry_run=dry_run)
+            totals['raw_bytes'] += stats['raw_bytes']
+            totals['stored_bytes'] += stats['stored_bytes']
+            if ops and not dry_run:
+                collection.bulk_write(ops, ordered=False)
+            totals['moved'] += len(ops)
+            blobs.clear()
+            ops.clear()
+
+        for doc in collection.find(query, {'place_id': 1, 'raw_data': 1, 'reviews': 1}, batch_size=batch_size):
+            if not doc.get('place_id'):
+                continue
+            blobs[doc['place_id']] = {'raw_data': doc.get('raw_data') or {}, 'reviews': doc.get('reviews') or []}
+            ops.append(UpdateOne({'_id': doc['_id']}, {'$set': {'raw_data': {}, 'reviews': []}}))
+            if len(ops) >= batch_size:
+                flush()
+        flush()
+
+        raw_kb = totals['raw_bytes'] / 1024
+        stored_kb = totals['stored_bytes'] / 1024
+        ratio = totals['stored_bytes'] / totals['raw_bytes'] if totals['raw_bytes'] else 0
+        verb = 'Would move' if dry_run else 'Moved'
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {totals['moved']} attractions to cold storage: {raw_kb:.0f} KB -> {stored_kb:.0f} KB ({ratio:.0%})"
+        ))
@@ -0,0 +1,57 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from src.management.commands.ingest_places import parse_target
+from src.models import Attraction, PopularList
+from src.services.attractions_service import AttractionsService
+
+
+class Command(BaseCommand):
+    help = 'Materialize ranked popular lists (PopularList) per country/city and profile; meant to run on a schedule'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--countries', nargs='*', default=[], help='Countries to refresh (default: every country with stored attractions)')
+        parser.add_argument('--cities', nargs='*', default=[], help='Cities as "City, Country", e.g. --cities "Lyon, France"')
+        parser.add_argument('--file', type=str, help='File with one "Country" or "City, Country" per line (# comments allowed)')
+        parser.add_argument('--profiles', nargs='*', default=list(PopularList.PROFILES), choices=list(PopularList.PROFILES))
+        parser.add_argument('--size', type=int, default=60, help='place_ids kept per list')
+        parser.add_argument('--candidates', type=int, default=500, help='Most popular stored attractions considered for ranking')
+        parser.add_argument('--sync', action='store_true', help='Sync each target from Google before ranking')
+
+    def _collect_targets(self, options):
+        raw = list(options['countries']) + list(options['cities'])
+        if options.get('file'):
+            try:
+                with open(options['file'], encoding='utf-8') as fh:
+                    raw.extend(line.split('#', 1)[0] for line in fh)
+            except OSError as e:
+                raise CommandError(f"Cannot read {options['file']}: {e}")
+        if not raw:
+            raw = sorted(c for c in Attraction._get_collection().distinct('country') if c)
+        targets = {}
+        for item in raw:
+            parsed = parse_target(item)
+            if parsed:
+                targets.setdefault(parsed[0], parsed)
+        return list(targets.values())
+
+    def handle(self, *args, **options):
+        targets = self._collect_targets(options)
+        if not targets:
+            raise CommandError('No targets: no stored attractions and no --countries/--cities/--file given.')
+        PopularList.ensure_indexes()
+        started = time.perf_counter()
+        lists = 0
+        for name, country, city in targets:
+            if options['sync']:
+                for profile in options['profiles']:
+                    AttractionsService.sync_from_google(country, options['size'], city=city or None, profile=profile)
+            for profile in options['profiles']:
+                result = AttractionsService.build_popular_list(
+                    country, city or None, profile, size=options['size'], candidates=options['candidates']
+                )
+                lists += 1
+                self.stdout.write(f"  {name} [{profile}]: {result['size']} places ranked from {result['candidates']} candidates")
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(f'Refreshed {lists} popular lists for {len(targets)} targets in {elapsed:.1f}s'))
@@ -7,11 +7,19 @@ New code should import from `.models.user`, `.models.attraction`, `.models.compi
 
 from .models.user import User
 from .models.attraction import Attraction
+from .models.attraction_blob import AttractionBlob
 from .models.compilation import Compilation, CompilationItem
+from .models.place_details import PlaceDetailsCacheEntry
+from .models.ingestion import IngestionCheckpoint
+from .models.popular_list import PopularList
 
 __all__ = [
     "User",
     "Attraction",
+    "AttractionBlob",
     "Compilation",
     "CompilationItem",
+    "PlaceDetailsCacheEntry",
+    "IngestionCheckpoint",
+    "PopularList",
 ]
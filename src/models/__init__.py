@@ -1,7 +1,20 @@
 from .user import User
 from .attraction import Attraction
+from .attraction_blob import AttractionBlob
 from .compilation import Compilation, CompilationItem
+from .place_details import PlaceDetailsCacheEntry
+from .ingestion import IngestionCheckpoint
+from .popular_list import PopularList
 
-__all__ = ["User", "Attraction", "Compilation", "CompilationItem"]
+__all__ = [
+    "User",
+    "Attraction",
+    "AttractionBlob",
+    "Compilation",
+    "CompilationItem",
+    "PlaceDetailsCacheEntry",
+    "IngestionCheckpoint",
+    "PopularList",
+]
 
 
@@ -1,18 +1,37 @@
 import mongoengine as me
+import re
+import unicodedata
 from datetime import datetime
 from .user import User
+from ..place_types import to_bytes as type_mask_bytes, type_mask
+
+
+def normalize_key(value) -> str:
+    """Lowercased, accent-folded, whitespace-collapsed form used for indexed lookups."""
+    if not value:
+        return ''
+    folded = unicodedata.normalize('NFKD', str(value))
+    folded = ''.join(ch for ch in folded if not unicodedata.combining(ch))
+    return re.sub(r'\s+', ' ', folded).strip().lower()
 
 
 class Attraction(me.Document):
     place_id = me.StringField(required=True, unique=True)
     name = me.StringField(required=True)
+    # normalize_key(name): anchored prefix lookups (type-ahead) can use its index
+    name_key = me.StringField(default='')
     formatted_address = me.StringField(default='')
     country = me.StringField(required=True)
+    # normalize_key(country) / normalize_key(city): exact-match, index-backed filters
+    country_key = me.StringField(default='')
     # Track the owner user who saved this attraction
     owner = me.ReferenceField(User, required=False)
     city = me.StringField(default='')
+    city_key = me.StringField(default='')
     category = me.StringField(default='')
     types = me.ListField(me.StringField(), default=list)
+    # Bitmask of `types` (see src/place_types.py), little-endian; queried with $bitsAnySet
+    type_mask = me.BinaryField()
     rating = me.FloatField(default=0)
     user_ratings_total = me.IntField(default=0)
     price_level = me.IntField(null=True)
@@ -28,6 +47,8 @@ class Attraction(me.Document):
     likes = me.IntField(default=0)
     is_featured = me.BooleanField(default=False)
     raw_data = me.DictField(default=dict)
+    # Stable hash of the synced Google content; unchanged hashes skip writes on re-sync
+    content_hash = me.StringField(default='')
     created_at = me.DateTimeField(default=datetime.utcnow)
     updated_at = me.DateTimeField(default=datetime.utcnow)
 
@@ -37,13 +58,26 @@ class Attraction(me.Document):
             {'fields': ['country', 'rating']},
             {'fields': ['city', 'category']},
             {'fields': ['is_featured', 'likes']},
-            {'fields': [('location', '2dsphere')]}
+            {'fields': [('location', '2dsphere')]},
+            {'fields': ['name_key']},
+            {'fields': ['country_key', '-likes', '-rating', '-user_ratings_total', 'id']},
+            {'fields': ['country_key', 'is_featured', '-likes', '-rating', '-user_ratings_total']},
+            {'fields': ['country_key', 'city_key']},
+            {'fields': ['city_key', 'category']},
+            {'fields': ['country_key', 'type_mask']},
         ],
         'ordering': ['-likes', '-rating', '-user_ratings_total']
     }
 
     def __str__(self) -> str:
         return f"{self.name} ({self.city or self.country})"
+
+    def clean(self):
+        # Keep normalized lookup keys in sync on every save()
+        self.name_key = normalize_key(self.name)
+        self.country_key = normalize_key(self.country)
+        self.city_key = normalize_key(self.city)
+        self.type_mask = type_mask_bytes(type_mask(self.types))
     
     @property
     def price_level_display(self):
@@ -0,0 +1,23 @@
+import mongoengine as me
+from datetime import datetime
+
+
+class AttractionBlob(me.Document):
+    """Cold storage for the bulky parts of an Attraction (raw Google payload, reviews).
+
+    Stored compressed, keyed by place_id, and only loaded by detail endpoints so the
+    hot `attraction` documents stay small.
+    """
+    place_id = me.StringField(required=True, unique=True)
+    codec = me.StringField(choices=('zlib', 'zstd'), default='zlib')
+    data = me.BinaryField()
+    raw_size = me.IntField(default=0)
+    stored_size = me.IntField(default=0)
+    updated_at = me.DateTimeField(default=datetime.utcnow)
+
+    meta = {
+        'collection': 'attraction_blobs',
+    }
+
+    def __str__(self) -> str:
+        return f"AttractionBlob {self.place_id} ({self.codec}, {self.stored_size}/{self.raw_size} bytes)"
@@ -0,0 +1,35 @@
+import mongoengine as me
+from datetime import datetime
+
+
+class IngestionCheckpoint(me.Document):
+    """Progress of one target (country or city) within a bulk ingestion run.
+
+    A run is identified by `run_id`; re-running with the same id skips targets
+    already marked `done`, so an interrupted ingestion resumes where it stopped.
+    """
+    STATUSES = ('pending', 'running', 'done', 'failed')
+
+    run_id = me.StringField(required=True)
+    target = me.StringField(required=True)
+    country = me.StringField(required=True)
+    city = me.StringField(default='')
+    profile = me.StringField(default='tourist')
+    status = me.StringField(choices=STATUSES, default='pending')
+    attempts = me.IntField(default=0)
+    report = me.DictField(default=dict)
+    error = me.StringField(default='')
+    started_at = me.DateTimeField(null=True)
+    finished_at = me.DateTimeField(null=True)
+    updated_at = me.DateTimeField(default=datetime.utcnow)
+
+    meta = {
+        'collection': 'ingestion_checkpoints',
+        'indexes': [
+            {'fields': ['run_id', 'target'], 'unique': True},
+            {'fields': ['run_id', 'status']},
+        ],
+    }
+
+    def __str__(self) -> str:
+        return f"{self.run_id}:{self.target} ({self.status})"
@@ -0,0 +1,27 @@
+import mongoengine as me
+from datetime import datetime
+
+
+class PlaceDetailsCacheEntry(me.Document):
+    """Cached Google Places details response for one place and requested field set.
+
+    `field_fetched_at` maps each requested Google field to the epoch time it was
+    last fetched, so volatile fields (rating, opening hours) can be refreshed
+    independently of stable ones (name, geometry).
+    """
+    place_id = me.StringField(required=True)
+    fields_key = me.StringField(required=True)
+    payload = me.DictField(default=dict)
+    field_fetched_at = me.DictField(default=dict)
+    created_at = me.DateTimeField(default=datetime.utcnow)
+    updated_at = me.DateTimeField(default=datetime.utcnow)
+
+    meta = {
+        'collection': 'place_details_cache',
+        'indexes': [
+            {'fields': ['place_id', 'fields_key'], 'unique': True},
+        ],
+    }
+
+    def __str__(self) -> str:
+        return f"PlaceDetailsCacheEntry {self.place_id} [{self.fields_key}]"
@@ -0,0 +1,38 @@
+import mongoengine as me
+from datetime import datetime
+
+from .attraction import normalize_key
+
+
+class PopularList(me.Document):
+    """Materialized, ranked place_ids for one (country, city, profile).
+
+    Filled by the `refresh_popular_lists` command with the same profile ranking
+    as AttractionsService, so the landing page reads one document and then
+    fetches the listed attractions in a single batched query.
+    """
+    PROFILES = ('tourist', 'local', 'pro')
+
+    country = me.StringField(required=True)
+    country_key = me.StringField(required=True)
+    city = me.StringField(default='')
+    city_key = me.StringField(default='')
+    profile = me.StringField(choices=PROFILES, default='tourist')
+    place_ids = me.ListField(me.StringField())
+    candidates = me.IntField(default=0)
+    computed_at = me.DateTimeField(default=datetime.utcnow)
+
+    meta = {
+        'collection': 'popular_lists',
+        'indexes': [
+            {'fields': ['country_key', 'city_key', 'profile'], 'unique': True},
+        ],
+    }
+
+    def __str__(self) -> str:
+        where = f"{self.city}, {self.country}" if self.city else self.country
+        return f"PopularList {where} ({self.profile}, {len(self.place_ids)} places)"
+
+    def clean(self):
+        self.country_key = normalize_key(self.country)
+        self.city_key = normalize_key(self.city)
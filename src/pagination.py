@@ -0,0 +1,72 @@
+"""Opaque cursors for paginating attraction lists and searches.
+
+A cursor is url-safe base64 of compact JSON and comes in two kinds:
+
+- ``db``: keyset over the popularity sort ``(-likes, -rating, -user_ratings_total, _id)``.
+  It carries the sort key of the last row served, so the next page is a range
+  scan on the popularity index and page 50 costs the same as page 1.
+- ``google``: a Google ``next_page_token`` plus an offset into that Google page
+  (Google pages are 20 results; smaller page sizes walk through them).
+
+Cursors also carry a fingerprint of the request filters, so a cursor replayed
+against different filters is rejected instead of returning a nonsense page.
+"""
+from __future__ import annotations
+
+from typing import Any, Dict, Mapping, Optional
+import base64
+import hashlib
+import json
+
+from bson import ObjectId
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+# Query params that drive pagination or output shape and are ignored by the fingerprint
+PAGINATION_PARAMS = frozenset({'cursor', 'page_size', 'limit', 'format', 'fields'})
+
+
+class InvalidCursor(ValueError):
+    """Raised for malformed, tampered or mismatched cursors."""
+
+
+def wants_pagination(params: Mapping[str, Any]) -> bool:
+    """Pagination is opt-in: clients send `page_size` (first page) or `cursor` (next pages)."""
+    return bool(params.get('cursor') or params.get('page_size'))
+
+
+def page_size_from(params: Mapping[str, Any]) -> int:
+    try:
+        size = int(params.get('page_size') or DEFAULT_PAGE_SIZE)
+    except (TypeError, ValueError):
+        size = DEFAULT_PAGE_SIZE
+    return max(1, min(size, MAX_PAGE_SIZE))
+
+
+def params_fingerprint(params: Mapping[str, Any]) -> str:
+    items = {k: params.get(k) for k in params.keys() if k not in PAGINATION_PARAMS}
+    payload = json.dumps(items, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()[:12]
+
+
+def encode_cursor(state: Dict[str, Any]) -> str:
+    raw = json.dumps(state, separators=(',', ':'), default=str).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str, fingerprint: Optional[str] = None) -> Dict[str, Any]:
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        state = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (ValueError, TypeError, UnicodeError) as e:
+        raise InvalidCursor('Malformed cursor') from e
+    if not isinstance(state, dict) or state.get('k') not in ('db', 'google'):
+        raise InvalidCursor('Malformed cursor')
+    after = state.get('a')
+    if state['k'] == 'db' and after is not None:
+        if not (isinstance(after, list) and len(after) == 4 and ObjectId.is_valid(after[3])):
+            raise InvalidCursor('Malformed cursor')
+    if fingerprint is not None and state.get('h') != fingerprint:
+        raise InvalidCursor('Cursor does not match the request filters')
+    return state
@@ -0,0 +1,109 @@
+"""Registry of Google place types, one bit per type.
+
+A set of types is encoded as an integer mask (bit ``i`` = ``PLACE_TYPES[i]``), so
+category filters and profile scoring become bitwise ANDs. Stored attractions
+keep the mask in ``Attraction.type_mask`` as little-endian BinData, which
+MongoDB's ``$bitsAnySet`` reads with the same bit positions.
+
+Bit positions are persisted: only ever append to ``PLACE_TYPES``.
+"""
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Iterable, List, Optional, Tuple
+
+PLACE_TYPES: Tuple[str, ...] = (
+    # Place types (Places API, table 1)
+    'accounting', 'airport', 'amusement_park', 'aquarium', 'art_gallery', 'atm', 'bakery', 'bank', 'bar',
+    'beauty_salon', 'bicycle_store', 'book_store', 'bowling_alley', 'bus_station', 'cafe', 'campground',
+    'car_dealer', 'car_rental', 'car_repair', 'car_wash', 'casino', 'cemetery', 'church', 'city_hall',
+    'clothing_store', 'convenience_store', 'courthouse', 'dentist', 'department_store', 'doctor', 'drugstore',
+    'electrician', 'electronics_store', 'embassy', 'fire_station', 'florist', 'funeral_home', 'furniture_store',
+    'gas_station', 'gym', 'hair_care', 'hardware_store', 'hindu_temple', 'home_goods_store', 'hospital',
+    'insurance_agency', 'jewelry_store', 'laundry', 'lawyer', 'library', 'light_rail_station', 'liquor_store',
+    'local_government_office', 'locksmith', 'lodging', 'meal_delivery', 'meal_takeaway', 'mosque',
+    'movie_rental', 'movie_theater', 'moving_company', 'museum', 'night_club', 'painter', 'park', 'parking',
+    'pet_store', 'pharmacy', 'physiotherapist', 'plumber', 'police', 'post_office', 'primary_school',
+    'real_estate_agency', 'restaurant', 'roofing_contractor', 'rv_park', 'school', 'secondary_school',
+    'shoe_store', 'shopping_mall', 'spa', 'stadium', 'storage', 'store', 'subway_station', 'supermarket',
+    'synagogue', 'taxi_stand', 'tourist_attraction', 'train_station', 'transit_station', 'travel_agency',
+    'university', 'veterinary_care', 'zoo',
+    # Additional types returned in responses (table 2)
+    'administrative_area_level_1', 'administrative_area_level_2', 'administrative_area_level_3',
+    'administrative_area_level_4', 'administrative_area_level_5', 'administrative_area_level_6',
+    'administrative_area_level_7', 'archipelago', 'colloquial_area', 'continent', 'country', 'establishment',
+    'finance', 'floor', 'food', 'general_contractor', 'geocode', 'health', 'intersection', 'landmark',
+    'locality', 'natural_feature', 'neighborhood', 'place_of_worship', 'plus_code', 'point_of_interest',
+    'political', 'post_box', 'postal_code', 'postal_code_prefix', 'postal_code_suffix', 'postal_town',
+    'premise', 'room', 'route', 'street_address', 'street_number', 'sublocality', 'sublocality_level_1',
+    'sublocality_level_2', 'sublocality_level_3', 'sublocality_level_4', 'sublocality_level_5', 'subpremise',
+    'town_square',
+)
+
+BITS = {name: index for index, name in enumerate(PLACE_TYPES)}
+MASK_BYTES = (len(PLACE_TYPES) + 7) // 8
+
+
+@lru_cache(maxsize=4096)
+def _mask_of(types: Tuple[str, ...]) -> int:
+    mask = 0
+    for place_type in types:
+        bit = BITS.get(str(place_type).lower())
+        if bit is not None:
+            mask |= 1 << bit
+    return mask
+
+
+def type_mask(types: Optional[Iterable[str]]) -> int:
+    """Mask of the registered types in `types` (unknown types are ignored)."""
+    return _mask_of(tuple(types or ()))
+
+
+@lru_cache(maxsize=1024)
+def matching_mask(requested: str, bidirectional: bool = True) -> int:
+    """Mask of every registered type matching `requested` by substring.
+
+    This keeps the historical filter semantics: 'store' selects 'book_store', and
+    with `bidirectional` 'amusement_park' also selects 'park'.
+    """
+    requested = (requested or '').strip().lower()
+    if not requested:
+        return 0
+    mask = 0
+    for index, name in enumerate(PLACE_TYPES):
+        if requested in name or (bidirectional and name in requested):
+            mask |= 1 << index
+    return mask
+
+
+def requested_mask(requested: Iterable[str], bidirectional: bool = True) -> int:
+    mask = 0
+    for item in requested:
+        mask |= matching_mask(item, bidirectional)
+    return mask
+
+
+def keywords_mask(keywords: Iterable[str]) -> int:
+    """Mask of registered types containing any of `keywords` (profile type tables)."""
+    return requested_mask(keywords, bidirectional=False)
+
+
+def popcount(mask: int) -> int:
+    return bin(mask).count('1')
+
+
+def positions(mask: int) -> List[int]:
+    """Bit positions set in `mask`, as used by MongoDB $bitsAnySet."""
+    return [index for index in range(mask.bit_length()) if mask >> index & 1]
+
+
+def to_bytes(mask: int) -> bytes:
+    return int(mask).to_bytes(MASK_BYTES, 'little')
+
+
+def from_bytes(data: Optional[bytes]) -> int:
+    return int.from_bytes(bytes(data or b''), 'little')
+
+
+def names(mask: int) -> List[str]:
+    return [PLACE_TYPES[index] for index in positions(mask) if index < len(PLACE_TYPES)]
@@ -0,0 +1,174 @@
+"""Record/replay transports for GooglePlacesService.
+
+``RecordingPlacesClient`` wraps a real ``googlemaps.Client`` and writes every
+response to a fixture directory. ``ReplayPlacesClient`` serves those fixtures
+without network access, optionally injecting latency and errors, so the
+attractions request path can be benchmarked and load-tested offline.
+
+Both expose the subset of the googlemaps API used by GooglePlacesService:
+``places``, ``places_nearby`` and ``place``.
+"""
+from __future__ import annotations
+
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional
+import glob
+import hashlib
+import json
+import logging
+import os
+import random
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+METHODS = ('places', 'places_nearby', 'place')
+
+
+class InjectedPlacesError(Exception):
+    """Raised by ReplayPlacesClient to simulate an upstream failure."""
+
+
+def _normalize(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {str(k): _normalize(v) for k, v in value.items() if v is not None}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    if isinstance(value, float):
+        return round(value, 6)
+    return value
+
+
+def fixture_name(method: str, params: Dict[str, Any]) -> str:
+    """Deterministic fixture file name for a call; details fixtures are prefixed by place_id."""
+    normalized = _normalize(params)
+    if method == 'place' and isinstance(normalized.get('fields'), list):
+        normalized['fields'] = sorted(normalized['fields'])
+    digest = hashlib.sha1(json.dumps(normalized, sort_keys=True, default=str).encode('utf-8')).hexdigest()[:16]
+    if method == 'place' and params.get('place_id'):
+        return f"place-{params['place_id']}-{digest}.json"
+    return f'{method}-{digest}.json'
+
+
+class RecordingPlacesClient:
+    """Proxy around a googlemaps.Client that saves each response as a JSON fixture."""
+
+    def __init__(self, client, fixture_dir: str):
+        self.client = client
+        self.fixture_dir = Path(fixture_dir)
+        self.fixture_dir.mkdir(parents=True, exist_ok=True)
+
+    def _call(self, method: str, **params):
+        response = getattr(self.client, method)(**params)
+        path = self.fixture_dir / fixture_name(method, params)
+        payload = {
+            'method': method,
+            'params': _normalize(params),
+            'recorded_at': datetime.utcnow().isoformat(),
+            'response': response,
+        }
+        tmp = path.with_suffix('.tmp')
+        try:
+            tmp.write_text(json.dumps(payload, default=str), encoding='utf-8')
+            os.replace(tmp, path)
+            logger.debug("Recorded %s fixture %s", method, path.name)
+        except OSError as e:
+            logger.warning("Could not record fixture %s: %s", path, e)
+        return response
+
+    def places(self, **params):
+        return self._call('places', **params)
+
+    def places_nearby(self, **params):
+        return self._call('places_nearby', **params)
+
+    def place(self, **params):
+        return self._call('place', **params)
+
+
+class ReplayPlacesClient:
+    """Serve recorded fixtures locally with configurable latency and error injection.
+
+    Args:
+        fixture_dir: directory written by RecordingPlacesClient
+        latency_ms: base latency added to every call
+        jitter_ms: uniform random latency added on top of latency_ms
+        error_rate: probability (0..1) that a call raises InjectedPlacesError
+        seed: RNG seed, for reproducible latency/error sequences
+        strict: raise KeyError on a missing fixture instead of returning an empty response
+    """
+
+    def __init__(self, fixture_dir: str, latency_ms: float = 0, jitter_ms: float = 0, error_rate: float = 0.0,
+                 seed: Optional[int] = None, strict: bool = False):
+        self.fixture_dir = Path(fixture_dir)
+        self.latency_ms = float(latency_ms or 0)
+        self.jitter_ms = float(jitter_ms or 0)
+        self.error_rate = float(error_rate or 0)
+        self.strict = strict
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+        self._fixtures: Dict[str, Any] = {}
+        self._fixtures_lock = threading.Lock()
+        self.stats = {'calls': 0, 'hits': 0, 'misses': 0, 'errors': 0}
+        if not self.fixture_dir.is_dir():
+            logger.warning("Replay fixture directory %s does not exist", self.fixture_dir)
+
+    def _load(self, name: str) -> Optional[Dict[str, Any]]:
+        with self._fixtures_lock:
+            if name in self._fixtures:
+                return self._fixtures[name]
+        path = self.fixture_dir / name
+        try:
+            payload = json.loads(path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            payload = None
+        with self._fixtures_lock:
+            self._fixtures[name] = payload
+        return payload
+
+    def _find_place_fallback(self, place_id: str) -> Optional[Dict[str, Any]]:
+        # Details may be requested with a different field set than recorded
+        # (e.g. partial refreshes); any recording for the same place will do.
+        for path in sorted(glob.glob(str(self.fixture_dir / f'place-{glob.escape(place_id)}-*.json'))):
+            payload = self._load(os.path.basename(path))
+            if payload:
+                return payload
+        return None
+
+    def _simulate(self):
+        with self._rng_lock:
+            delay = self.latency_ms + (self._rng.uniform(0, self.jitter_ms) if self.jitter_ms else 0)
+            fail = self.error_rate > 0 and self._rng.random() < self.error_rate
+        if delay > 0:
+            time.sleep(delay / 1000.0)
+        if fail:
+            self.stats['errors'] += 1
+            raise InjectedPlacesError('Injected Google Places failure (replay mode)')
+
+    def _call(self, method: str, **params):
+        self.stats['calls'] += 1
+        self._simulate()
+        payload = self._load(fixture_name(method, params))
+        if payload is None and method == 'place' and params.get('place_id'):
+            payload = self._find_place_fallback(params['place_id'])
+        if payload is None:
+            self.stats['misses'] += 1
+            if self.strict:
+                raise KeyError(f'No replay fixture for {method} {params!r}')
+            logger.warning("No replay fixture for %s %r; returning empty response", method, params)
+            if method == 'place':
+                return {'status': 'NOT_FOUND', 'result': {}}
+            return {'status': 'ZERO_RESULTS', 'results': []}
+        self.stats['hits'] += 1
+        return payload.get('response') or {}
+
+    def places(self, **params):
+        return self._call('places', **params)
+
+    def places_nearby(self, **params):
+        return self._call('places_nearby', **params)
+
+    def place(self, **params):
+        return self._call('place', **params)
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any, Dict, Iterable, Optional, Tuple
+import json
+import logging
+import zlib
+
+from bson import Binary
+from pymongo import UpdateOne
+
+from ..models import AttractionBlob
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    zstandard = None
+    ZSTD_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Attraction fields moved out of the hot document
+COLD_FIELDS = ('raw_data', 'reviews')
+
+
+def _codec() -> str:
+    try:
+        from django.conf import settings
+        codec = getattr(settings, 'ATTRACTIONS_BLOB_CODEC', 'zlib')
+    except Exception:
+        codec = 'zlib'
+    if codec == 'zstd' and not ZSTD_AVAILABLE:
+        logger.warning("ATTRACTIONS_BLOB_CODEC='zstd' but zstandard is not installed; using zlib")
+        return 'zlib'
+    return codec
+
+
+class AttractionBlobRepository:
+    @staticmethod
+    def encode(payload: Dict[str, Any], codec: Optional[str] = None) -> Tuple[str, bytes, int]:
+        """Return (codec, compressed bytes, uncompressed size) for a JSON-serializable payload."""
+        codec = codec or _codec()
+        raw = json.dumps(payload, separators=(',', ':'), default=str).encode('utf-8')
+        if codec == 'zstd':
+            data = zstandard.ZstdCompressor(level=6).compress(raw)
+        else:
+            codec = 'zlib'
+            data = zlib.compress(raw, 6)
+        return codec, data, len(raw)
+
+    @staticmethod
+    def decode(codec: str, data: bytes) -> Dict[str, Any]:
+        if not data:
+            return {}
+        if codec == 'zstd':
+            if not ZSTD_AVAILABLE:
+                raise RuntimeError('zstandard is required to read zstd-compressed attraction blobs')
+            raw = zstandard.ZstdDecompressor().decompress(data)
+        else:
+            raw = zlib.decompress(data)
+        return json.loads(raw)
+
+    @classmethod
+    def save_many(cls, payloads: Dict[str, Dict[str, Any]], dry_run: bool = False) -> Dict[str, int]:
+        """Upsert cold payloads ({place_id: {'raw_data': ..., 'reviews': ...}}) in one bulk_write.
+
+        Returns the number of blobs written and their uncompressed / stored sizes.
+        """
+        stats = {'written': 0, 'raw_bytes': 0, 'stored_bytes': 0}
+        if not payloads:
+            return stats
+        now = datetime.utcnow()
+        ops = []
+        for place_id, payload in payloads.items():
+            codec, data, raw_size = cls.encode(payload)
+            stats['raw_bytes'] += raw_size
+            stats['stored_bytes'] += len(data)
+            ops.append(UpdateOne(
+                {'place_id': place_id},
+                {'$set': {
+                    'codec': codec,
+                    'data': Binary(data),
+                    'raw_size': raw_size,
+                    'stored_size': len(data),
+                    'updated_at': now,
+                }},
+                upsert=True,
+            ))
+        if not dry_run:
+            AttractionBlob._get_collection().bulk_write(ops, ordered=False)
+            stats['written'] = len(ops)
+        return stats
+
+    @classmethod
+    def save(cls, place_id: str, raw_data: Optional[Dict[str, Any]] = None, reviews: Optional[list] = None) -> None:
+        cls.save_many({place_id: {'raw_data': raw_data or {}, 'reviews': reviews or []}})
+
+    @classmethod
+    def load_many(cls, place_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        place_ids = [pid for pid in place_ids if pid]
+        if not place_ids:
+            return {}
+        loaded = {}
+        for row in AttractionBlob._get_collection().find({'place_id': {'$in': place_ids}}, {'place_id': 1, 'codec': 1, 'data': 1}):
+            try:
+                loaded[row['place_id']] = cls.decode(row.get('codec', 'zlib'), bytes(row.get('data') or b''))
+            except Exception as e:
+                logger.error("Could not decode attraction blob for %s: %s", row.get('place_id'), e)
+        return loaded
+
+    @classmethod
+    def load(cls, place_id: str) -> Optional[Dict[str, Any]]:
+        return cls.load_many([place_id]).get(place_id)
+
+    @staticmethod
+    def delete(place_id: str) -> None:
+        AttractionBlob.objects(place_id=place_id).delete()
@@ -1,30 +1,258 @@
 from __future__ import annotations
 
-from typing import Optional, Tuple
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+import re
 
-import mongoengine as me
+from bson import ObjectId
+from mongoengine.queryset.visitor import Q
+from pymongo import UpdateOne
 
 from ..models import Attraction
+from ..models.attraction import normalize_key
+from ..place_types import matching_mask, positions
+from .attraction_blob_repository import COLD_FIELDS, AttractionBlobRepository
+
+_EARTH_RADIUS_M = 6378100
+
+
+# Values written only when an upsert creates a new document (mirrors Attraction defaults)
+_INSERT_DEFAULTS: Dict[str, Any] = {
+    'formatted_address': '',
+    'city': '',
+    'city_key': '',
+    'category': '',
+    'types': [],
+    'rating': 0,
+    'user_ratings_total': 0,
+    'description': '',
+    'website': '',
+    'phone_number': '',
+    'photo_reference': '',
+    'photos_count': 0,
+    'opening_hours': {},
+    'reviews': [],
+    'likes': 0,
+    'is_featured': False,
+    'raw_data': {},
+}
+
+
+# Named projections for Attraction loads:
+# - card: what list/search cards render (no raw_data, no reviews)
+# - detail: everything except the raw Google payload
+# - full: the whole document
+# raw_data / reviews live in cold storage (attraction_blobs); see get_detail().
+CARD_FIELDS = (
+    'place_id', 'name', 'formatted_address', 'country', 'city', 'category', 'types',
+    'rating', 'user_ratings_total', 'price_level', 'location', 'description', 'website',
+    'phone_number', 'photo_reference', 'photos_count', 'opening_hours', 'likes', 'is_featured',
+)
+DETAIL_EXCLUDED_FIELDS = ('raw_data',)
+PROJECTIONS = ('card', 'detail', 'full')
+
+# Popularity sort used by lists; `_id` breaks ties so keyset pages are stable
+KEYSET_FIELDS = ('likes', 'rating', 'user_ratings_total')
 
 
 class AttractionRepository:
+    @staticmethod
+    def key_filter(field: str, value: str, legacy_lookup: str = 'icontains') -> Q:
+        """Exact match on the normalized `<field>_key`.
+
+        Documents written before the key existed (not backfilled yet) have no key and
+        are matched the old way on `field`; that branch only scans key-less documents
+        and becomes empty once `backfill_attraction_keys` has run.
+        """
+        return Q(**{f'{field}_key': normalize_key(value)}) | (
+            Q(**{f'{field}_key__in': [None, '']}) & Q(**{f'{field}__{legacy_lookup}': value})
+        )
+
+    @staticmethod
+    def project(qs, projection: str = 'full', as_pymongo: bool = False):
+        """Apply a named projection ('card', 'detail' or 'full') to an Attraction queryset.
+
+        With `as_pymongo=True` the queryset yields raw dicts, skipping Document
+        construction entirely (list endpoints map them straight to API dicts).
+        """
+        if projection == 'card':
+            qs = qs.only(*CARD_FIELDS)
+        elif projection == 'detail':
+            qs = qs.exclude(*DETAIL_EXCLUDED_FIELDS)
+        elif projection != 'full':
+            raise ValueError(f"Unknown projection {projection!r}; expected one of {PROJECTIONS}")
+        return qs.as_pymongo() if as_pymongo else qs
+
+    @staticmethod
+    def bulk_upsert(documents: List[Dict[str, Any]]) -> Dict[str, int]:
+        """Upsert raw attraction documents keyed by place_id in a single bulk_write.
+
+        Documents carrying a `content_hash` equal to the stored one are skipped, so a
+        re-sync of unchanged places costs one read and no writes. `updated_at` is only
+        bumped on documents that are actually written. An optional `_on_insert` dict
+        in a document holds values applied only when the upsert creates it.
+
+        `raw_data` and `reviews` are moved to the compressed `attraction_blobs`
+        collection; the hot document keeps them empty.
+
+        Returns created / updated / unchanged counts and the number of write ops.
+        Bypasses MongoEngine validation, so callers must use stored field names.
+        """
+        counts = {'created': 0, 'updated': 0, 'unchanged': 0, 'write_ops': 0}
+        if not documents:
+            return counts
+        collection = Attraction._get_collection()
+        place_ids = [doc['place_id'] for doc in documents]
+        existing = {
+            row['place_id']: row.get('content_hash')
+            for row in collection.find({'place_id': {'$in': place_ids}}, {'place_id': 1, 'content_hash': 1, '_id': 0})
+        }
+        now = datetime.utcnow()
+        ops = []
+        blobs: Dict[str, Dict[str, Any]] = {}
+        for doc in documents:
+            doc = dict(doc)
+            extra_on_insert = doc.pop('_on_insert', None) or {}
+            content_hash = doc.get('content_hash')
+            if content_hash and existing.get(doc['place_id']) == content_hash:
+                counts['unchanged'] += 1
+                continue
+            if any(field in doc for field in COLD_FIELDS):
+                blobs[doc['place_id']] = {
+                    'raw_data': doc.pop('raw_data', None) or {},
+                    'reviews': doc.pop('reviews', None) or [],
+                }
+                doc['raw_data'] = {}
+                doc['reviews'] = []
+            doc['updated_at'] = now
+            on_insert = {k: v for k, v in _INSERT_DEFAULTS.items() if k not in doc}
+            on_insert.update({k: v for k, v in extra_on_insert.items() if k not in doc})
+            on_insert['created_at'] = now
+            ops.append(UpdateOne({'place_id': doc['place_id']}, {'$set': doc, '$setOnInsert': on_insert}, upsert=True))
+        if blobs:
+            # Written first so a hot document never points at a missing payload
+            AttractionBlobRepository.save_many(blobs)
+        if ops:
+            result = collection.bulk_write(ops, ordered=False)
+            counts['created'] = result.upserted_count
+            counts['updated'] = result.modified_count
+            counts['unchanged'] += result.matched_count - result.modified_count
+            counts['write_ops'] = len(ops)
+        return counts
+
+    @classmethod
+    def with_cold_fields(cls, doc: Dict[str, Any]) -> Dict[str, Any]:
+        """Fill `raw_data` / `reviews` of a raw attraction dict from cold storage.
+
+        Documents not migrated yet still carry them inline and are returned as is.
+        """
+        return cls.with_cold_fields_many([doc])[0] if doc else doc
+
+    @staticmethod
+    def with_cold_fields_many(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """with_cold_fields for several raw dicts, loading their blobs in one `$in` query.
+
+        Anything that is not a dict (e.g. a loaded Document) is passed through untouched.
+        """
+        wanted = [row.get('place_id') for row in rows
+                  if isinstance(row, dict) and not (row.get('raw_data') or row.get('reviews'))]
+        wanted = [place_id for place_id in wanted if place_id]
+        if not wanted:
+            return list(rows)
+        payloads = AttractionBlobRepository.load_many(wanted)
+        filled = []
+        for row in rows:
+            payload = payloads.get(row.get('place_id')) if isinstance(row, dict) else None
+            if payload:
+                row = dict(row)
+                for field in COLD_FIELDS:
+                    row[field] = payload.get(field) or row.get(field)
+            filled.append(row)
+        return filled
+
+    @classmethod
+    def get_detail(cls, place_id: str) -> Optional[Dict[str, Any]]:
+        """Load one attraction as a raw dict with its cold fields (detail endpoints only)."""
+        doc = Attraction.objects(place_id=place_id).as_pymongo().first()
+        return cls.with_cold_fields(doc) if doc else None
+
+    @staticmethod
+    def sort_key(row: Dict[str, Any]) -> List[Any]:
+        """Keyset position of a raw attraction row: [likes, rating, user_ratings_total, id].
+
+        Missing values stay None: MongoDB sorts null apart from 0, so mapping it to 0
+        would skip or repeat rows at that boundary.
+        """
+        return [row.get(field) for field in KEYSET_FIELDS] + [str(row.get('_id'))]
+
+    @staticmethod
+    def _after_clause(after: List[Any]) -> Dict[str, Any]:
+        """Rows strictly after `after` in (-likes, -rating, -user_ratings_total, +_id) order.
+
+        A descending sort puts null (or missing) after every number, so "lower than a
+        number" includes null and nothing is lower than null.
+        """
+        *values, last_id = after
+        clauses, equal = [], {}
+        for field, value in zip(KEYSET_FIELDS, values):
+            if value is not None:
+                clauses.append({**equal, '$or': [{field: {'$lt': value}}, {field: None}]})
+            equal[field] = value
+        clauses.append({**equal, '_id': {'$gt': ObjectId(last_id)}})
+        return {'$or': clauses}
+
+    @classmethod
+    def keyset_page(cls, qs, after: Optional[List[Any]] = None, page_size: int = 20, projection: str = 'card'):
+        """One page of `qs` in popularity order, starting after the keyset position `after`.
+
+        Returns (rows, next_after) with rows as raw dicts; `next_after` is None on the
+        last page. Seeks instead of skipping, so deep pages cost the same as the first.
+        """
+        qs = qs.order_by('-likes', '-rating', '-user_ratings_total', '+id')
+        if after:
+            qs = qs.filter(__raw__=cls._after_clause(after))
+        rows = list(cls.project(qs.limit(page_size + 1), projection, as_pymongo=True))
+        if len(rows) <= page_size:
+            return rows, None
+        rows = rows[:page_size]
+        return rows, cls.sort_key(rows[-1])
+
+    @classmethod
+    def get_by_place_ids(cls, place_ids: List[str], projection: str = 'card', as_pymongo: bool = True) -> List[Any]:
+        """Load attractions for `place_ids` in one `$in` query, returned in the given order."""
+        if not place_ids:
+            return []
+        qs = cls.project(Attraction.objects(place_id__in=list(place_ids)), projection, as_pymongo)
+        by_id = {(row['place_id'] if as_pymongo else row.place_id): row for row in qs}
+        return [by_id[pid] for pid in place_ids if pid in by_id]
+
+    @classmethod
+    def get_by_ids(cls, ids: List[Any], projection: str = 'card', as_pymongo: bool = False) -> Dict[ObjectId, Any]:
+        """Load attractions by `_id` in one `$in` query, as a map keyed by ObjectId (missing ids are absent)."""
+        ids = list(dict.fromkeys(ids))
+        if not ids:
+            return {}
+        qs = cls.project(Attraction.objects(id__in=ids), projection, as_pymongo)
+        return {(row['_id'] if as_pymongo else row.id): row for row in qs}
+
     @staticmethod
     def base_queryset():
         return Attraction.objects.order_by('-likes', '-rating', '-user_ratings_total')
 
     @classmethod
-    def get_popular_by_country(cls, country: str, limit: int = 20):
-        qs = cls.base_queryset().filter(country__icontains=country)
+    def get_popular_by_country(cls, country: str, limit: int = 20, projection: str = 'card', as_pymongo: bool = False):
+        qs = cls.base_queryset().filter(cls.key_filter('country', country))
         featured = qs.filter(is_featured=True)
         if featured.count() > 0:
-            return featured.limit(limit)
-        return qs.limit(limit)
+            return cls.project(featured.limit(limit), projection, as_pymongo)
+        return cls.project(qs.limit(limit), projection, as_pymongo)
 
     @classmethod
     def search(
         cls,
         *,
         text: str = '',
+        text_mode: str = 'text',
         country: Optional[str] = None,
         city: Optional[str] = None,
         category: Optional[str] = None,
@@ -36,21 +264,38 @@ class AttractionRepository:
         location: Optional[Tuple[float, float]] = None,
         radius_m: Optional[int] = None,
         limit: int = 50,
+        projection: str = 'card',
+        as_pymongo: bool = False,
+        queryset_only: bool = False,
     ):
+        """Filter attractions.
+
+        `text_mode` selects how `text` is matched:
+        - 'text': MongoDB $text search on the name/address/city/country text index,
+          ranked by text score, then popularity.
+        - 'prefix': anchored prefix match on the normalized name (type-ahead), which
+          is an index range scan on `name_key`.
+
+        Results use the 'card' projection unless another is requested. With
+        `queryset_only=True` the filtered, unlimited queryset is returned instead
+        (e.g. for keyset_page).
+        """
         qs = cls.base_queryset()
+        use_text_index = False
 
         if text:
-            q = (
-                me.Q(name__icontains=text)
-                | me.Q(formatted_address__icontains=text)
-                | me.Q(category__icontains=text)
-            )
-            qs = qs.filter(q)
+            if text_mode == 'prefix':
+                key = normalize_key(text)
+                if key:
+                    qs = qs.filter(name_key__startswith=key)
+            else:
+                qs = qs.search_text(text).order_by('$text_score', '-likes', '-rating', '-user_ratings_total')
+                use_text_index = True
 
         if country:
-            qs = qs.filter(country__icontains=country)
+            qs = qs.filter(cls.key_filter('country', country))
         if city:
-            qs = qs.filter(city__icontains=city)
+            qs = qs.filter(cls.key_filter('city', city))
         if category:
             qs = qs.filter(category__icontains=category)
         if min_rating is not None:
@@ -62,24 +307,41 @@ class AttractionRepository:
         if price_level is not None:
             qs = qs.filter(price_level=int(price_level))
         if place_type:
-            qs = qs.filter(types__contains=place_type)
+            mask = matching_mask(place_type, bidirectional=False)
+            if mask:
+                # Documents not backfilled yet (no type_mask) are matched on their type strings,
+                # like `types__contains` does
+                qs = qs.filter(__raw__={'$or': [
+                    {'type_mask': {'$bitsAnySet': positions(mask)}},
+                    {'type_mask': None, 'types': {'$regex': re.escape(place_type)}},
+                ]})
+            else:
+                # Type not in the registry: fall back to matching the type strings
+                qs = qs.filter(types__contains=place_type)
 
         if location and radius_m:
             lat, lng = location
-            # MongoEngine expects point as [lng, lat]
-            try:
-                qs = qs.filter(location__near=[lng, lat], location__max_distance=radius_m)
-            except Exception:
-                # Fallback to using .near if filter style above not supported
-                qs = qs.near('location', [lng, lat], max_distance=radius_m)
+            if use_text_index or queryset_only:
+                # $text cannot be combined with $near (and keyset pages sort by
+                # popularity); restrict to the circle instead (radius in radians).
+                qs = qs.filter(location__geo_within_sphere=[(lng, lat), radius_m / _EARTH_RADIUS_M])
+            else:
+                # MongoEngine expects point as [lng, lat]
+                try:
+                    qs = qs.filter(location__near=[lng, lat], location__max_distance=radius_m)
+                except Exception:
+                    # Fallback to using .near if filter style above not supported
+                    qs = qs.near('location', [lng, lat], max_distance=radius_m)
 
-        return qs.limit(limit)
+        if queryset_only:
+            return qs
+        return cls.project(qs.limit(limit), projection, as_pymongo)
 
     @classmethod
-    def get_similar_nearby(cls, attraction: Attraction, limit: int = 10):
+    def get_similar_nearby(cls, attraction: Attraction, limit: int = 10, projection: str = 'card', as_pymongo: bool = False):
         qs = cls.base_queryset().filter(id__ne=attraction.id)
         if attraction.city:
-            qs = qs.filter(city__iexact=attraction.city)
+            qs = qs.filter(cls.key_filter('city', attraction.city, legacy_lookup='iexact'))
         if attraction.category:
             qs = qs.filter(category__icontains=attraction.category)
 
@@ -93,6 +355,6 @@ class AttractionRepository:
                 except Exception:
                     # ignore geo ordering if it fails
                     pass
-        return qs.limit(limit)
+        return cls.project(qs.limit(limit), projection, as_pymongo)
 
 
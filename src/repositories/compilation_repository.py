@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, List, Optional
+
+from bson import DBRef, ObjectId
+from mongoengine import Document
+
+from ..models import Compilation
+from .attraction_repository import AttractionRepository
+
+
+class CompilationRepository:
+    @staticmethod
+    def for_owner(user) -> List[Compilation]:
+        return list(Compilation.objects(owner=user).order_by('-updated_at'))
+
+    @staticmethod
+    def reference_id(doc, field: str) -> Optional[ObjectId]:
+        """Id held by the ReferenceField `field` of `doc`, read without dereferencing it.
+
+        Accessing the attribute loads the referenced document (one query each); the
+        raw reference stored on the document already carries the id.
+        """
+        ref = doc._data.get(field) if hasattr(doc, '_data') else getattr(doc, field, None)
+        if isinstance(ref, DBRef):
+            return ref.id
+        if isinstance(ref, Document):
+            return ref.pk
+        return ref
+
+    @classmethod
+    def attraction_id(cls, item) -> Optional[ObjectId]:
+        """Id of the attraction referenced by a CompilationItem."""
+        return cls.reference_id(item, 'attraction')
+
+    @classmethod
+    def attractions_for(cls, compilations: Iterable[Compilation], projection: str = 'card') -> Dict[ObjectId, Any]:
+        """Every attraction referenced by `compilations`, loaded in a single `$in` query and keyed by id.
+
+        Dangling references are simply absent from the map.
+        """
+        items = [item for compilation in compilations for item in (getattr(compilation, 'items', None) or [])]
+        return cls.attractions_for_items(items, projection)
+
+    @classmethod
+    def attractions_for_items(cls, items: Iterable[Any], projection: str = 'card') -> Dict[ObjectId, Any]:
+        """Attractions referenced by `items`, keyed by id.
+
+        'card' yields Documents. Wider projections yield raw dicts with their cold
+        fields (`raw_data` / `reviews`) loaded from attraction_blobs in one more query.
+        """
+        ids = [att_id for att_id in (cls.attraction_id(item) for item in items) if att_id is not None]
+        if projection == 'card':
+            return AttractionRepository.get_by_ids(ids, projection=projection)
+        rows = AttractionRepository.get_by_ids(ids, projection=projection, as_pymongo=True)
+        return dict(zip(rows, AttractionRepository.with_cold_fields_many(list(rows.values()))))
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import logging
+import time
+
+from ..models import PlaceDetailsCacheEntry
+
+logger = logging.getLogger(__name__)
+
+_HOUR = 60 * 60
+_DAY = 24 * _HOUR
+
+# Freshness per Google Places field (seconds). Overridable via settings.PLACE_DETAILS_FIELD_TTL.
+DEFAULT_FIELD_TTL: Dict[str, int] = {
+    'rating': 6 * _HOUR,
+    'user_ratings_total': 6 * _HOUR,
+    'opening_hours': 12 * _HOUR,
+    'reviews': _DAY,
+    'photo': 3 * _DAY,
+    'price_level': 7 * _DAY,
+    'website': 14 * _DAY,
+    'formatted_phone_number': 14 * _DAY,
+    'type': 14 * _DAY,
+    'place_id': 30 * _DAY,
+    'name': 30 * _DAY,
+    'formatted_address': 30 * _DAY,
+    'address_component': 30 * _DAY,
+    'geometry': 30 * _DAY,
+}
+DEFAULT_TTL = _DAY
+
+# Requested field name -> key it populates in the details response
+_RESPONSE_KEYS = {
+    'type': 'types',
+    'photo': 'photos',
+    'address_component': 'address_components',
+}
+
+
+def _settings_value(name: str, default: Any) -> Any:
+    try:
+        from django.conf import settings
+        return getattr(settings, name, default)
+    except Exception:
+        return default
+
+
+class PlaceDetailsRepository:
+    """MongoDB-backed cache of Google Places details keyed by place_id + field set."""
+
+    @staticmethod
+    def fields_key(fields: Iterable[str]) -> str:
+        return ','.join(sorted(set(fields)))
+
+    @staticmethod
+    def field_ttl(field: str) -> float:
+        overrides = _settings_value('PLACE_DETAILS_FIELD_TTL', {}) or {}
+        if field in overrides:
+            return float(overrides[field])
+        return float(DEFAULT_FIELD_TTL.get(field, _settings_value('PLACE_DETAILS_DEFAULT_TTL', DEFAULT_TTL)))
+
+    @classmethod
+    def stale_fields(cls, entry: PlaceDetailsCacheEntry, fields: Iterable[str], now: Optional[float] = None) -> List[str]:
+        now = time.time() if now is None else now
+        fetched_at = entry.field_fetched_at or {}
+        stale = []
+        for field in fields:
+            ts = fetched_at.get(field)
+            if ts is None or now - float(ts) >= cls.field_ttl(field):
+                stale.append(field)
+        return stale
+
+    @classmethod
+    def lookup(cls, place_id: str, fields: List[str]) -> Tuple[Optional[Dict[str, Any]], List[str]]:
+        """Return (cached payload or None, fields that need refreshing)."""
+        try:
+            entry = PlaceDetailsCacheEntry.objects(place_id=place_id, fields_key=cls.fields_key(fields)).first()
+        except Exception as e:
+            logger.debug("Place details cache lookup failed for %s: %s", place_id, e)
+            return None, list(fields)
+        if entry is None:
+            return None, list(fields)
+        return dict(entry.payload or {}), cls.stale_fields(entry, fields)
+
+    @staticmethod
+    def merge(cached: Optional[Dict[str, Any]], fresh: Dict[str, Any], refreshed_fields: Iterable[str]) -> Dict[str, Any]:
+        """Overlay freshly fetched fields on a cached payload, dropping keys Google no longer returns."""
+        merged = dict(cached or {})
+        for field in refreshed_fields:
+            merged.pop(_RESPONSE_KEYS.get(field, field), None)
+        merged.update(fresh or {})
+        return merged
+
+    @classmethod
+    def store(cls, place_id: str, fields: List[str], payload: Dict[str, Any], refreshed_fields: Iterable[str]) -> None:
+        now = time.time()
+        set_ops: Dict[str, Any] = {
+            'set__payload': payload,
+            'set__updated_at': datetime.utcnow(),
+            'set_on_insert__created_at': datetime.utcnow(),
+        }
+        for field in refreshed_fields:
+            set_ops[f'set__field_fetched_at__{field}'] = now
+        try:
+            PlaceDetailsCacheEntry.objects(place_id=place_id, fields_key=cls.fields_key(fields)).update_one(
+                upsert=True, **set_ops
+            )
+        except Exception as e:
+            logger.debug("Place details cache store failed for %s: %s", place_id, e)
+
+    @staticmethod
+    def invalidate(place_id: str) -> None:
+        try:
+            PlaceDetailsCacheEntry.objects(place_id=place_id).delete()
+        except Exception as e:
+            logger.debug("Place details cache invalidate failed for %s: %s", place_id, e)
@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from ..models import PopularList
+from ..models.attraction import normalize_key
+
+
+class PopularListRepository:
+    @staticmethod
+    def get(country: str, city: Optional[str] = None, profile: str = 'tourist') -> Optional[Dict[str, Any]]:
+        """Materialized list for (country, city, profile) as a raw dict, or None (one indexed read)."""
+        return PopularList.objects(
+            country_key=normalize_key(country),
+            city_key=normalize_key(city),
+            profile=profile,
+        ).only('place_ids', 'computed_at').as_pymongo().first()
+
+    @staticmethod
+    def save(country: str, city: Optional[str], profile: str, place_ids: List[str], candidates: int = 0) -> None:
+        PopularList.objects(
+            country_key=normalize_key(country),
+            city_key=normalize_key(city),
+            profile=profile,
+        ).update_one(
+            upsert=True,
+            set__country=country,
+            set__city=city or '',
+            set__place_ids=list(place_ids),
+            set__candidates=candidates,
+            set__computed_at=datetime.utcnow(),
+        )
+
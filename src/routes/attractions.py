@@ -4,9 +4,15 @@ from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
 
 from ..models import Attraction, Compilation
-from ..serializers import AttractionSerializer, CompilationSerializer
+from ..serializers import (DEFAULT_ATTRACTION_FIELDS, AttractionSerializer, CompilationSerializer, attraction_projection,
+                           attraction_to_native, compilation_to_native, parse_fields)
 from ..controllers.attractions_controller import AttractionsController
 from ..controllers.compilations_controller import CompilationsController
+from ..repositories.attraction_blob_repository import COLD_FIELDS
+from ..repositories.attraction_repository import AttractionRepository
+from ..repositories.compilation_repository import CompilationRepository
+from ..pagination import InvalidCursor, wants_pagination
+from ..json_renderer import ndjson_response, wants_ndjson
 
 
 class AttractionViewSet(viewsets.ViewSet):
@@ -16,6 +22,64 @@ class AttractionViewSet(viewsets.ViewSet):
     serializer_class = AttractionSerializer
     # Make public by default; protect only mutating endpoints explicitly
     permission_classes = [AllowAny]
+    # Actions returning attraction payloads, which honour `?fields=` (sparse fieldsets)
+    sparse_actions = ('list', 'retrieve', 'popular', 'search', 'similar')
+    # Actions streamed line by line when the client asks for NDJSON
+    streaming_actions = ('list', 'search')
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        action_name = getattr(self, 'action', None)
+        if isinstance(response, Response) and response.status_code == status.HTTP_200_OK:
+            # Attraction payloads always go out in a fieldset (detail unless ?fields= asks otherwise),
+            # whether they come from Google, the caches or MongoDB
+            fields = (parse_fields(request.query_params.get('fields')) or DEFAULT_ATTRACTION_FIELDS
+                      if action_name in self.sparse_actions else None)
+            if action_name in self.streaming_actions and wants_ndjson(request):
+                response = self._streamed(response, fields)
+            elif fields:
+                data = response.data
+                if isinstance(data, dict) and 'results' in data:
+                    results = self._with_cold_fields(data['results'], fields)
+                    response.data = {**data, 'results': AttractionSerializer(results, many=True, fields=fields).data}
+                elif isinstance(data, list):
+                    response.data = AttractionSerializer(self._with_cold_fields(data, fields), many=True, fields=fields).data
+                elif isinstance(data, dict):
+                    response.data = AttractionSerializer(self._with_cold_fields([data], fields)[0], fields=fields).data
+        return super().finalize_response(request, response, *args, **kwargs)
+
+    @staticmethod
+    def _with_cold_fields(rows, fields):
+        """Rows with `raw_data` / `reviews` loaded from attraction_blobs when `fields` asks for them.
+
+        DB-backed rows are read without those cold fields; Google-mapped rows already carry them.
+        """
+        if not any(name in fields for name in COLD_FIELDS):
+            return rows
+        return AttractionRepository.with_cold_fields_many(rows)
+
+    @classmethod
+    def _streamed(cls, response, fields=None):
+        """NDJSON stream of a list (or cursor page) response; each item is serialized as it is sent.
+
+        A page's next cursor goes in the X-Next-Cursor header. Other payloads are left
+        to NDJSONRenderer.
+        """
+        serialize = (lambda row: attraction_to_native(row, fields)) if fields else None
+        data = response.data
+        if isinstance(data, dict) and isinstance(data.get('results'), list):
+            headers = {'X-Next-Cursor': data['next']} if data.get('next') else None
+            return ndjson_response(cls._with_cold_fields(data['results'], fields or ()), serialize, headers=headers)
+        if isinstance(data, list):
+            return ndjson_response(cls._with_cold_fields(data, fields or ()), serialize)
+        return response
+
+    def _paginated(self, params):
+        """Cursor-paginated response ({'results', 'next'}) for requests sending page_size or cursor."""
+        try:
+            page = AttractionsController.search_page(params)
+        except InvalidCursor as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(page, status=status.HTTP_200_OK)
 
     def list(self, request):
         try:
@@ -25,6 +89,17 @@ class AttractionViewSet(viewsets.ViewSet):
             lat = params.get('lat') or params.get('latitude') or params.get('location')
             country = params.get('country')
 
+            if wants_pagination(params):
+                page_params = params.copy()
+                user = getattr(request, 'user', None)
+                if user and hasattr(user, 'selected_profile'):
+                    page_params['profile'] = user.selected_profile or 'tourist'
+                elif 'profile' not in page_params:
+                    page_params['profile'] = 'tourist'
+                if not q and not lat and not country:
+                    page_params['country'] = 'France'
+                return self._paginated(page_params)
+
             if not q and not lat:
                 country = country or 'France'
                 limit = int(params.get('limit', 20))
@@ -81,6 +156,10 @@ class AttractionViewSet(viewsets.ViewSet):
             user = getattr(request, 'user', None)
             if user and hasattr(user, 'selected_profile'):
                 profile = user.selected_profile or profile
+            if wants_pagination(request.query_params):
+                page_params = {k: request.query_params.get(k) for k in ('country', 'city', 'cursor', 'page_size')}
+                page_params.update(country=country, profile=profile)
+                return self._paginated(page_params)
             qs = AttractionsController.popular_by_country(country, limit, profile)
             # popular_by_country returns mapped dicts from Google Places
             if qs and isinstance(qs, list) and len(qs) and isinstance(qs[0], dict):
@@ -114,6 +193,11 @@ class AttractionViewSet(viewsets.ViewSet):
                 # Default to tourist if nothing else available
                 params['profile'] = 'tourist'
 
+            if wants_pagination(params):
+                if not q and not lat and not country:
+                    params['country'] = 'France'
+                return self._paginated(params)
+
             # Get city from query params if available
             city = params.get('city')
 
@@ -160,10 +244,10 @@ class AttractionViewSet(viewsets.ViewSet):
         try:
             country = request.data.get('country', 'France')
             limit = int(request.data.get('limit', 20))
-            synced, total = AttractionsController.sync_from_google(country, limit)
-            if total == 0:
+            report = AttractionsController.sync_from_google(country, limit)
+            if report['total_found'] == 0:
                 return Response({'error': 'No places found'}, status=400)
-            return Response({'message': f'Synced {synced} new attractions from Google Places', 'total_found': total})
+            return Response({'message': f"Synced {report['created']} new attractions from Google Places", **report})
         except Exception as e:
             import traceback
             return Response({'error': str(e), 'details': traceback.format_exc()}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -189,48 +273,7 @@ class AttractionViewSet(viewsets.ViewSet):
             compilation_name = request.data.get('compilation_name')
             from ..controllers.attractions_controller import AttractionsController as AC
             compilation = AC.save_place_to_user(request.user, place_id, compilation_id=compilation_id, compilation_name=compilation_name)
-            # Return JSON-safe compilation representation
-            def sanitize(value):
-                try:
-                    import datetime
-                    if getattr(value, '__class__', None) and value.__class__.__name__ == 'ObjectId':
-                        return str(value)
-                    if isinstance(value, (str, int, float, bool)) or value is None:
-                        return value
-                    if isinstance(value, datetime.datetime):
-                        return value.isoformat()
-                    if isinstance(value, list):
-                        return [sanitize(v) for v in value]
-                    if isinstance(value, dict):
-                        return {k: sanitize(v) for k, v in value.items()}
-                except Exception:
-                    return value
-                return value
-
-            from ..serializers import AttractionSerializer as AttSer
-            items = []
-            for it in getattr(compilation, 'items', []) or []:
-                att_payload = None
-                try:
-                    if getattr(it, 'attraction', None) is not None:
-                        att_payload = AttSer(it.attraction).data
-                except Exception:
-                    att_payload = None
-                items.append(sanitize({
-                    'attraction': att_payload,
-                    'order_index': getattr(it, 'order_index', 0),
-                    'added_at': getattr(it, 'added_at', None),
-                }))
-
-            payload = sanitize({
-                'id': str(getattr(compilation, 'id', '')),
-                'name': getattr(compilation, 'name', ''),
-                'profile': getattr(compilation, 'profile', ''),
-                'country': getattr(compilation, 'country', ''),
-                'items': items,
-                'created_at': getattr(compilation, 'created_at', None),
-                'updated_at': getattr(compilation, 'updated_at', None),
-            })
+            payload = compilation_to_native(compilation)
             return Response(payload, status=status.HTTP_201_CREATED)
         except PermissionError as pe:
             return Response({'error': str(pe)}, status=status.HTTP_403_FORBIDDEN)
@@ -243,61 +286,10 @@ class CompilationViewSet(viewsets.ViewSet):
     serializer_class = CompilationSerializer
 
     @staticmethod
-    def _sanitize(value):
-        try:
-            import datetime
-            # Convert Mongo ObjectId to string without importing bson
-            if getattr(value, '__class__', None) and value.__class__.__name__ == 'ObjectId':
-                return str(value)
-            if isinstance(value, (str, int, float, bool)) or value is None:
-                return value
-            if isinstance(value, datetime.datetime):
-                return value.isoformat()
-            if isinstance(value, list):
-                return [CompilationViewSet._sanitize(v) for v in value]
-            if isinstance(value, dict):
-                return {k: CompilationViewSet._sanitize(v) for k, v in value.items()}
-        except Exception:
-            return value
-        return value
-
-    @staticmethod
-    def _to_safe_compilation_dict(comp):
-        # Build a JSON-serializable dict with string ids and nested attraction payloads
-        try:
-            items = []
-            for it in getattr(comp, 'items', []) or []:
-                try:
-                    from ..serializers import AttractionSerializer as AttSer
-                    att_payload = AttSer(getattr(it, 'attraction', None)).data if getattr(it, 'attraction', None) else None
-                except Exception:
-                    att_payload = None
-                item_dict = {
-                    'attraction': att_payload,
-                    'order_index': getattr(it, 'order_index', 0),
-                    'added_at': getattr(it, 'added_at', None),
-                }
-                items.append(CompilationViewSet._sanitize(item_dict))
-        except Exception:
-            items = []
-
-        payload = {
-            'id': str(getattr(comp, 'id', '')),
-            'name': getattr(comp, 'name', ''),
-            'profile': getattr(comp, 'profile', ''),
-            'country': getattr(comp, 'country', ''),
-            'items': items,
-            'created_at': getattr(comp, 'created_at', None),
-            'updated_at': getattr(comp, 'updated_at', None),
-        }
-        # Include owner if present, but as string id
-        try:
-            owner = getattr(comp, 'owner', None)
-            if owner is not None:
-                payload['owner'] = str(getattr(owner, 'id', owner))
-        except Exception:
-            pass
-        return CompilationViewSet._sanitize(payload)
+    def _to_safe_compilation_dict(comp, attractions=None, fields=None):
+        # JSON-native payload with string ids and nested attraction payloads; `attractions`
+        # (CompilationRepository.attractions_for) lets several compilations share one query
+        return compilation_to_native(comp, attractions, include_owner=True, fields=fields)
 
     def list(self, request):
         try:
@@ -305,10 +297,15 @@ class CompilationViewSet(viewsets.ViewSet):
             user = getattr(request, 'user', None)
             if not user or not getattr(user, 'id', None):
                 return Response([], status=status.HTTP_200_OK)
-            qs = Compilation.objects(owner=user).order_by('-updated_at')
-            comps = list(qs)
+            comps = CompilationRepository.for_owner(user)
+            fields = parse_fields(request.query_params.get('fields'))
+            # One query for every attraction referenced by any of the compilations, projected for `fields`
+            attractions = CompilationRepository.attractions_for(comps, attraction_projection(fields))
             # Manually serialize to avoid any ObjectId leakage
-            data = [self._to_safe_compilation_dict(comp) for comp in comps]
+            if wants_ndjson(request):
+                # One line per compilation, each serialized as it is sent
+                return ndjson_response(comps, lambda comp: self._to_safe_compilation_dict(comp, attractions, fields))
+            data = [self._to_safe_compilation_dict(comp, attractions, fields) for comp in comps]
             return Response(data)
         except Exception as e:
             import traceback
@@ -324,7 +321,7 @@ class CompilationViewSet(viewsets.ViewSet):
                     return Response({'error': 'Forbidden'}, status=status.HTTP_403_FORBIDDEN)
             except Exception:
                 pass
-            data = self._to_safe_compilation_dict(comp)
+            data = self._to_safe_compilation_dict(comp, fields=parse_fields(request.query_params.get('fields')))
             return Response(data)
         except Exception as e:
             return Response({'error': 'Not found', 'details': str(e)}, status=status.HTTP_404_NOT_FOUND)
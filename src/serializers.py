@@ -7,71 +7,250 @@ except Exception:
     DocumentSerializer = None
     MONGOENGINE_SERIALIZER_AVAILABLE = False
 
-try:
-    from bson import ObjectId
-    BSON_AVAILABLE = True
-except ImportError:
-    ObjectId = None
-    BSON_AVAILABLE = False
-
-from .models import Attraction, Compilation, CompilationItem, User
+from functools import lru_cache
+from typing import Optional, Tuple
+import datetime
 
+from bson import DBRef, ObjectId
 
-if MONGOENGINE_SERIALIZER_AVAILABLE:
-    from rest_framework import serializers as drf_serializers
+from .models import Attraction, Compilation, CompilationItem, User
+from .repositories.attraction_repository import CARD_FIELDS
+from .repositories.compilation_repository import CompilationRepository
+
+# Types emitted as-is by to_native (exact class match, checked first)
+_NATIVE_SCALARS = frozenset({str, int, float, bool, type(None)})
+
+
+def to_native(value):
+    """JSON-native copy of `value`, built in a single traversal.
+
+    ObjectId and DBRef become id strings, datetimes and dates ISO strings, and any
+    dict/list-like container (including MongoEngine's BaseDict/BaseList, tuples and
+    sets) a plain dict or list. Other values are returned unchanged.
+    """
+    cls = value.__class__
+    if cls in _NATIVE_SCALARS:
+        return value
+    if isinstance(value, dict):
+        return {key: to_native(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return [to_native(item) for item in value]
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, DBRef):
+        return str(value.id)
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    return value
+
+
+# Attraction payload fields, in output order. `id` mirrors place_id (the stable API id).
+ATTRACTION_FIELDS = (
+    'id', 'place_id', 'name', 'formatted_address', 'country', 'city', 'category', 'types',
+    'rating', 'user_ratings_total', 'price_level', 'location', 'description', 'website',
+    'phone_number', 'photo_reference', 'photos_count', 'opening_hours', 'reviews', 'likes',
+    'is_featured', 'raw_data', 'created_at', 'updated_at',
+)
+# Named sparse fieldsets for `?fields=`; raw_data is only emitted when asked for
+ATTRACTION_FIELDSETS = {
+    'card': ('id',) + CARD_FIELDS,
+    'detail': tuple(name for name in ATTRACTION_FIELDS if name != 'raw_data'),
+    'full': ATTRACTION_FIELDS,
+}
+DEFAULT_ATTRACTION_FIELDS = ATTRACTION_FIELDSETS['detail']
+
+_ATTRACTION_DEFAULTS = {'rating': 0, 'user_ratings_total': 0, 'photos_count': 0, 'likes': 0, 'is_featured': False}
+
+
+def parse_fields(value) -> Optional[Tuple[str, ...]]:
+    """Field names for a `?fields=` value: a named fieldset ('card', 'detail', 'full') or a comma list.
+
+    Unknown names are dropped; returns None when nothing usable was given.
+    """
+    if not value:
+        return None
+    if isinstance(value, str):
+        if value in ATTRACTION_FIELDSETS:
+            return ATTRACTION_FIELDSETS[value]
+        value = value.split(',')
+    wanted = {str(name).strip() for name in value}
+    names = tuple(name for name in ATTRACTION_FIELDS if name in wanted)
+    return names or None
+
+
+def attraction_projection(fields: Optional[Tuple[str, ...]] = None) -> str:
+    """Narrowest AttractionRepository projection ('card', 'detail', 'full') covering `fields`."""
+    names = set(fields or DEFAULT_ATTRACTION_FIELDS)
+    if names <= set(ATTRACTION_FIELDSETS['card']):
+        return 'card'
+    return 'full' if 'raw_data' in names else 'detail'
+
+
+def _location(loc):
+    """Stored GeoJSON point (or an already mapped {lat,lng}) as {lat, lng}."""
+    if not loc:
+        return None
+    if isinstance(loc, dict):
+        if 'lat' in loc:
+            return {'lat': loc.get('lat'), 'lng': loc.get('lng')}
+        coords = loc.get('coordinates')
+    elif isinstance(loc, (list, tuple)):
+        coords = loc
+    else:
+        coords = getattr(loc, 'coordinates', None)
+    if coords and len(coords) >= 2:
+        return {'lat': coords[1], 'lng': coords[0]}
+    return None
+
+
+def _photo_reference_with_fallback(get):
+    # Derive photo_reference from raw_data.photos when missing (only when raw_data is requested)
+    ref = get('photo_reference')
+    if not ref:
+        photos = (get('raw_data') or {}).get('photos') or []
+        if photos and isinstance(photos, list):
+            ref = (photos[0] or {}).get('photo_reference') or ref
+    return ref
+
+
+def _field_getter(name: str, names: Tuple[str, ...]):
+    if name == 'id':
+        return lambda get: get('place_id')
+    if name == 'location':
+        return lambda get: _location(get('location'))
+    if name == 'types':
+        return lambda get: list(get('types') or [])
+    if name == 'photo_reference' and 'raw_data' in names:
+        return _photo_reference_with_fallback
+    if name in ('opening_hours', 'raw_data'):
+        return lambda get: to_native(get(name) or {})
+    if name == 'reviews':
+        return lambda get: to_native(get('reviews') or [])
+    if name in ('created_at', 'updated_at'):
+        return lambda get: to_native(get(name))
+    if name in _ATTRACTION_DEFAULTS:
+        default = _ATTRACTION_DEFAULTS[name]
+        return lambda get: get(name) or default
+    return lambda get: get(name)
+
+
+@lru_cache(maxsize=128)
+def _attraction_plan(names: Tuple[str, ...]):
+    """(name, getter) pairs for a fieldset, built once per distinct fieldset."""
+    return tuple((name, _field_getter(name, names)) for name in names)
+
+
+def attraction_to_native(obj, fields: Optional[Tuple[str, ...]] = None) -> dict:
+    """JSON-native attraction payload restricted to `fields` (DEFAULT_ATTRACTION_FIELDS).
+
+    `obj` is an Attraction document, a raw pymongo dict or an already mapped
+    attraction dict; only the requested fields are read.
+    """
+    if isinstance(obj, dict):
+        get = obj.get
+    else:
+        def get(name):
+            return getattr(obj, name, None)
+    return {name: getter(get) for name, getter in _attraction_plan(tuple(fields or DEFAULT_ATTRACTION_FIELDS))}
+
+
+class AttractionSerializer(serializers.Serializer):
+    """Attraction payloads, with an optional sparse fieldset.
+
+    `AttractionSerializer(obj, fields='card')` (or `context={'fields': ...}`) limits
+    the output to those fields; see parse_fields. Reading goes through
+    attraction_to_native rather than per-field DRF serialization.
+    """
+    id = serializers.CharField(read_only=True)
+    place_id = serializers.CharField()
+    name = serializers.CharField()
+    formatted_address = serializers.CharField(allow_blank=True)
+    country = serializers.CharField()
+    city = serializers.CharField(allow_blank=True)
+    category = serializers.CharField(allow_blank=True)
+    types = serializers.ListField(child=serializers.CharField(), allow_empty=True, default=list)
+    rating = serializers.FloatField(default=0)
+    user_ratings_total = serializers.IntegerField(default=0)
+    price_level = serializers.IntegerField(allow_null=True, required=False)
+    location = serializers.DictField(allow_null=True, required=False)
+    description = serializers.CharField(allow_blank=True, required=False)
+    website = serializers.CharField(allow_blank=True, required=False)
+    phone_number = serializers.CharField(allow_blank=True, required=False)
+    photo_reference = serializers.CharField(allow_blank=True, required=False)
+    photos_count = serializers.IntegerField(default=0)
+    opening_hours = serializers.DictField(default=dict)
+    reviews = serializers.ListField(child=serializers.DictField(), default=list)
+    likes = serializers.IntegerField(default=0)
+    is_featured = serializers.BooleanField(default=False)
+    raw_data = serializers.DictField(default=dict)
+    created_at = serializers.DateTimeField(read_only=True)
+    updated_at = serializers.DateTimeField(read_only=True)
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.sparse_fields = parse_fields(fields) or parse_fields(self.context.get('fields')) or DEFAULT_ATTRACTION_FIELDS
 
-    class AttractionSerializer(DocumentSerializer):
-        location = drf_serializers.SerializerMethodField()
+    def create(self, validated_data):
+        # Ensure location saved as GeoJSON Point if present
+        loc = validated_data.get('location')
+        if loc and isinstance(loc, dict) and 'lat' in loc and 'lng' in loc:
+            validated_data['location'] = {'type': 'Point', 'coordinates': [loc['lng'], loc['lat']]}
+        att = Attraction(**validated_data)
+        att.save()
+        return att
 
-        class Meta:
-            model = Attraction
-            fields = '__all__'
-
-        def get_location(self, obj):
-            loc = getattr(obj, 'location', None)
-            if not loc:
-                return None
-            # MongoEngine may return PointField as dict-like or as pymongo SON
-            try:
-                coords = loc.get('coordinates') if isinstance(loc, dict) else (getattr(loc, 'coordinates', None) or [])
-            except Exception:
-                coords = []
-            if coords and len(coords) >= 2:
-                return {'lat': coords[1], 'lng': coords[0]}
-            return None
+    def to_representation(self, instance):
+        return attraction_to_native(instance, self.sparse_fields)
+
+
+def compilation_item_to_native(item, attractions, fields: Optional[Tuple[str, ...]] = None) -> dict:
+    """One compilation item, its attraction resolved from `attractions` (id -> document).
+
+    A dangling reference (attraction deleted) or an unserializable attraction yields
+    `attraction: None`.
+    """
+    attraction = attractions.get(CompilationRepository.attraction_id(item))
+    try:
+        attraction_data = attraction_to_native(attraction, fields) if attraction is not None else None
+    except Exception:
+        attraction_data = None
+    return {
+        'attraction': attraction_data,
+        'order_index': getattr(item, 'order_index', 0),
+        'added_at': to_native(getattr(item, 'added_at', None)),
+    }
+
+
+def compilation_to_native(compilation, attractions=None, include_owner: bool = False,
+                          fields: Optional[Tuple[str, ...]] = None) -> dict:
+    """API payload of a compilation with nested attractions, as JSON-native types.
+
+    `attractions` maps attraction id -> document (CompilationRepository.attractions_for);
+    pass one map to serialize several compilations off a single query, loaded with
+    attraction_projection(fields). Without it, this compilation's attractions are
+    loaded in one query. `fields` is the sparse fieldset of the nested attractions.
+    """
+    if attractions is None:
+        attractions = CompilationRepository.attractions_for([compilation], attraction_projection(fields))
+    items = [compilation_item_to_native(item, attractions, fields) for item in getattr(compilation, 'items', None) or []]
+    comp_id = getattr(compilation, 'id', None)
+    payload = {
+        'id': str(comp_id) if comp_id is not None else None,
+        'name': getattr(compilation, 'name', ''),
+        'profile': getattr(compilation, 'profile', ''),
+        'country': getattr(compilation, 'country', ''),
+        'items': items,
+        'created_at': to_native(getattr(compilation, 'created_at', None)),
+        'updated_at': to_native(getattr(compilation, 'updated_at', None)),
+    }
+    if include_owner:
+        owner_id = CompilationRepository.reference_id(compilation, 'owner')
+        if owner_id is not None:
+            payload['owner'] = str(owner_id)
+    return payload
 
-        def to_representation(self, obj):
-            """Normalize output so frontend has stable fields.
-
-            - Ensure `location` is {lat,lng}
-            - Expose a stable `id` equal to `place_id` for API consumers
-            """
-            data = super().to_representation(obj)
-            # Normalize location already handled via get_location
-            # Stable id for clients
-            data['id'] = data.get('place_id') or getattr(obj, 'place_id', None)
-            # Mirror pk to id (string) and strip raw ObjectIds
-            if 'pk' in data:
-                data['pk'] = data['id']
-            # Coerce any stray ObjectId-like values to string
-            try:
-                for k, v in list(data.items()):
-                    if getattr(v, '__class__', None) and v.__class__.__name__ == 'ObjectId':
-                        data[k] = str(v)
-            except Exception:
-                pass
-            # Fallback: derive photo_reference from raw_data.photos if missing
-            try:
-                if not data.get('photo_reference'):
-                    photos = (data.get('raw_data') or {}).get('photos') or []
-                    if photos and isinstance(photos, list):
-                        ref = (photos[0] or {}).get('photo_reference')
-                        if ref:
-                            data['photo_reference'] = ref
-            except Exception:
-                pass
-            return data
 
+if MONGOENGINE_SERIALIZER_AVAILABLE:
     class CompilationItemSerializer(DocumentSerializer):
         attraction = AttractionSerializer(read_only=True)
 
@@ -79,60 +258,12 @@ if MONGOENGINE_SERIALIZER_AVAILABLE:
             model = CompilationItem
             fields = ('attraction', 'order_index', 'added_at')
 
-        def _sanitize_objectids(self, obj):
-            """Recursively convert ObjectId instances to strings."""
-            if obj is None:
-                return None
-            # Check if it's an ObjectId - use isinstance if available
-            if BSON_AVAILABLE and isinstance(obj, ObjectId):
-                return str(obj)
-            # Fallback: check by class name
-            obj_class_name = getattr(obj, '__class__', None)
-            if obj_class_name:
-                class_name = getattr(obj_class_name, '__name__', '')
-                if class_name == 'ObjectId' or 'ObjectId' in str(type(obj)):
-                    return str(obj)
-            if isinstance(obj, dict):
-                return {k: self._sanitize_objectids(v) for k, v in obj.items()}
-            if isinstance(obj, list):
-                return [self._sanitize_objectids(item) for item in obj]
-            if isinstance(obj, tuple):
-                return tuple(self._sanitize_objectids(item) for item in obj)
-            if isinstance(obj, set):
-                return {self._sanitize_objectids(item) for item in obj}
-            return obj
-
         def to_representation(self, obj):
-            data = super().to_representation(obj)
-            
-            # Immediately sanitize the raw data from super() to catch any ObjectIds
-            data = self._sanitize_objectids(data)
-            
-            # Ensure nested attraction is fully serialized (not ObjectId)
-            try:
-                attraction = getattr(obj, 'attraction', None)
-                if attraction is not None:
-                    # Try to access the attraction to see if reference is valid
-                    try:
-                        _ = attraction.id  # Force dereference to check if valid
-                        attraction_data = AttractionSerializer(attraction).data
-                        # Sanitize any ObjectIds in attraction data
-                        data['attraction'] = self._sanitize_objectids(attraction_data)
-                    except Exception:
-                        # Reference is broken or attraction doesn't exist
-                        # Keep only the ID if available
-                        try:
-                            att_id = str(attraction.id) if hasattr(attraction, 'id') else None
-                            data['attraction'] = {'id': att_id} if att_id else None
-                        except Exception:
-                            data['attraction'] = None
-            except Exception as e:
-                # If anything fails, set attraction to None
-                data['attraction'] = None
-            
-            # Final sanitization pass (double pass for safety)
-            data = self._sanitize_objectids(data)
-            return data
+            fields = parse_fields(self.context.get('fields'))
+            attractions = self.context.get('attractions')
+            if attractions is None:
+                attractions = CompilationRepository.attractions_for_items([obj], attraction_projection(fields))
+            return compilation_item_to_native(obj, attractions, fields)
 
     class CompilationSerializer(DocumentSerializer):
         items = CompilationItemSerializer(many=True, read_only=True)
@@ -141,155 +272,24 @@ if MONGOENGINE_SERIALIZER_AVAILABLE:
             model = Compilation
             fields = ('id', 'name', 'profile', 'country', 'items', 'created_at', 'updated_at')
 
-        def _sanitize_objectids(self, obj):
-            """Recursively convert ObjectId instances to strings."""
-            if obj is None:
-                return None
-            # Check if it's an ObjectId - use isinstance if available
-            if BSON_AVAILABLE and isinstance(obj, ObjectId):
-                return str(obj)
-            # Fallback: check by class name
-            obj_class_name = getattr(obj, '__class__', None)
-            if obj_class_name:
-                class_name = getattr(obj_class_name, '__name__', '')
-                if class_name == 'ObjectId' or 'ObjectId' in str(type(obj)):
-                    return str(obj)
-            # Handle dictionaries
-            if isinstance(obj, dict):
-                return {k: self._sanitize_objectids(v) for k, v in obj.items()}
-            # Handle lists
-            if isinstance(obj, list):
-                return [self._sanitize_objectids(item) for item in obj]
-            # Handle tuples
-            if isinstance(obj, tuple):
-                return tuple(self._sanitize_objectids(item) for item in obj)
-            # Handle sets
-            if isinstance(obj, set):
-                return {self._sanitize_objectids(item) for item in obj}
-            return obj
-
         def to_representation(self, obj):
-            data = super().to_representation(obj)
-            # Ensure id is a string for JSON encoding (must be done before sanitization)
-            if 'id' in data:
-                if data['id'] is not None:
-                    data['id'] = str(data['id'])
-                else:
-                    data['id'] = None
-            
-            # Normalize items using our item serializer to avoid raw ObjectIds
-            try:
-                items_data = []
-                for item in getattr(obj, 'items', []):
-                    try:
-                        item_data = CompilationItemSerializer(item).data
-                        # Sanitize any ObjectIds in the item data
-                        item_data = self._sanitize_objectids(item_data)
-                        items_data.append(item_data)
-                    except Exception:
-                        # Skip items that can't be serialized
-                        continue
-                data['items'] = items_data
-            except Exception:
-                data['items'] = []
-            
-            # Final pass: sanitize all ObjectIds in the entire data structure
-            # This must be done recursively and comprehensively
-            data = self._sanitize_objectids(data)
-            
-            # Extra safety: manually check and convert any remaining ObjectIds
-            def deep_sanitize(d):
-                """Deep recursive sanitization as final safety net."""
-                if d is None:
-                    return None
-                if BSON_AVAILABLE and isinstance(d, ObjectId):
-                    return str(d)
-                if isinstance(d, dict):
-                    return {k: deep_sanitize(v) for k, v in d.items()}
-                if isinstance(d, (list, tuple)):
-                    return type(d)(deep_sanitize(item) for item in d)
-                if isinstance(d, set):
-                    return {deep_sanitize(item) for item in d}
-                # Last resort: check if it looks like an ObjectId
-                if hasattr(d, '__class__') and 'ObjectId' in str(type(d)):
-                    return str(d)
-                return d
-            
-            data = deep_sanitize(data)
-            return data
+            return compilation_to_native(obj, self.context.get('attractions'), fields=parse_fields(self.context.get('fields')))
 
 else:
     # Fallback manual serializers
-    class AttractionSerializer(serializers.Serializer):
-        id = serializers.CharField(read_only=True)
-        place_id = serializers.CharField()
-        name = serializers.CharField()
-        formatted_address = serializers.CharField(allow_blank=True)
-        country = serializers.CharField()
-        city = serializers.CharField(allow_blank=True)
-        category = serializers.CharField(allow_blank=True)
-        types = serializers.ListField(child=serializers.CharField(), allow_empty=True, default=list)
-        rating = serializers.FloatField(default=0)
-        user_ratings_total = serializers.IntegerField(default=0)
-        price_level = serializers.IntegerField(allow_null=True, required=False)
-        location = serializers.DictField(allow_null=True, required=False)
-        description = serializers.CharField(allow_blank=True, required=False)
-        website = serializers.CharField(allow_blank=True, required=False)
-        phone_number = serializers.CharField(allow_blank=True, required=False)
-        photo_reference = serializers.CharField(allow_blank=True, required=False)
-        photos_count = serializers.IntegerField(default=0)
-        opening_hours = serializers.DictField(default=dict)
-        reviews = serializers.ListField(child=serializers.DictField(), default=list)
-        likes = serializers.IntegerField(default=0)
-        is_featured = serializers.BooleanField(default=False)
-        raw_data = serializers.DictField(default=dict)
-        created_at = serializers.DateTimeField(read_only=True)
-        updated_at = serializers.DateTimeField(read_only=True)
-
-        def create(self, validated_data):
-            # Ensure location saved as GeoJSON Point if present
-            loc = validated_data.get('location')
-            if loc and isinstance(loc, dict) and 'lat' in loc and 'lng' in loc:
-                validated_data['location'] = {'type': 'Point', 'coordinates': [loc['lng'], loc['lat']]}
-            att = Attraction(**validated_data)
-            att.save()
-            return att
-
-        def to_representation(self, instance):
-            data = {}
-            for field in ('id','place_id','name','formatted_address','country','city','category','types',
-                          'rating','user_ratings_total','price_level','description','website','phone_number',
-                          'photo_reference','photos_count','opening_hours','reviews','likes','is_featured','raw_data',
-                          'created_at','updated_at'):
-                data[field] = getattr(instance, field, None)
-            # location: convert GeoJSON to {lat,lng}
-            loc = getattr(instance, 'location', None)
-            if loc and isinstance(loc, dict):
-                coords = loc.get('coordinates') or []
-                if len(coords) >= 2:
-                    data['location'] = {'lat': coords[1], 'lng': coords[0]}
-                else:
-                    data['location'] = None
-            else:
-                data['location'] = None
-            # Fallback: derive photo_reference from raw_data.photos if missing
-            try:
-                if not data.get('photo_reference'):
-                    photos = (data.get('raw_data') or {}).get('photos') or []
-                    if photos and isinstance(photos, list):
-                        ref = (photos[0] or {}).get('photo_reference')
-                        if ref:
-                            data['photo_reference'] = ref
-            except Exception:
-                pass
-            return data
-
     class CompilationItemSerializer(serializers.Serializer):
         attraction = AttractionSerializer(read_only=True)
         attraction_id = serializers.CharField(write_only=True)
         order_index = serializers.IntegerField(default=0)
         added_at = serializers.DateTimeField(read_only=True)
 
+        def to_representation(self, instance):
+            fields = parse_fields(self.context.get('fields'))
+            attractions = self.context.get('attractions')
+            if attractions is None:
+                attractions = CompilationRepository.attractions_for_items([instance], attraction_projection(fields))
+            return compilation_item_to_native(instance, attractions, fields)
+
     class CompilationSerializer(serializers.Serializer):
         id = serializers.CharField(read_only=True)
         name = serializers.CharField()
@@ -299,6 +299,9 @@ else:
         created_at = serializers.DateTimeField(read_only=True)
         updated_at = serializers.DateTimeField(read_only=True)
 
+        def to_representation(self, instance):
+            return compilation_to_native(instance, self.context.get('attractions'), fields=parse_fields(self.context.get('fields')))
+
 
 class SignUpSerializer(serializers.Serializer):
     id = serializers.CharField(read_only=True)
@@ -3,15 +3,26 @@ from __future__ import annotations
 from typing import Any, Dict, Optional, Tuple, List
 import hashlib
 import json
+import time
 
-from ..external_services import google_places_service
+from ..cache import get_cache
+from ..concurrency import BackgroundRefresher
+from ..external_services import GOOGLE_PAGE_SIZE, google_places_service
 from ..models import Attraction
+from ..models.attraction import normalize_key
+from ..pagination import decode_cursor, encode_cursor, page_size_from, params_fingerprint
+from ..place_types import matching_mask, requested_mask, to_bytes as type_mask_bytes, type_mask
+from ..repositories.attraction_blob_repository import COLD_FIELDS, AttractionBlobRepository
 from ..repositories.attraction_repository import AttractionRepository
+from ..repositories.popular_list_repository import PopularListRepository
+from .ranking import get_engine as get_ranking_engine
 
 
-# Simple in-memory cache for search results (valid for 5 minutes)
-_search_cache: Dict[str, Tuple[List[Dict[str, Any]], float]] = {}
-_CACHE_TTL = 5 * 60  # 5 minutes
+# Search results cache (backend, TTL and size limits come from settings.ATTRACTIONS_CACHES['search'])
+_search_cache = get_cache('search')
+# Ranked popular lists per (country, city, profile), served stale-while-revalidate
+_popular_cache = get_cache('popular')
+_popular_refresher = BackgroundRefresher('popular-refresh')
 
 class AttractionsService:
     @staticmethod
@@ -81,6 +92,84 @@ class AttractionsService:
 
     @staticmethod
     def popular_by_country(country: str, limit: int = 20, profile: str = 'tourist', city: str = None) -> List[Dict[str, Any]]:
+        """Return popular attractions for a country (and optionally city).
+
+        Lists materialized by `refresh_popular_lists` (PopularList) are served first.
+        Otherwise the Google-ranked list is served stale-while-revalidate:
+        lists are cached per (country, city, profile); an entry older than
+        settings.ATTRACTIONS_POPULAR_TTL is still served, until ATTRACTIONS_POPULAR_STALE_TTL,
+        while a background worker refreshes it. On a cold cache the stored attractions
+        are served, ranked for the profile, and the Google list is fetched in the
+        background. When nothing is stored locally either, the request gets an empty
+        list right away, or waits up to settings.ATTRACTIONS_POPULAR_COLD_WAIT_S for
+        the Google list when that is set.
+        """
+        from django.conf import settings
+
+        profile = (profile or 'tourist').lower()
+        materialized = AttractionsService._popular_materialized(country, limit, profile, city)
+        if materialized is not None:
+            return materialized
+        key = f"popular:{normalize_key(country)}:{normalize_key(city)}:{profile}"
+        fetch_limit = max(limit, GOOGLE_PAGE_SIZE)
+        entry = _popular_cache.get(key)
+        if entry is not None:
+            if time.time() >= entry['fresh_until'] or fetch_limit > entry['fetch_limit']:
+                AttractionsService._refresh_popular(key, country, max(fetch_limit, entry['fetch_limit']), profile, city)
+            return entry['items'][:limit]
+
+        future = AttractionsService._refresh_popular(key, country, fetch_limit, profile, city)
+        local = AttractionsService._popular_local(country, limit, profile, city)
+        if local:
+            return local
+        cold_wait = float(getattr(settings, 'ATTRACTIONS_POPULAR_COLD_WAIT_S', 0))
+        if cold_wait <= 0:
+            return []
+        try:
+            items = future.result(timeout=cold_wait)
+        except Exception as e:
+            # Timeouts included: the refresh keeps running and fills the cache for later requests
+            import logging
+            logging.getLogger(__name__).warning(f"[Popular] Google list for {key} not available: {e!r}")
+            return []
+        return (items or [])[:limit]
+
+    @staticmethod
+    def _refresh_popular(key: str, country: str, fetch_limit: int, profile: str, city: Optional[str]):
+        """Schedule a background rebuild of one cached popular list (deduplicated per key)."""
+        from django.conf import settings
+
+        def refresh():
+            items = AttractionsService._popular_from_google(country, fetch_limit, profile, city)
+            if items:
+                # Keep serving the previous list if Google came back empty (errors, quota)
+                _popular_cache.set(key, {
+                    'items': items,
+                    'fetch_limit': fetch_limit,
+                    'fresh_until': time.time() + float(getattr(settings, 'ATTRACTIONS_POPULAR_TTL', 600)),
+                }, ttl=float(getattr(settings, 'ATTRACTIONS_POPULAR_STALE_TTL', 24 * 3600)))
+            return items
+
+        return _popular_refresher.submit(key, refresh)
+
+    @staticmethod
+    def _popular_local(country: str, limit: int, profile: str, city: Optional[str]) -> List[Dict[str, Any]]:
+        """Most popular stored attractions for a country/city, ranked for `profile` (no upstream call).
+
+        Like the Google list, at least one page of candidates is ranked before slicing.
+        """
+        try:
+            docs = AttractionRepository.search(country=country, city=city, limit=max(limit, GOOGLE_PAGE_SIZE),
+                                               projection='card', as_pymongo=True)
+            mapped = [AttractionsService._document_to_attraction(doc) for doc in docs]
+            return AttractionsService.rank_by_profile(mapped, profile)[:limit]
+        except Exception as e:
+            import logging
+            logging.getLogger(__name__).warning(f"[Popular] Local fallback failed: {e}")
+            return []
+
+    @staticmethod
+    def _popular_from_google(country: str, limit: int = 20, profile: str = 'tourist', city: str = None) -> List[Dict[str, Any]]:
         """Return popular attractions for a country (and optionally city) by querying Google Places (not MongoDB).
         
         Profile-specific adaptations:
@@ -88,61 +177,69 @@ class AttractionsService:
         - local: prioritize restaurants, cafes, parks, local favorites
         - pro: prioritize business centers, conference venues, corporate amenities
         """
-        # Use Google Places text search for attractions in the country/city (profile-aware)
-        places = google_places_service.search_attractions_by_country(country, limit=limit * 2, profile=profile, city=city)
+        # Use Google Places text search for attractions in the country/city (profile-aware).
+        # At least one full page is requested for re-ranking; later pages are only
+        # awaited when the caller asks for more than one page.
+        places = google_places_service.search_attractions_by_country(country, limit=max(limit, GOOGLE_PAGE_SIZE), profile=profile, city=city)
         mapped = [AttractionsService._map_place_to_attraction(p, country_hint=country) for p in places]
-        
-        if profile == 'tourist':
-            tourist_types = ['tourist_attraction', 'point_of_interest', 'museum', 'art_gallery', 'church', 'park', 'zoo', 'amusement_park']
-            mapped.sort(key=lambda x: (
-                -sum(1 for t in (x.get('types') or []) if any(tt in t.lower() for tt in tourist_types)),
-                -(x.get('rating', 0)),
-                -(x.get('user_ratings_total', 0))
-            ))
-        elif profile == 'local':
-            local_types = ['restaurant', 'cafe', 'bar', 'park', 'gym', 'store', 'shopping_mall', 'supermarket', 'library', 'movie_theater']
-            mapped.sort(key=lambda x: (
-                -sum(1 for t in (x.get('types') or []) if any(lt in t.lower() for lt in local_types)),
-                -(x.get('rating', 0)),
-                -(x.get('user_ratings_total', 0))
-            ))
-        elif profile == 'pro':
-            pro_types = ['lodging', 'establishment', 'point_of_interest', 'train_station', 'airport', 'gas_station', 'bank', 'atm']
-            mapped.sort(key=lambda x: (
-                -sum(1 for t in (x.get('types') or []) if any(pt in t.lower() for pt in pro_types)),
-                -(x.get('rating', 0)),
-                -(x.get('user_ratings_total', 0))
-            ))
-        
-        return mapped[:limit]
+        return AttractionsService.rank_by_profile(mapped, profile)[:limit]
+
+    @staticmethod
+    def rank_by_profile(mapped: List[Dict[str, Any]], profile: str) -> List[Dict[str, Any]]:
+        """Order mapped attractions for a profile using the shared ranking engine (see services/ranking.py)."""
+        mapped[:] = get_ranking_engine().rank(mapped, profile)
+        return mapped
+
+    @staticmethod
+    def _popular_materialized(country: str, limit: int, profile: str, city: Optional[str]) -> Optional[List[Dict[str, Any]]]:
+        """Popular list from the PopularList collection: one document read, then one batched card fetch."""
+        try:
+            materialized = PopularListRepository.get(country, city, profile)
+            if not materialized or not materialized.get('place_ids'):
+                return None
+            docs = AttractionRepository.get_by_place_ids(materialized['place_ids'][:limit], projection='card', as_pymongo=True)
+        except Exception as e:
+            import logging
+            logging.getLogger(__name__).warning(f"[Popular] Materialized list read failed: {e}")
+            return None
+        return [AttractionsService._document_to_attraction(doc) for doc in docs] or None
+
+    @staticmethod
+    def build_popular_list(country: str, city: Optional[str] = None, profile: str = 'tourist', size: int = 60,
+                           candidates: int = 500) -> Dict[str, int]:
+        """Rank stored attractions for (country, city, profile) and materialize the top `size` place_ids."""
+        docs = AttractionRepository.search(country=country, city=city, limit=candidates, projection='card', as_pymongo=True)
+        mapped = [AttractionsService._document_to_attraction(doc) for doc in docs]
+        place_ids = [m['place_id'] for m in AttractionsService.rank_by_profile(mapped, profile)[:size] if m.get('place_id')]
+        PopularListRepository.save(country, city, profile, place_ids, candidates=len(mapped))
+        return {'candidates': len(mapped), 'size': len(place_ids)}
 
     @staticmethod
     def _generate_cache_key(params: Dict[str, Any]) -> str:
-        """Generate a cache key from search parameters."""
-        sorted_params = json.dumps(params, sort_keys=True)
+        """Generate a cache key from search parameters (`fields` and `format` only shape the response)."""
+        sorted_params = json.dumps({k: v for k, v in params.items() if k not in ('fields', 'format')}, sort_keys=True)
         return hashlib.md5(sorted_params.encode()).hexdigest()
     
     @staticmethod
     def search(params: Dict[str, Any]) -> List[Dict[str, Any]]:
         """Search attractions via Google Places based on query params. Does not persist results.
         
+        With settings.ATTRACTIONS_SEARCH_MODE = 'local_first' (or `source=local`), the
+        search is answered from the local Attraction collection and Google is only
+        called when local coverage for the area/query is too thin.
+        
         Profile-based adaptations:
         - tourist: prioritize tourist attractions, landmarks, high ratings
         - local: prioritize local spots, restaurants, cafes, parks
         - pro: prioritize business amenities, hotels, transportation hubs
         """
-        import time
-        
         # Check cache first
         cache_key = AttractionsService._generate_cache_key(params)
-        current_time = time.time()
-        
-        if cache_key in _search_cache:
-            cached_results, cache_time = _search_cache[cache_key]
-            if current_time - cache_time < _CACHE_TTL:
-                logger = __import__('logging').getLogger(__name__)
-                logger.info(f"[Search] Using cached results for key={cache_key[:8]}...")
-                return cached_results
+        cached_results = _search_cache.get(cache_key)
+        if cached_results is not None:
+            logger = __import__('logging').getLogger(__name__)
+            logger.info(f"[Search] Using cached results for key={cache_key[:8]}...")
+            return cached_results
         
         profile = params.get('profile', 'tourist')
         query = (params.get('q') or '').strip()
@@ -194,6 +291,13 @@ class AttractionsService:
         
         has_filters = has_category or has_min_rating or has_price_level
 
+        # An explicit limit above one Google page follows next_page_token (up to 60);
+        # otherwise only the first page is awaited and later ones are prefetched.
+        try:
+            google_limit = int(params.get('limit')) if params.get('limit') else None
+        except (TypeError, ValueError):
+            google_limit = None
+
         requested_types = []
         place_type = None
         if category and category.strip():
@@ -208,7 +312,21 @@ class AttractionsService:
             elif profile == 'pro':
                 place_type = None
 
-        if not query and not location:
+        mapped: Optional[List[Dict[str, Any]]] = None
+        if AttractionsService._search_source(params) == 'local_first':
+            mapped = AttractionsService._search_local(
+                query=query,
+                text_mode='prefix' if (params.get('match') or '').strip().lower() == 'prefix' else 'text',
+                country=country,
+                city=city,
+                location=location,
+                radius=radius,
+                place_type=requested_types[0] if requested_types else None,
+                min_rating=min_rating if has_min_rating else None,
+                limit=int(params.get('limit', 50)),
+            )
+
+        if mapped is None and not query and not location:
             if country:
                 if has_filters:
                     if requested_types and place_type:
@@ -220,7 +338,7 @@ class AttractionsService:
                         else:
                             text_query = type_name
                         logger.info(f"[Search] Filters applied with no query - using query='{text_query}' and place_type='{place_type}'")
-                        results = google_places_service.search_places(query=text_query, location=None, radius=None, place_type=place_type)
+                        results = google_places_service.search_places(query=text_query, location=None, radius=None, place_type=place_type, limit=google_limit)
                         mapped = [AttractionsService._map_place_to_attraction(p, country_hint=country) for p in results]
                         logger.info(f"[Search] Got {len(mapped)} results after filter search with place_type={place_type}")
                         # Continue to apply filters and ranking below
@@ -228,23 +346,23 @@ class AttractionsService:
                         # No category filter, but other filters present - fall back to profile-based search
                         mapped = AttractionsService.popular_by_country(country, limit=int(params.get('limit', 50)), profile=profile, city=city)
                         # Cache results before returning
-                        _search_cache[cache_key] = (mapped, current_time)
+                        _search_cache.set(cache_key, mapped)
                         return mapped
                 else:
                     # Fall back to country-wide or city-wide attractions search (profile-aware)
                     mapped = AttractionsService.popular_by_country(country, limit=int(params.get('limit', 50)), profile=profile, city=city)
                     # Cache results before returning
-                    _search_cache[cache_key] = (mapped, current_time)
+                    _search_cache.set(cache_key, mapped)
                     return mapped
             else:
                 # Nothing to search for
                 import logging
                 logging.getLogger(__name__).warning("Search called with empty query and no location/country; returning empty list")
                 empty_result: List[Dict[str, Any]] = []
-                _search_cache[cache_key] = (empty_result, current_time)
+                _search_cache.set(cache_key, empty_result)
                 return empty_result
         
-        if 'mapped' not in locals():
+        if mapped is None:
             if location:
                 lat, lng = location
                 loc_param = (lat, lng)
@@ -263,47 +381,57 @@ class AttractionsService:
                         location=location,
                         radius_m=radius or 5000,
                         place_type=place_type,
-                        limit=50
+                        limit=50,
+                        projection='card',
                     )
                     db_results = list(repo_results)
                     logger.info(f"[Search] Found {len(db_results)} results in MongoDB")
                 except Exception as e:
                     logger.debug(f"[Search] MongoDB search error: {e}")
                 
-                google_results = google_places_service.search_places(query=search_query, location=loc_param, radius=radius, place_type=place_type)
+                google_results = google_places_service.search_places(query=search_query, location=loc_param, radius=radius, place_type=place_type, limit=google_limit)
                 
                 google_place_ids = {r.get('place_id') for r in google_results if r.get('place_id')}
                 results = google_results
                 
-                for db_attraction in db_results[:10]:
-                    if db_attraction.place_id not in google_place_ids:
-                        try:
-                            db_dict = {
-                                'place_id': db_attraction.place_id,
-                                'name': db_attraction.name,
-                                'formatted_address': db_attraction.formatted_address,
-                                'rating': db_attraction.rating,
-                                'user_ratings_total': db_attraction.user_ratings_total,
-                                'price_level': db_attraction.price_level,
-                                'types': db_attraction.types or [],
-                                'photos': [],
-                                'reviews': db_attraction.reviews or [],
-                                'website': db_attraction.website or '',
-                                'formatted_phone_number': db_attraction.phone_number or '',
-                                'opening_hours': db_attraction.opening_hours or {},
-                                'geometry': {}
-                            }
-                            if db_attraction.location and hasattr(db_attraction.location, 'coordinates'):
-                                coords = db_attraction.location.coordinates
-                                if len(coords) >= 2:
-                                    db_dict['geometry'] = {'location': {'lat': coords[1], 'lng': coords[0]}}
-                            results.append(db_dict)
-                        except Exception as e:
-                            logger.debug(f"[Search] Error converting MongoDB result: {e}")
+                merged = [a for a in db_results[:10] if a.place_id not in google_place_ids]
+                # Card rows leave reviews out: load them (inline or from cold storage) for the merged rows only
+                stored_reviews = {}
+                if merged:
+                    try:
+                        rows = AttractionRepository.get_by_place_ids([a.place_id for a in merged], projection='detail', as_pymongo=True)
+                        stored_reviews = {row.get('place_id'): row.get('reviews') or []
+                                          for row in AttractionRepository.with_cold_fields_many(rows)}
+                    except Exception as e:
+                        logger.debug(f"[Search] Loading stored reviews failed: {e}")
+                for db_attraction in merged:
+                    try:
+                        db_dict = {
+                            'place_id': db_attraction.place_id,
+                            'name': db_attraction.name,
+                            'formatted_address': db_attraction.formatted_address,
+                            'rating': db_attraction.rating,
+                            'user_ratings_total': db_attraction.user_ratings_total,
+                            'price_level': db_attraction.price_level,
+                            'types': db_attraction.types or [],
+                            'photos': [],
+                            'reviews': stored_reviews.get(db_attraction.place_id, []),
+                            'website': db_attraction.website or '',
+                            'formatted_phone_number': db_attraction.phone_number or '',
+                            'opening_hours': db_attraction.opening_hours or {},
+                            'geometry': {}
+                        }
+                        if db_attraction.location and hasattr(db_attraction.location, 'coordinates'):
+                            coords = db_attraction.location.coordinates
+                            if len(coords) >= 2:
+                                db_dict['geometry'] = {'location': {'lat': coords[1], 'lng': coords[0]}}
+                        results.append(db_dict)
+                    except Exception as e:
+                        logger.debug(f"[Search] Error converting MongoDB result: {e}")
             else:
                 if query and not city and not country and (" " not in query.strip()) and not has_filters:
                     mapped = AttractionsService.popular_by_country(query.strip(), limit=int(params.get('limit', 50)), profile=profile)
-                    _search_cache[cache_key] = (mapped, current_time)
+                    _search_cache.set(cache_key, mapped)
                     return mapped
                 if has_filters and place_type:
                     text_query = None
@@ -328,26 +456,12 @@ class AttractionsService:
                         text_query = f"{text_query} in {city}" if text_query else f"{city}"
                     elif country:
                         text_query = f"{text_query} in {country}" if text_query else f"{country}"
-                results = google_places_service.search_places(query=text_query, location=None, radius=None, place_type=place_type)
+                results = google_places_service.search_places(query=text_query, location=None, radius=None, place_type=place_type, limit=google_limit)
             
             mapped = [AttractionsService._map_place_to_attraction(p, country_hint=country) for p in results]
         
         if requested_types:
-            filtered_mapped = []
-            for place in mapped:
-                place_types = place.get('types', []) or []
-                matches = False
-                for req_type in requested_types:
-                    req_lower = req_type.lower()
-                    for pt in place_types:
-                        pt_str = str(pt).lower()
-                        if req_lower == pt_str or req_lower in pt_str or pt_str in req_lower:
-                            matches = True
-                            break
-                    if matches:
-                        break
-                if matches:
-                    filtered_mapped.append(place)
+            filtered_mapped = AttractionsService._filter_by_types(mapped, requested_types)
             
             logger.info(f"[Search] After category filtering: {len(filtered_mapped)} results remain (filtered out {len(mapped) - len(filtered_mapped)})")
             if filtered_mapped:
@@ -391,45 +505,238 @@ class AttractionsService:
         logger.info(f"[Search] Final filter status - has_filters={has_filters}, category_types={len(requested_types) if requested_types else 0}, min_rating={min_rating_value}, price_level={price_level_value}, location_search={location is not None}")
         logger.info(f"[Search] Final result count: {len(mapped)} attractions after all filters applied")
         
-        # Apply ranking: use filter-based ranking if filters are applied, otherwise use profile-based ranking
-        if has_filters:
-            # Generic ranking: prioritize by rating and number of reviews when filters are used
-            mapped.sort(key=lambda x: (
-                -(x.get('rating', 0)),
-                -(x.get('user_ratings_total', 0))
-            ))
-        else:
-            if profile == 'tourist':
-                tourist_types = ['tourist_attraction', 'point_of_interest', 'museum', 'art_gallery', 'church', 'park', 'zoo', 'amusement_park']
-                mapped.sort(key=lambda x: (
-                    -sum(1 for t in (x.get('types') or []) if any(tt in t.lower() for tt in tourist_types)),
-                    -(x.get('rating', 0)),
-                    -(x.get('user_ratings_total', 0))
-                ))
-            elif profile == 'local':
-                local_types = ['restaurant', 'cafe', 'bar', 'park', 'gym', 'store', 'shopping_mall', 'supermarket', 'library', 'movie_theater']
-                mapped.sort(key=lambda x: (
-                    -sum(1 for t in (x.get('types') or []) if any(lt in t.lower() for lt in local_types)),
-                    -(x.get('rating', 0)),
-                    -(x.get('user_ratings_total', 0))
-                ))
-            elif profile == 'pro':
-                pro_types = ['lodging', 'establishment', 'point_of_interest', 'train_station', 'airport', 'gas_station', 'bank', 'atm']
-                mapped.sort(key=lambda x: (
-                    -sum(1 for t in (x.get('types') or []) if any(pt in t.lower() for pt in pro_types)),
-                    -(x.get('rating', 0)),
-                    -(x.get('user_ratings_total', 0))
-                ))
-        
-        _search_cache[cache_key] = (mapped, current_time)
+        # Apply ranking: use filter-based ranking (rating, then reviews) if filters are applied, otherwise profile-based ranking
+        mapped = get_ranking_engine().rank(mapped, None if has_filters else profile)
         
-        if len(_search_cache) > 50:
-            sorted_cache = sorted(_search_cache.items(), key=lambda x: x[1][1])
-            for old_key, _ in sorted_cache[:-50]:
-                del _search_cache[old_key]
+        _search_cache.set(cache_key, mapped)
         
         return mapped
 
+    @staticmethod
+    def _search_source(params: Dict[str, Any]) -> str:
+        """'local_first' answers from MongoDB when coverage allows; 'google' always calls Google."""
+        source = (params.get('source') or '').strip().lower()
+        if source in ('local', 'local_first'):
+            return 'local_first'
+        if source == 'google':
+            return 'google'
+        from django.conf import settings
+        return getattr(settings, 'ATTRACTIONS_SEARCH_MODE', 'google')
+
+    @staticmethod
+    def _filter_by_types(mapped: List[Dict[str, Any]], requested_types: List[str]) -> List[Dict[str, Any]]:
+        """Places having a type that matches any of `requested_types`.
+
+        Registered types are matched bitwise (every registered type matching a
+        requested one); requested types matching no registered type are compared
+        as strings, so a mixed request does not drop them.
+        """
+        wanted = requested_mask(requested_types)
+        unregistered = [r.lower() for r in requested_types if not matching_mask(r)]
+
+        def matches(types):
+            if wanted and type_mask(types) & wanted:
+                return True
+            return any(r in str(pt).lower() or str(pt).lower() in r for pt in types or [] for r in unregistered)
+
+        return [place for place in mapped if matches(place.get('types'))]
+
+    @staticmethod
+    def _document_to_attraction(doc: Any) -> Dict[str, Any]:
+        """Map a stored Attraction (Document or raw pymongo dict) to the _map_place_to_attraction shape.
+
+        Fields left out by a projection come back as their empty defaults, except the
+        cold fields: `raw_data` / `reviews` are only included when the raw dict
+        carries them (e.g. from get_detail), so card rows omit them instead of
+        reporting them empty.
+        """
+        if isinstance(doc, dict):
+            get = doc.get
+        else:
+            def get(name, default=None):
+                value = getattr(doc, name, default)
+                return default if value is None else value
+        location = None
+        loc = get('location')
+        coords = (loc.get('coordinates') if isinstance(loc, dict) else getattr(loc, 'coordinates', None)) if loc else None
+        if coords and len(coords) >= 2:
+            location = {'lat': coords[1], 'lng': coords[0]}
+        raw_data = get('raw_data') or {}
+        photo_reference = get('photo_reference') or None
+        if not photo_reference:
+            photos = raw_data.get('photos') or []
+            if photos and isinstance(photos, list):
+                photo_reference = (photos[0] or {}).get('photo_reference')
+        types = list(get('types') or [])
+        mapped = {
+            'place_id': get('place_id'),
+            'name': get('name') or '',
+            'formatted_address': get('formatted_address') or '',
+            'country': get('country') or '',
+            'city': get('city') or '',
+            'category': get('category') or ((types or [None])[0] or ''),
+            'types': types,
+            'rating': get('rating') or 0,
+            'user_ratings_total': get('user_ratings_total') or 0,
+            'price_level': get('price_level'),
+            'location': location,
+            'description': get('description') or '',
+            'website': get('website') or '',
+            'phone_number': get('phone_number') or '',
+            'photo_reference': photo_reference,
+            'photos_count': get('photos_count') or 0,
+            'opening_hours': dict(get('opening_hours') or {}),
+            'reviews': list(get('reviews') or []),
+            'likes': get('likes') or 0,
+            'is_featured': bool(get('is_featured')),
+            'raw_data': raw_data,
+        }
+        if isinstance(doc, dict):
+            for field in COLD_FIELDS:
+                if field not in doc:
+                    del mapped[field]
+        return mapped
+
+    @staticmethod
+    def _search_local(*, query: str, text_mode: str = 'text', country: Optional[str], city: Optional[str], location: Optional[Tuple[float, float]],
+                      radius: Optional[int], place_type: Optional[str], min_rating: Any, limit: int) -> Optional[List[Dict[str, Any]]]:
+        """Answer a search from the local Attraction collection.
+
+        Returns None when local coverage is too thin (fewer than
+        settings.ATTRACTIONS_LOCAL_MIN_RESULTS matches, capped at `limit`), in which
+        case the caller falls back to Google.
+        """
+        import logging
+        from django.conf import settings
+
+        logger = logging.getLogger(__name__)
+        if not (query or country or city or location):
+            return None
+        min_results = min(limit, int(getattr(settings, 'ATTRACTIONS_LOCAL_MIN_RESULTS', 10)))
+        try:
+            docs = list(AttractionRepository.search(
+                text=query,
+                text_mode=text_mode,
+                country=country,
+                city=city,
+                location=location,
+                radius_m=(radius or 5000) if location else None,
+                place_type=place_type,
+                min_rating=float(min_rating) if min_rating else None,
+                limit=limit,
+                projection='card',
+                as_pymongo=True,
+            ))
+        except Exception as e:
+            logger.warning(f"[Search] Local search failed, falling back to Google: {e}")
+            return None
+        if len(docs) < max(1, min_results):
+            logger.info(f"[Search] Local coverage too thin ({len(docs)} < {min_results}); falling back to Google")
+            return None
+        logger.info(f"[Search] Served {len(docs)} results from MongoDB")
+        return [AttractionsService._document_to_attraction(doc) for doc in docs]
+
+    @staticmethod
+    def search_page(params: Dict[str, Any]) -> Dict[str, Any]:
+        """Cursor-paginated listing/search. Returns {'results': [...], 'next': cursor or None}.
+
+        The first page comes from MongoDB (keyset over the popularity sort) unless
+        the request is a text/location search in 'google' mode or nothing matches
+        locally; Google pages are then served and the cursor carries Google's
+        next_page_token. Raises pagination.InvalidCursor for a bad cursor.
+        """
+        fingerprint = params_fingerprint(params)
+        page_size = page_size_from(params)
+        state = decode_cursor(params['cursor'], fingerprint) if params.get('cursor') else None
+
+        query = (params.get('q') or params.get('query') or '').strip()
+        country = params.get('country')
+        city = params.get('city')
+        category = params.get('category') or ''
+        place_type = next((c.strip() for c in category.split(',') if c.strip()), None)
+        min_rating = params.get('min_rating') or params.get('minRating')
+        try:
+            min_rating = float(min_rating) if min_rating else None
+        except (TypeError, ValueError):
+            min_rating = None
+        location = None
+        radius = None
+        try:
+            if params.get('lat') is not None and params.get('lng') is not None:
+                location = (float(params.get('lat')), float(params.get('lng')))
+            if params.get('radius_m') is not None:
+                radius = int(params.get('radius_m'))
+        except (TypeError, ValueError):
+            pass
+
+        if state is not None:
+            use_google = state['k'] == 'google'
+        else:
+            use_google = bool(query or location) and AttractionsService._search_source(params) != 'local_first'
+
+        if not use_google:
+            qs = AttractionRepository.search(
+                text=query,
+                text_mode='prefix' if (params.get('match') or '').strip().lower() == 'prefix' else 'text',
+                country=country,
+                city=city,
+                location=location,
+                radius_m=(radius or 5000) if location else None,
+                place_type=place_type,
+                min_rating=min_rating,
+                queryset_only=True,
+            )
+            rows, after = AttractionRepository.keyset_page(qs, state.get('a') if state else None, page_size)
+            if rows or state is not None:
+                return {
+                    'results': [AttractionsService._document_to_attraction(row) for row in rows],
+                    'next': encode_cursor({'k': 'db', 'h': fingerprint, 'a': after}) if after else None,
+                }
+            # Nothing stored for this request: page through Google instead
+
+        token = state.get('t') if state else None
+        offset = int(state.get('o') or 0) if state else 0
+        page = AttractionsService._google_page(params, fingerprint, token, query=query, location=location, radius=radius,
+                                               place_type=place_type, country=country, city=city, min_rating=min_rating)
+        results = page['results'][offset:offset + page_size]
+        if offset + page_size < len(page['results']):
+            next_state = {'k': 'google', 'h': fingerprint, 't': token, 'o': offset + page_size}
+        elif page['next']:
+            next_state = {'k': 'google', 'h': fingerprint, 't': page['next'], 'o': 0}
+        else:
+            next_state = None
+        return {'results': results, 'next': encode_cursor(next_state) if next_state else None}
+
+    @staticmethod
+    def _google_page(params: Dict[str, Any], fingerprint: str, token: Optional[str], *, query: str,
+                     location: Optional[Tuple[float, float]], radius: Optional[int], place_type: Optional[str],
+                     country: Optional[str], city: Optional[str], min_rating: Optional[float]) -> Dict[str, Any]:
+        """One mapped Google results page, cached so walking it in small steps costs one call."""
+        cache_key = f"gpage:{fingerprint}:{token or ''}"
+        cached = _search_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        if query or location:
+            places, next_token = google_places_service.search_places_page(
+                query=query or None, location=location, radius=radius, place_type=place_type, page_token=token
+            )
+        elif place_type:
+            where = f"{city}, {country}" if city and country else (city or country or '')
+            text_query = f"{place_type.replace('_', ' ')} in {where}" if where else place_type.replace('_', ' ')
+            places, next_token = google_places_service.search_places_page(
+                query=text_query, place_type=place_type, page_token=token
+            )
+        else:
+            places, next_token = google_places_service.search_attractions_page(
+                country or 'France', profile=params.get('profile', 'tourist'), city=city, page_token=token
+            )
+        mapped = [AttractionsService._map_place_to_attraction(p, country_hint=country) for p in places]
+        if min_rating:
+            mapped = [m for m in mapped if (m.get('rating') or 0) >= min_rating]
+        page = {'results': mapped, 'next': next_token}
+        _search_cache.set(cache_key, page)
+        return page
+
     @staticmethod
     def get_by_place_id(place_id: str):
         """Fetch place details from Google and map to API shape (no DB persistence)."""
@@ -437,7 +744,14 @@ class AttractionsService:
             return None
         details = google_places_service.get_place_details(place_id)
         if not details:
-            return None
+            # Google unavailable: serve the stored copy, with its cold fields, if we have one
+            try:
+                doc = AttractionRepository.get_detail(place_id)
+            except Exception as e:
+                import logging
+                logging.getLogger(__name__).debug(f"[Details] MongoDB fallback error for {place_id}: {e}")
+                doc = None
+            return AttractionsService._document_to_attraction(doc) if doc else None
         country = None
         for comp in details.get('address_components', []) or []:
             if 'country' in (comp.get('types') or []):
@@ -474,47 +788,137 @@ class AttractionsService:
         return [m for m in mapped if m.get('place_id') != place_id][:limit]
 
     @staticmethod
-    def sync_from_google(country: str, limit: int = 20):
-        places = google_places_service.search_attractions_by_country(country, limit)
-        synced = 0
-        for place in places:
-            place_id = place.get('place_id')
-            if not place_id:
-                continue
-            details = google_places_service.get_place_details(place_id)
-            if not details:
+    def _details_to_document(details: Dict[str, Any], country: Optional[str] = None, category: Optional[str] = None) -> Dict[str, Any]:
+        """Map Google details to a raw Attraction document (stored field names) for bulk upserts."""
+        doc: Dict[str, Any] = {
+            'place_id': details.get('place_id'),
+            'name': details.get('name', ''),
+            'name_key': normalize_key(details.get('name', '')),
+            'formatted_address': details.get('formatted_address', ''),
+            'rating': details.get('rating', 0),
+            'user_ratings_total': details.get('user_ratings_total', 0),
+            'price_level': details.get('price_level'),
+            'photos_count': len(details.get('photos', []) or []),
+            'opening_hours': AttractionsService._filter_opening_hours(details.get('opening_hours')),
+            'website': details.get('website', ''),
+            'phone_number': details.get('formatted_phone_number', ''),
+            'types': details.get('types', []) or [],
+            'type_mask': type_mask_bytes(type_mask(details.get('types'))),
+            'reviews': details.get('reviews', []) or [],
+            'raw_data': details,
+        }
+        derived_country = None
+        city = None
+        for comp in details.get('address_components', []) or []:
+            types = comp.get('types') or []
+            if 'country' in types and not derived_country:
+                derived_country = comp.get('long_name')
+            if ('locality' in types or 'postal_town' in types) and not city:
+                city = comp.get('long_name')
+        doc['country'] = country or derived_country or ''
+        doc['country_key'] = normalize_key(doc['country'])
+        if city:
+            doc['city'] = city
+            doc['city_key'] = normalize_key(city)
+        if category:
+            doc['category'] = category
+        geometry = details.get('geometry', {}) or {}
+        loc = geometry.get('location') or {}
+        lat = loc.get('lat')
+        lng = loc.get('lng')
+        if lat is not None and lng is not None:
+            doc['location'] = {'type': 'Point', 'coordinates': [lng, lat]}
+        photos = details.get('photos') or []
+        if photos and isinstance(photos, list):
+            ref = (photos[0] or {}).get('photo_reference')
+            if ref:
+                doc['photo_reference'] = ref
+        doc['content_hash'] = AttractionsService._content_hash(doc)
+        return doc
+
+    # Keys whose values change between identical Google responses (photo tokens,
+    # "a week ago" review dates); excluded so they don't defeat change detection.
+    # Only ignored inside the raw payloads: the stored top-level photo_reference is
+    # served to clients and must be rewritten when it changes.
+    _HASH_IGNORED_KEYS = frozenset({'photo_reference', 'relative_time_description', 'html_attributions'})
+    _HASH_VOLATILE_FIELDS = ('raw_data', 'reviews')
+
+    @staticmethod
+    def _content_hash(doc: Dict[str, Any]) -> str:
+        """Stable hash of an attraction document's synced content."""
+        ignored = AttractionsService._HASH_IGNORED_KEYS
+
+        def canonical(value):
+            if isinstance(value, dict):
+                return {k: canonical(v) for k, v in value.items() if k not in ignored}
+            if isinstance(value, (list, tuple)):
+                return [canonical(v) for v in value]
+            return value
+
+        content = {
+            k: canonical(v) if k in AttractionsService._HASH_VOLATILE_FIELDS else v
+            for k, v in doc.items() if k != 'content_hash'
+        }
+        payload = json.dumps(content, sort_keys=True, separators=(',', ':'), default=str)
+        return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def upsert_details(details_list: List[Dict[str, Any]], country: Optional[str] = None, category: Optional[str] = None,
+                       on_insert=None) -> Dict[str, Any]:
+        """Persist Google details as Attractions with one bulk upsert keyed by place_id.
+
+        Places whose content hash is unchanged are not written. `on_insert`, if given,
+        is called with each details dict and returns fields set only on creation.
+        """
+        documents = []
+        for details in details_list:
+            if not details or not details.get('place_id'):
                 continue
+            doc = AttractionsService._details_to_document(details, country=country, category=category)
+            if on_insert:
+                doc['_on_insert'] = on_insert(details)
+            documents.append(doc)
+        counts = AttractionRepository.bulk_upsert(documents)
+        counts['processed'] = len(documents)
+        return counts
 
-            try:
-                attraction = Attraction.objects.get(place_id=place_id)
-                created = False
-            except Exception:
-                attraction = Attraction(place_id=place_id)
-                created = True
-
-            attraction.name = details.get('name', '')
-            attraction.formatted_address = details.get('formatted_address', '')
-            attraction.country = country
-            attraction.rating = details.get('rating', 0)
-            attraction.user_ratings_total = details.get('user_ratings_total', 0)
-            attraction.price_level = details.get('price_level')
-            geometry = details.get('geometry', {}) or {}
-            loc = geometry.get('location') or {}
-            lat = loc.get('lat')
-            lng = loc.get('lng')
-            if lat is not None and lng is not None:
-                attraction.location = {'type': 'Point', 'coordinates': [lng, lat]}
-            attraction.photos_count = len(details.get('photos', []) or [])
-            attraction.opening_hours = AttractionsService._filter_opening_hours(details.get('opening_hours'))
-            attraction.website = details.get('website', '')
-            attraction.phone_number = details.get('formatted_phone_number', '')
-            attraction.types = details.get('types', []) or []
-            attraction.raw_data = details
-            attraction.save()
-
-            if created:
-                synced += 1
-        return synced, len(places or [])
+    @staticmethod
+    def sync_from_google(country: str, limit: int = 20, city: Optional[str] = None, profile: str = 'tourist') -> Dict[str, Any]:
+        """Search Google for a country's (or city's) attractions and upsert them into MongoDB.
+
+        Stages run as a pipeline: one search, concurrent detail fetches, then a single
+        bulk_write. Returns counts (created/updated/unchanged) and per-stage timings.
+        """
+        timings: Dict[str, float] = {}
+        started = time.perf_counter()
+        places = google_places_service.search_attractions_by_country(country, limit, profile=profile, city=city) or []
+        timings['search_ms'] = (time.perf_counter() - started) * 1000
+
+        stage = time.perf_counter()
+        place_ids = [p.get('place_id') for p in places if p.get('place_id')]
+        details_by_id = google_places_service.get_place_details_many(place_ids)
+        timings['details_ms'] = (time.perf_counter() - stage) * 1000
+
+        stage = time.perf_counter()
+        counts = AttractionsService.upsert_details(
+            [details_by_id[pid] for pid in place_ids if pid in details_by_id], country=country
+        )
+        timings['write_ms'] = (time.perf_counter() - stage) * 1000
+        timings['total_ms'] = (time.perf_counter() - started) * 1000
+
+        report = {
+            'total_found': len(places),
+            'fetched': len(details_by_id),
+            'failed': len(place_ids) - len(details_by_id),
+            'created': counts['created'],
+            'updated': counts['updated'],
+            'unchanged': counts['unchanged'],
+            'write_ops': counts['write_ops'],
+            'timings': {k: round(v, 1) for k, v in timings.items()},
+        }
+        import logging
+        logging.getLogger(__name__).info(f"[Sync] {city + ', ' if city else ''}{country}: {report}")
+        return report
 
     @staticmethod
     def save_place(place_id: str):
@@ -577,7 +981,10 @@ class AttractionsService:
         attraction.website = details.get('website', '')
         attraction.phone_number = details.get('formatted_phone_number', '')
         attraction.types = details.get('types', []) or []
-        attraction.raw_data = details
+        # Raw payload and reviews live in cold storage, not on the hot document
+        AttractionBlobRepository.save(place_id, details, details.get('reviews'))
+        attraction.raw_data = {}
+        attraction.reviews = []
         attraction.save()
 
         return attraction
@@ -0,0 +1,167 @@
+"""Profile ranking for attraction candidates.
+
+Each profile (tourist, local, pro) is a table of type keywords with weights. A
+Google type (e.g. ``art_gallery``) gets the weight of the best keyword it
+contains; those per-type weights are computed once per (profile, type) and then
+served from a lookup table, so ranking a candidate is a few dict lookups. For
+profiles with unit weights, candidates are scored with a single AND + popcount
+over the mask of their ``types`` instead (see src/place_types.py; masks are
+cached per distinct type list and never stored on the candidates).
+
+Two scoring modes:
+
+- ``lexicographic`` (default): type affinity, then rating, then number of
+  reviews — the historical behaviour of popular_by_country and search.
+- ``weighted``: one score blending normalized type affinity, rating and
+  (log-scaled) review count with per-profile weights.
+
+Scoring runs as one vectorized pass with NumPy when it is installed, and falls
+back to plain Python otherwise (same order).
+"""
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence
+import math
+import threading
+
+from ..place_types import keywords_mask, popcount, type_mask
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
+# keyword -> weight; a type matches a keyword when the keyword is a substring of it
+PROFILE_TYPES: Dict[str, Dict[str, float]] = {
+    'tourist': dict.fromkeys(
+        ['tourist_attraction', 'point_of_interest', 'museum', 'art_gallery', 'church', 'park', 'zoo', 'amusement_park'], 1.0),
+    'local': dict.fromkeys(
+        ['restaurant', 'cafe', 'bar', 'park', 'gym', 'store', 'shopping_mall', 'supermarket', 'library', 'movie_theater'], 1.0),
+    'pro': dict.fromkeys(
+        ['lodging', 'establishment', 'point_of_interest', 'train_station', 'airport', 'gas_station', 'bank', 'atm'], 1.0),
+}
+
+# Weighted mode: contribution of each normalized signal (each in 0..1)
+DEFAULT_WEIGHTS: Dict[str, float] = {'types': 0.5, 'rating': 0.3, 'reviews': 0.2}
+
+MODES = ('lexicographic', 'weighted')
+
+# Below this many candidates the NumPy setup costs more than it saves
+_VECTORIZE_MIN = 64
+
+
+class RankingEngine:
+    def __init__(self, profiles: Optional[Mapping[str, Mapping[str, float]]] = None, mode: str = 'lexicographic',
+                 weights: Optional[Mapping[str, Mapping[str, float]]] = None):
+        if mode not in MODES:
+            raise ValueError(f"Unknown ranking mode {mode!r}; expected one of {MODES}")
+        self.mode = mode
+        self.profiles = {name: {k.lower(): float(w) for k, w in table.items()}
+                         for name, table in (profiles or PROFILE_TYPES).items()}
+        self.weights = {name: {**DEFAULT_WEIGHTS, **dict((weights or {}).get(name, {}))} for name in self.profiles}
+        # profile -> {type: weight}, filled lazily: Google uses ~100 distinct types
+        self._type_tables: Dict[str, Dict[str, float]] = {name: {} for name in self.profiles}
+        # Unit-weight profiles: affinity = number of set bits in (type_mask & profile mask)
+        self._unit_masks: Dict[str, int] = {
+            name: keywords_mask(table) for name, table in self.profiles.items() if all(w == 1.0 for w in table.values())
+        }
+        self._lock = threading.Lock()
+
+    def type_weight(self, profile: str, place_type: str) -> float:
+        table = self._type_tables[profile]
+        weight = table.get(place_type)
+        if weight is None:
+            lowered = str(place_type).lower()
+            weight = max((w for keyword, w in self.profiles[profile].items() if keyword in lowered), default=0.0)
+            with self._lock:
+                table[place_type] = weight
+        return weight
+
+    def type_affinity(self, profile: str, types: Optional[Iterable[str]], mask: Optional[int] = None) -> float:
+        """Sum of the type weights of a candidate (the number of matching types with unit weights)."""
+        if profile in self._unit_masks:
+            return float(popcount((type_mask(types) if mask is None else mask) & self._unit_masks[profile]))
+        table = self._type_tables[profile]
+        total = 0.0
+        for place_type in types or ():
+            weight = table.get(place_type)
+            total += weight if weight is not None else self.type_weight(profile, place_type)
+        return total
+
+    def rank(self, items: Sequence[Dict[str, Any]], profile: Optional[str] = None, mode: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Return `items` best first.
+
+        `profile=None` ranks by rating, then reviews; an unknown profile leaves the
+        order unchanged. Ties keep their input order, so results are deterministic.
+        """
+        items = list(items)
+        if len(items) < 2 or (profile is not None and profile not in self.profiles):
+            return items
+        mode = mode or self.mode
+        if profile:
+            affinity = [self.type_affinity(profile, item.get('types')) for item in items]
+        else:
+            affinity = [0.0] * len(items)
+        ratings = [float(item.get('rating') or 0) for item in items]
+        reviews = [float(item.get('user_ratings_total') or 0) for item in items]
+        if NUMPY_AVAILABLE and len(items) >= _VECTORIZE_MIN:
+            order = self._order_numpy(affinity, ratings, reviews, profile, mode)
+        else:
+            order = self._order_python(affinity, ratings, reviews, profile, mode)
+        return [items[i] for i in order]
+
+    def _weighted(self, profile: Optional[str]) -> Dict[str, float]:
+        return self.weights.get(profile) or DEFAULT_WEIGHTS
+
+    def _order_python(self, affinity, ratings, reviews, profile, mode) -> List[int]:
+        indices = range(len(ratings))
+        if mode == 'lexicographic':
+            return sorted(indices, key=lambda i: (-affinity[i], -ratings[i], -reviews[i]))
+        w = self._weighted(profile)
+        max_affinity = max(affinity) or 1.0
+        max_reviews = math.log1p(max(reviews)) or 1.0
+        scores = [
+            w['types'] * affinity[i] / max_affinity
+            + w['rating'] * ratings[i] / 5.0
+            + w['reviews'] * math.log1p(reviews[i]) / max_reviews
+            for i in indices
+        ]
+        return sorted(indices, key=lambda i: -scores[i])
+
+    def _order_numpy(self, affinity, ratings, reviews, profile, mode) -> List[int]:
+        affinity = np.asarray(affinity, dtype=np.float64)
+        ratings = np.asarray(ratings, dtype=np.float64)
+        reviews = np.asarray(reviews, dtype=np.float64)
+        if mode == 'lexicographic':
+            # lexsort sorts by the last key first and is stable
+            return np.lexsort((-reviews, -ratings, -affinity)).tolist()
+        w = self._weighted(profile)
+        log_reviews = np.log1p(reviews)
+        scores = (
+            w['types'] * affinity / (affinity.max() or 1.0)
+            + w['rating'] * ratings / 5.0
+            + w['reviews'] * log_reviews / (log_reviews.max() or 1.0)
+        )
+        return np.argsort(-scores, kind='stable').tolist()
+
+
+_engine: Optional[RankingEngine] = None
+_engine_lock = threading.Lock()
+
+
+def get_engine() -> RankingEngine:
+    """Process-wide engine configured from settings.ATTRACTIONS_RANKING_MODE / ATTRACTIONS_RANKING_WEIGHTS."""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                try:
+                    from django.conf import settings
+                    mode = getattr(settings, 'ATTRACTIONS_RANKING_MODE', 'lexicographic')
+                    weights = getattr(settings, 'ATTRACTIONS_RANKING_WEIGHTS', {}) or {}
+                except Exception:
+                    mode, weights = 'lexicographic', {}
+                _engine = RankingEngine(mode=mode, weights=weights)
+    return _engine
@@ -1,3 +1,360 @@
-from django.test import TestCase
+import base64
+import datetime
+import json
+import os
+import tempfile
+import threading
+import time
+from types import SimpleNamespace
+from unittest import mock
 
-# Create your tests here.
+from bson import DBRef, ObjectId
+from django.test import SimpleTestCase
+from rest_framework.test import APIRequestFactory
+
+from .cache import BaseCache, LocalLRUCache, SQLiteCache
+from .concurrency import SingleFlight
+from .json_renderer import MongoJSONRenderer, dumps, ndjson_lines
+from .pagination import InvalidCursor, decode_cursor, encode_cursor, page_size_from, params_fingerprint
+from .place_types import from_bytes, matching_mask, names, positions, to_bytes, type_mask
+from .repositories.attraction_repository import AttractionRepository
+from .repositories.compilation_repository import CompilationRepository
+from .routes.attractions import AttractionViewSet
+from .serializers import (ATTRACTION_FIELDSETS, DEFAULT_ATTRACTION_FIELDS, attraction_projection, attraction_to_native,
+                          compilation_to_native, parse_fields, to_native)
+from .services.attractions_service import AttractionsService
+from .services.ranking import RankingEngine
+
+PLACE = {
+    'place_id': 'ChIJLU7jZClu5kcR4PcOOO6p3I0',
+    'name': 'Tour Eiffel',
+    'formatted_address': 'Av. Gustave Eiffel, 75007 Paris, France',
+    'geometry': {'location': {'lat': 48.8584, 'lng': 2.2945}},
+    'types': ['tourist_attraction', 'point_of_interest', 'establishment', 'museum', 'town_square'],
+    'rating': 4.7,
+    'user_ratings_total': 380000,
+    'photos': [{'photo_reference': 'photo-ref'}],
+}
+
+
+class MongoJSONRendererTests(SimpleTestCase):
+    def test_renders_mapped_place(self):
+        mapped = AttractionsService._map_place_to_attraction(PLACE, country_hint='France')
+        payload = json.loads(MongoJSONRenderer().render([mapped]))
+        self.assertEqual(payload[0]['place_id'], PLACE['place_id'])
+        self.assertEqual(payload[0]['location'], {'lat': 48.8584, 'lng': 2.2945})
+        self.assertEqual(payload[0]['photo_reference'], 'photo-ref')
+        self.assertNotIn('type_mask', payload[0])
+
+    def test_ints_wider_than_64_bits_fall_back_to_stdlib(self):
+        data = {'mask': 1 << 100, 'name': 'x'}
+        self.assertEqual(json.loads(MongoJSONRenderer().render(data)), data)
+        self.assertEqual(json.loads(dumps(data)), data)
+        self.assertEqual([json.loads(line) for line in ndjson_lines([data])], [data])
+
+
+class CursorTests(SimpleTestCase):
+    def test_db_cursor_round_trip(self):
+        state = {'k': 'db', 'h': 'abc', 'a': [3, 4.5, 120, str(ObjectId())]}
+        cursor = encode_cursor(state)
+        self.assertNotIn('=', cursor)
+        self.assertEqual(decode_cursor(cursor, 'abc'), state)
+
+    def test_db_cursor_round_trip_with_null_sort_values(self):
+        row = {'_id': ObjectId(), 'likes': None, 'rating': 4.2}
+        state = {'k': 'db', 'h': 'abc', 'a': AttractionRepository.sort_key(row)}
+        self.assertEqual(decode_cursor(encode_cursor(state), 'abc')['a'], [None, 4.2, None, str(row['_id'])])
+
+    def test_google_cursor_round_trip(self):
+        state = {'k': 'google', 'h': 'abc', 't': 'next-page-token', 'o': 10}
+        self.assertEqual(decode_cursor(encode_cursor(state)), state)
+
+    def test_fingerprint_ignores_pagination_and_output_params(self):
+        base = {'country': 'France', 'q': 'musée'}
+        paged = {**base, 'cursor': 'x', 'page_size': '5', 'fields': 'card', 'format': 'ndjson'}
+        self.assertEqual(params_fingerprint(base), params_fingerprint(paged))
+        self.assertNotEqual(params_fingerprint(base), params_fingerprint({**base, 'city': 'Paris'}))
+
+    def test_mismatched_fingerprint_is_rejected(self):
+        cursor = encode_cursor({'k': 'db', 'h': params_fingerprint({'country': 'France'}), 'a': None})
+        with self.assertRaises(InvalidCursor):
+            decode_cursor(cursor, params_fingerprint({'country': 'Italy'}))
+
+    def test_malformed_cursors_are_rejected(self):
+        def raw(payload):
+            return base64.urlsafe_b64encode(payload).decode('ascii')
+
+        for cursor in ('not a cursor', raw(b'[1, 2]'), raw(b'{"k": "other"}'),
+                       encode_cursor({'k': 'db', 'a': [1, 2, 3, 'not-an-id']}),
+                       encode_cursor({'k': 'db', 'a': [1, 2]})):
+            with self.subTest(cursor=cursor), self.assertRaises(InvalidCursor):
+                decode_cursor(cursor)
+
+    def test_page_size_is_clamped(self):
+        self.assertEqual(page_size_from({}), 20)
+        self.assertEqual(page_size_from({'page_size': 'abc'}), 20)
+        self.assertEqual(page_size_from({'page_size': '0'}), 1)
+        self.assertEqual(page_size_from({'page_size': '1000'}), 100)
+
+
+class KeysetTests(SimpleTestCase):
+    def test_sort_key_keeps_null_apart_from_zero(self):
+        oid = ObjectId()
+        self.assertEqual(AttractionRepository.sort_key({'_id': oid, 'likes': 0, 'rating': None}), [0, None, None, str(oid)])
+
+    def test_after_number_includes_null(self):
+        oid = ObjectId()
+        clause = AttractionRepository._after_clause([2, 4.5, 10, str(oid)])
+        self.assertEqual(clause['$or'][0], {'$or': [{'likes': {'$lt': 2}}, {'likes': None}]})
+        self.assertEqual(clause['$or'][-1], {'likes': 2, 'rating': 4.5, 'user_ratings_total': 10, '_id': {'$gt': oid}})
+
+    def test_nothing_sorts_below_null(self):
+        oid = ObjectId()
+        clause = AttractionRepository._after_clause([None, None, None, str(oid)])
+        self.assertEqual(clause, {'$or': [{'likes': None, 'rating': None, 'user_ratings_total': None, '_id': {'$gt': oid}}]})
+
+
+class CacheTests(SimpleTestCase):
+    def test_lru_evicts_least_recently_used(self):
+        cache = LocalLRUCache(max_entries=2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        self.assertEqual(cache.get('a'), 1)
+        cache.set('c', 3)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual((cache.get('a'), cache.get('c')), (1, 3))
+        self.assertEqual(cache.stats()['evictions'], 1)
+
+    def test_lru_entries_expire(self):
+        cache = LocalLRUCache()
+        cache.set('a', 1, ttl=0)
+        self.assertNotIn('a', cache)
+        self.assertEqual(cache.stats()['expirations'], 1)
+
+    def test_len_skips_expired_entries(self):
+        for cache in (LocalLRUCache(), SQLiteCache(path=os.path.join(tempfile.mkdtemp(), 'cache.sqlite3'))):
+            with self.subTest(backend=type(cache).__name__):
+                cache.set('live', 1)
+                cache.set('old', 2, ttl=0)
+                self.assertEqual(len(cache), 1)
+
+    def test_lru_byte_budget(self):
+        cache = LocalLRUCache(max_bytes=16)
+        cache.set('big', 'x' * 64)
+        self.assertNotIn('big', cache)
+        cache.set('a', 'aaaa')
+        cache.set('b', 'bbbb')
+        self.assertLessEqual(cache.stats()['bytes'], 16)
+
+    def test_sqlite_shares_entries_between_instances(self):
+        path = os.path.join(tempfile.mkdtemp(), 'cache.sqlite3')
+        writer, reader = SQLiteCache(path=path), SQLiteCache(path=path)
+        writer.set('k', {'items': [1, 2]})
+        self.assertEqual(reader.get('k'), {'items': [1, 2]})
+        writer.set('old', 1, ttl=0)
+        self.assertIsNone(reader.get('old'))
+
+    def test_sqlite_rejects_values_that_are_not_json_native(self):
+        cache = SQLiteCache(path=os.path.join(tempfile.mkdtemp(), 'cache.sqlite3'))
+        with self.assertRaises(TypeError):
+            cache.set('k', {'_id': ObjectId()})
+
+    def test_incomplete_backend_fails_on_instantiation(self):
+        class GetOnly(BaseCache):
+            def get(self, key, default=None):
+                return default
+
+        with self.assertRaises(TypeError):
+            GetOnly()
+
+
+class SingleFlightTests(SimpleTestCase):
+    def test_concurrent_calls_share_one_execution(self):
+        flight = SingleFlight('test')
+        started, release = threading.Event(), threading.Event()
+        calls = []
+
+        def fn():
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            return 'result'
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(flight.do('key', fn))) for _ in range(4)]
+        threads[0].start()
+        started.wait(5)
+        for thread in threads[1:]:
+            thread.start()
+        while flight.stats()['coalesced'] < 3:
+            time.sleep(0.01)
+        release.set()
+        for thread in threads:
+            thread.join(5)
+        self.assertEqual(results, ['result'] * 4)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(flight.stats()['in_flight'], 0)
+
+    def test_errors_propagate_and_are_not_cached(self):
+        flight = SingleFlight('test')
+
+        def boom():
+            raise RuntimeError('upstream down')
+
+        with self.assertRaises(RuntimeError):
+            flight.do('key', boom)
+        self.assertEqual(flight.do('key', lambda: 'ok'), 'ok')
+        self.assertEqual(flight.stats()['errors'], 1)
+
+
+class RankingEngineTests(SimpleTestCase):
+    def place(self, place_id, types, rating=0, total=0):
+        return {'place_id': place_id, 'types': types, 'rating': rating, 'user_ratings_total': total}
+
+    def test_profile_affinity_comes_first(self):
+        engine = RankingEngine()
+        items = [
+            self.place('cafe', ['cafe'], rating=5, total=900),
+            self.place('museum', ['museum', 'tourist_attraction'], rating=4, total=10),
+        ]
+        self.assertEqual([i['place_id'] for i in engine.rank(items, 'tourist')], ['museum', 'cafe'])
+        self.assertEqual([i['place_id'] for i in engine.rank(items, 'local')], ['cafe', 'museum'])
+
+    def test_ties_keep_input_order(self):
+        engine = RankingEngine()
+        items = [self.place(str(n), ['museum'], rating=4, total=10) for n in range(5)]
+        self.assertEqual(engine.rank(items, 'tourist'), items)
+
+    def test_unknown_profile_keeps_order(self):
+        items = [self.place('a', [], rating=1), self.place('b', [], rating=5)]
+        self.assertEqual(RankingEngine().rank(items, 'nobody'), items)
+        self.assertEqual([i['place_id'] for i in RankingEngine().rank(items)], ['b', 'a'])
+
+    def test_weighted_mode(self):
+        engine = RankingEngine(mode='weighted')
+        items = [self.place('low', ['museum'], rating=1, total=1), self.place('high', ['museum'], rating=5, total=1000)]
+        self.assertEqual([i['place_id'] for i in engine.rank(items, 'tourist')], ['high', 'low'])
+
+    def test_unit_affinity_matches_type_table(self):
+        engine = RankingEngine()
+        types = ['museum', 'point_of_interest', 'establishment']
+        self.assertEqual(engine.type_affinity('tourist', types), 2.0)
+
+
+class PlaceTypesTests(SimpleTestCase):
+    def test_mask_round_trip(self):
+        mask = type_mask(['museum', 'Park', 'not_a_registered_type'])
+        self.assertEqual(set(names(mask)), {'museum', 'park'})
+        self.assertEqual(from_bytes(to_bytes(mask)), mask)
+        self.assertEqual(type_mask(None), 0)
+
+    def test_matching_mask_keeps_substring_semantics(self):
+        self.assertIn('book_store', names(matching_mask('store')))
+        self.assertIn('park', names(matching_mask('amusement_park')))
+        self.assertNotIn('park', names(matching_mask('amusement_park', bidirectional=False)))
+        self.assertEqual(matching_mask(''), 0)
+
+    def test_positions(self):
+        self.assertEqual(positions(0b10101), [0, 2, 4])
+
+    def test_mixed_category_keeps_unregistered_types(self):
+        places = [{'place_id': 'museum', 'types': ['museum']}, {'place_id': 'odd', 'types': ['some_unregistered_type']},
+                  {'place_id': 'cafe', 'types': ['cafe']}]
+        kept = AttractionsService._filter_by_types(places, ['museum', 'some_unregistered_type'])
+        self.assertEqual([p['place_id'] for p in kept], ['museum', 'odd'])
+
+    def test_unit_affinity_from_mask_matches_type_table(self):
+        engine = RankingEngine()
+        types = ['museum', 'point_of_interest', 'establishment']
+        self.assertEqual(engine.type_affinity('tourist', types, type_mask(types)), engine.type_affinity('tourist', types))
+
+
+class CompilationAttractionsTests(SimpleTestCase):
+    def compilation(self, *attraction_ids):
+        items = [SimpleNamespace(attraction=DBRef('attraction', att_id), order_index=index, added_at=None)
+                 for index, att_id in enumerate(attraction_ids)]
+        return SimpleNamespace(id=ObjectId(), name='Paris', profile='tourist', country='France', items=items,
+                               owner=DBRef('user', ObjectId()), created_at=None, updated_at=None)
+
+    def test_reference_ids_are_read_without_dereferencing(self):
+        att_id = ObjectId()
+        item = self.compilation(att_id).items[0]
+        self.assertEqual(CompilationRepository.attraction_id(item), att_id)
+        self.assertIsNone(CompilationRepository.attraction_id(SimpleNamespace(attraction=None)))
+
+    def test_dangling_reference_serializes_as_null(self):
+        kept, deleted = ObjectId(), ObjectId()
+        compilation = self.compilation(kept, deleted)
+        attractions = {kept: {'_id': kept, 'place_id': 'kept', 'name': 'Louvre'}}
+        payload = compilation_to_native(compilation, attractions, include_owner=True, fields=('id', 'name'))
+        self.assertEqual([item['attraction'] for item in payload['items']], [{'id': 'kept', 'name': 'Louvre'}, None])
+        self.assertEqual(payload['owner'], str(compilation.owner.id))
+
+
+class ToNativeTests(SimpleTestCase):
+    def test_mongo_values_become_json_native(self):
+        oid = ObjectId()
+        when = datetime.datetime(2024, 5, 1, 12, 30, tzinfo=datetime.timezone.utc)
+        value = {'id': oid, 'ref': DBRef('attraction', oid), 'at': when, 'day': when.date(),
+                 'tags': ('a', 'b'), 'nested': [{'ids': {oid}}], 'n': 1.5, 'none': None}
+        self.assertEqual(to_native(value), {
+            'id': str(oid), 'ref': str(oid), 'at': '2024-05-01T12:30:00+00:00', 'day': '2024-05-01',
+            'tags': ['a', 'b'], 'nested': [{'ids': [str(oid)]}], 'n': 1.5, 'none': None,
+        })
+        json.dumps(to_native(value))
+
+    def test_scalars_are_returned_as_is(self):
+        for value in ('text', 3, 2.5, True, None):
+            self.assertIs(to_native(value), value)
+
+
+class NDJSONTests(SimpleTestCase):
+    def test_one_line_per_item(self):
+        lines = list(ndjson_lines([{'a': 1}, {'a': 2}], serialize=lambda item: {'b': item['a'] * 2}))
+        self.assertEqual(lines, [b'{"b":2}\n', b'{"b":4}\n'])
+
+    def test_failure_ends_the_stream_with_an_error_line(self):
+        def serialize(item):
+            if item == 2:
+                raise ValueError('boom')
+            return {'n': item}
+
+        with self.assertLogs('src.json_renderer', level='ERROR'):
+            lines = list(ndjson_lines([1, 2, 3], serialize))
+        self.assertEqual([json.loads(line) for line in lines], [{'n': 1}, {'error': 'boom'}])
+
+
+class SparseFieldsTests(SimpleTestCase):
+    def test_parse_fields(self):
+        self.assertIsNone(parse_fields(None))
+        self.assertIsNone(parse_fields('unknown,also_unknown'))
+        self.assertEqual(parse_fields('card'), ATTRACTION_FIELDSETS['card'])
+        # Output order follows ATTRACTION_FIELDS, unknown names are dropped
+        self.assertEqual(parse_fields('rating, name,bogus'), ('name', 'rating'))
+
+    def test_attraction_to_native_selects_fields(self):
+        mapped = AttractionsService._map_place_to_attraction(PLACE, country_hint='France')
+        self.assertEqual(attraction_to_native(mapped, ('id', 'name', 'location')),
+                         {'id': PLACE['place_id'], 'name': 'Tour Eiffel', 'location': {'lat': 48.8584, 'lng': 2.2945}})
+        default = attraction_to_native(mapped)
+        self.assertEqual(tuple(default), DEFAULT_ATTRACTION_FIELDS)
+        self.assertNotIn('raw_data', default)
+
+    def test_projection_follows_fields(self):
+        self.assertEqual(attraction_projection(ATTRACTION_FIELDSETS['card']), 'card')
+        self.assertEqual(attraction_projection(('name', 'rating')), 'card')
+        self.assertEqual(attraction_projection(None), 'detail')
+        self.assertEqual(attraction_projection(('name', 'reviews')), 'detail')
+        self.assertEqual(attraction_projection(ATTRACTION_FIELDSETS['full']), 'full')
+
+    def test_default_search_payload_has_no_raw_data(self):
+        mapped = AttractionsService._map_place_to_attraction(PLACE, country_hint='France')
+        view = AttractionViewSet.as_view({'get': 'search'})
+        factory = APIRequestFactory()
+        with mock.patch('src.routes.attractions.AttractionsController.search', return_value=[mapped]):
+            default = view(factory.get('/api/attractions/search/', {'q': 'tour eiffel'}))
+            full = view(factory.get('/api/attractions/search/', {'q': 'tour eiffel', 'fields': 'full'}))
+        self.assertEqual(default.status_code, 200)
+        self.assertEqual(tuple(default.data[0]), DEFAULT_ATTRACTION_FIELDS)
+        self.assertNotIn('raw_data', default.data[0])
+        self.assertIn('raw_data', full.data[0])